@@ -27,10 +27,14 @@ if sys.platform == 'win32':
         except:
             pass  # Si todo falla, continuar sin modificar
 
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for
+from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, Response, stream_with_context
 import json
+import time
+import zipfile
+import threading
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timezone
+from werkzeug.http import is_resource_modified
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'exporters'))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'generators'))
@@ -38,9 +42,26 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'generators'))
 from test_case_automation import UserStoryParser, TestCaseGenerator, QAValidator, TestCaseExporter
 from test_templates import TemplateManager
 from linear_simple_exporter import LinearSimpleExporter
+from streaming_csv import (iter_csv_bytes, iter_project_rows, attachment_headers, PROJECT_CSV_FIELDNAMES,
+                           PROJECT_CSV_FORMAT_VERSION)
+from streaming_xlsx import stream_test_cases_xlsx, XLSX_MIMETYPE
+from export_bundle import ExportBundle, MultiFormatExport, BUNDLE_FORMATS, bundle_filename, multi_format_filename, iter_zip_entries
+from feature_exporter import build_features, iter_feature_files, feature_summary
+try:
+    from fast_docx import stream_word_report, DOCX_MIMETYPE
+except ImportError:
+    # python-docx es opcional (requirements.txt): sin él no hay exportación Word
+    stream_word_report, DOCX_MIMETYPE = None, None
 from gherkin_generator import GherkinGenerator, GherkinTestCase
 from enhanced_gherkin_generator import EnhancedGherkinGenerator, EnhancedGherkinTestCase
 from linear_api_client import LinearAPIClient
+from linear_upload_jobs import UploadJob
+from upload_tasks import task_registry
+from export_cache import export_cache, export_cache_key
+from artifact_store import artifact_store
+from export_watermarks import compute_delta, DEFAULT_EXPORT_TARGET
+from jsonl_transfer import iter_jsonl_bytes, JsonlImporter, JSONL_MIMETYPE, JSONL_IMPORT_BATCH_SIZE
+from test_case_model import compact_from_professional, compact_from_dicts, iter_compact_from_dicts
 
 app = Flask(__name__, 
            template_folder='templates',
@@ -51,6 +72,9 @@ app.secret_key = 'qa_automation_secret_key_2024'
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['OUTPUT_FOLDER'] = 'outputs'
 
+# Intervalo mínimo entre guardados del avance de una subida a Linear (el final siempre se guarda)
+JOB_PROGRESS_SAVE_SECONDS = float(os.environ.get('QA_JOB_PROGRESS_SAVE_SECONDS', '5'))
+
 # Crear directorios si no existen
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
@@ -58,10 +82,38 @@ os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
 class QAProject:
     """Clase para manejar proyectos de QA - Sistema local con JSON"""
     
+    # Campos que no forman parte del contenido exportable (no cambian la versión)
+    NON_CONTENT_FIELDS = {'linear_upload_job', 'export_watermarks'}
+    
     def __init__(self):
         self.projects = {}
+        self._listeners = []
+        # Protege self.projects y el guardado: las subidas en segundo plano escriben desde otros hilos
+        self._lock = threading.RLock()
+        self._last_save = 0.0
         self.load_projects()
     
+    def add_listener(self, callback):
+        """Registra callback(project_id, event) para cada cambio de contenido de un proyecto"""
+        self._listeners.append(callback)
+    
+    def _content_changed(self, project_id, event):
+        """Sube la versión de contenido del proyecto y avisa a los listeners"""
+        project = self.projects.get(project_id)
+        if project is not None:
+            project['content_version'] = project.get('content_version', 0) + 1
+            project['updated_at'] = datetime.now().isoformat()
+        for callback in self._listeners:
+            try:
+                callback(project_id, event)
+            except Exception as e:
+                print(f"[WARN] Listener de proyectos falló ({event}): {e}", flush=True)
+    
+    def content_version(self, project_id):
+        """Versión del contenido exportable del proyecto"""
+        project = self.projects.get(project_id) or {}
+        return project.get('content_version', 0)
+    
     def load_projects(self):
         """Carga proyectos desde archivo JSON local"""
         try:
@@ -77,36 +129,52 @@ class QAProject:
             print(f"[WARN] Error inesperado cargando proyectos: {e}", flush=True)
             self.projects = {}
     
+    @staticmethod
+    def _write_atomic(path, text):
+        """Escribe en un temporal y lo renombra: el JSON nunca queda truncado a medias"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8', errors='replace') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    
     def save_projects(self):
         """Guarda proyectos en archivo JSON local"""
-        try:
-            # Obtener ruta absoluta y normalizar
-            json_path = os.path.abspath('qa_projects.json')
-            # Asegurar que el directorio existe
-            os.makedirs(os.path.dirname(json_path) if os.path.dirname(json_path) else '.', exist_ok=True)
-            
-            # Escribir archivo con manejo robusto de errores
-            with open(json_path, 'w', encoding='utf-8', errors='replace') as f:
-                json.dump(self.projects, f, indent=2, ensure_ascii=False, default=str)
-        except (OSError, IOError, PermissionError) as e:
-            print(f"[ERROR] Error guardando proyectos: {e}", flush=True)
-            # Intentar con ruta alternativa si falla
+        with self._lock:
             try:
-                alt_path = os.path.join(os.path.expanduser('~'), 'qa_projects_backup.json')
-                with open(alt_path, 'w', encoding='utf-8', errors='replace') as f:
-                    json.dump(self.projects, f, indent=2, ensure_ascii=False, default=str)
-                print(f"[WARN] Proyectos guardados en ubicación alternativa: {alt_path}", flush=True)
-            except:
-                pass
-        except Exception as e:
-            print(f"[ERROR] Error inesperado guardando proyectos: {e}", flush=True)
+                # Serializar con el lock tomado: ningún otro hilo cambia proyectos a mitad del volcado
+                text = json.dumps(self.projects, indent=2, ensure_ascii=False, default=str)
+            except Exception as e:
+                print(f"[ERROR] Error inesperado guardando proyectos: {e}", flush=True)
+                return
+            self._last_save = time.monotonic()
+            try:
+                # Obtener ruta absoluta y normalizar
+                json_path = os.path.abspath('qa_projects.json')
+                # Asegurar que el directorio existe
+                os.makedirs(os.path.dirname(json_path) if os.path.dirname(json_path) else '.', exist_ok=True)
+                self._write_atomic(json_path, text)
+            except (OSError, IOError, PermissionError) as e:
+                print(f"[ERROR] Error guardando proyectos: {e}", flush=True)
+                # Intentar con ruta alternativa si falla
+                try:
+                    alt_path = os.path.join(os.path.expanduser('~'), 'qa_projects_backup.json')
+                    self._write_atomic(alt_path, text)
+                    print(f"[WARN] Proyectos guardados en ubicación alternativa: {alt_path}", flush=True)
+                except:
+                    pass
+    
+    def save_projects_throttled(self, min_interval):
+        """Guarda solo si pasaron min_interval segundos desde el último guardado"""
+        with self._lock:
+            if time.monotonic() - self._last_save < min_interval:
+                return False
+            self.save_projects()
+            return True
     
     def create_project(self, name, description, user_story, qa_comments="", linear_hu_id=""):
         """Crea un nuevo proyecto y lo guarda localmente"""
-        project_id = f"proj_{len(self.projects) + 1}_{int(datetime.now().timestamp())}"
-        
         project = {
-            'id': project_id,
+            'id': None,
             'name': name,
             'description': description,
             'user_story': user_story,
@@ -119,16 +187,25 @@ class QAProject:
             'template_used': None
         }
         
-        self.projects[project_id] = project
-        self.save_projects()
+        with self._lock:
+            # El id se calcula con el lock tomado para que dos altas simultáneas no coincidan
+            project_id = f"proj_{len(self.projects) + 1}_{int(datetime.now().timestamp())}"
+            project['id'] = project_id
+            self.projects[project_id] = project
+            self._content_changed(project_id, 'created')
+            self.save_projects()
         return project_id
     
-    def update_project(self, project_id, **kwargs):
-        """Actualiza un proyecto localmente"""
-        if project_id in self.projects:
-            self.projects[project_id].update(kwargs)
-            self.save_projects()
-            return True
+    def update_project(self, project_id, save=True, **kwargs):
+        """Actualiza un proyecto localmente (save=False deja la escritura del JSON para después)"""
+        with self._lock:
+            if project_id in self.projects:
+                self.projects[project_id].update(kwargs)
+                if set(kwargs) - self.NON_CONTENT_FIELDS:
+                    self._content_changed(project_id, 'updated')
+                if save:
+                    self.save_projects()
+                return True
         return False
     
     def get_project(self, project_id):
@@ -137,63 +214,76 @@ class QAProject:
     
     def list_projects(self):
         """Lista todos los proyectos locales"""
-        return list(self.projects.values())
+        with self._lock:
+            return list(self.projects.values())
     
     def delete_project(self, project_id):
         """Elimina un proyecto"""
-        if project_id in self.projects:
-            del self.projects[project_id]
-            self.save_projects()
-            return True
+        with self._lock:
+            if project_id in self.projects:
+                del self.projects[project_id]
+                self._content_changed(project_id, 'deleted')
+                self.save_projects()
+                return True
         return False
     
     def delete_test_case(self, project_id, test_case_id):
         """Elimina un caso de prueba específico de un proyecto"""
-        if project_id in self.projects:
-            project = self.projects[project_id]
-            test_cases = project.get('test_cases', [])
-            
-            # Filtrar el caso a eliminar
-            updated_cases = []
-            for case in test_cases:
-                case_id = case.get('id') if isinstance(case, dict) else getattr(case, 'id', None)
-                if case_id != test_case_id:
-                    updated_cases.append(case)
-            
-            project['test_cases'] = updated_cases
-            self.save_projects()
-            return True
+        with self._lock:
+            if project_id in self.projects:
+                project = self.projects[project_id]
+                test_cases = project.get('test_cases', [])
+                
+                # Filtrar el caso a eliminar
+                updated_cases = []
+                for case in test_cases:
+                    case_id = case.get('id') if isinstance(case, dict) else getattr(case, 'id', None)
+                    if case_id != test_case_id:
+                        updated_cases.append(case)
+                
+                project['test_cases'] = updated_cases
+                self._content_changed(project_id, 'test_case_deleted')
+                self.save_projects()
+                return True
         return False
     
     def update_test_case(self, project_id, test_case_id, updated_data):
         """Actualiza un caso de prueba específico"""
-        if project_id in self.projects:
-            project = self.projects[project_id]
-            test_cases = project.get('test_cases', [])
-            
-            for i, case in enumerate(test_cases):
-                case_id = case.get('id') if isinstance(case, dict) else getattr(case, 'id', None)
+        with self._lock:
+            if project_id in self.projects:
+                project = self.projects[project_id]
+                test_cases = project.get('test_cases', [])
                 
-                if case_id == test_case_id:
-                    # Actualizar campos del caso de prueba
-                    if isinstance(case, dict):
-                        case.update(updated_data)
-                    else:
-                        # Si es un objeto, actualizarlo campo por campo
-                        for key, value in updated_data.items():
-                            if hasattr(case, key):
-                                setattr(case, key, value)
+                for i, case in enumerate(test_cases):
+                    case_id = case.get('id') if isinstance(case, dict) else getattr(case, 'id', None)
                     
-                    test_cases[i] = case
-                    project['test_cases'] = test_cases
-                    self.save_projects()
-                    return True
+                    if case_id == test_case_id:
+                        # Actualizar campos del caso de prueba
+                        if isinstance(case, dict):
+                            case.update(updated_data)
+                        else:
+                            # Si es un objeto, actualizarlo campo por campo
+                            for key, value in updated_data.items():
+                                if hasattr(case, key):
+                                    setattr(case, key, value)
+                        
+                        test_cases[i] = case
+                        project['test_cases'] = test_cases
+                        self._content_changed(project_id, 'test_case_updated')
+                        self.save_projects()
+                        return True
             
         return False
 
 # Instancia global del gestor de proyectos
 qa_manager = QAProject()
 
+# Las exportaciones en caché de un proyecto se descartan en cuanto cambia su contenido
+qa_manager.add_listener(lambda project_id, event: export_cache.invalidate(project_id))
+
+# Retención de outputs/ (antigüedad, tamaño total y archivos por proyecto) en segundo plano
+artifact_store.start_background_gc()
+
 @app.route('/')
 def index():
     """Página principal"""
@@ -341,9 +431,6 @@ def generate_test_cases():
         import sys
         sys.path.insert(0, 'src')
         
-        # Importar TestType ANTES de professional_qa_generator para evitar conflictos
-        from test_case_automation import TestCase as LegacyTestCase, TestType, Priority
-        
         from professional_qa_generator import ProfessionalQAGenerator
         
         # Crear generador profesional
@@ -355,57 +442,9 @@ def generate_test_cases():
             project_name=project['name']
         )
         
-        # Convertir a formato compatible con el sistema
-        test_cases = []
-        
-        for prof_case in professional_cases:
-            # Mapear tipos - usar TestType de test_case_automation (FUNCTIONAL, NEGATIVE, INTEGRATION)
-            type_map = {
-                "Funcional": TestType.FUNCTIONAL,
-                "Negativo": TestType.NEGATIVE,
-                "Integración": TestType.INTEGRATION,
-                "Regresión": TestType.FUNCTIONAL,  # Mapear regresión a funcional
-                "UI": TestType.FUNCTIONAL  # Mapear UI a funcional
-            }
-            
-            priority_map = {
-                "Alta": Priority.HIGH,
-                "Media": Priority.MEDIUM,
-                "Baja": Priority.LOW
-            }
-            
-            # 🔥 CONSTRUIR DESCRIPCIÓN ESTRUCTURADA (sin usar _format_description)
-            # Cada sección separada con doble salto de línea para mejor legibilidad
-            preconditions_text = '\n'.join([f"- {p}" for p in prof_case.preconditions])
-            steps_text = '\n'.join(prof_case.steps)
-        
-            # Descripción estructurada con formato Gherkin
-            structured_description = f"""**Objetivo:** Verificar funcionalidad del sistema
-
-**Criterio:** {prof_case.criterion}
-
-**Preconditions:**
-{preconditions_text}
-
-**Pasos:**
-{steps_text}
-
-**Resultado Esperado:**
-{prof_case.expected_result}"""
-            
-            legacy_case = LegacyTestCase(
-                id=prof_case.id,
-                title=prof_case.title,
-                description=structured_description,
-                preconditions=prof_case.preconditions,
-                steps=prof_case.steps,
-                expected_result=prof_case.expected_result,
-                test_type=type_map.get(prof_case.test_type.value, TestType.FUNCTIONAL),
-                priority=priority_map.get(prof_case.priority.value, Priority.HIGH),
-                user_story=project['name'],
-                tags=["@qa", "@automated"]
-        )
-            test_cases.append(legacy_case)
+        # Convertir al modelo compacto (única representación de cada caso)
+        test_cases = compact_from_professional(professional_cases, project['name'])
+        del professional_cases
         
         print(f"[OK] {len(test_cases)} casos de prueba generados con generador profesional", flush=True)
         
@@ -420,22 +459,8 @@ def generate_test_cases():
                 'recommendations': ['Generar casos de prueba']
             }
         
-        # Convertir casos de prueba a formato serializable
-        serializable_test_cases = []
-        for tc in test_cases:
-            tc_dict = {
-                'id': tc.id,
-                'title': tc.title,
-                'description': tc.description,
-                'preconditions': tc.preconditions,
-                'steps': tc.steps,
-                'expected_result': tc.expected_result,
-                'test_type': tc.test_type.value,
-                'priority': tc.priority.value,
-                'user_story': tc.user_story,
-                'tags': tc.tags
-            }
-            serializable_test_cases.append(tc_dict)
+        # Formato serializable: la misma lista se guarda en el proyecto y se devuelve en la respuesta
+        serializable_test_cases = [tc.to_dict() for tc in test_cases]
         
         # Actualizar proyecto
         qa_manager.update_project(project_id, 
@@ -451,25 +476,9 @@ def generate_test_cases():
             'test_cases_count': len(test_cases),
             'validation_result': validation_result,
             'template_used': template,
-            'test_cases': []
+            'test_cases': serializable_test_cases
         }
         
-        # Convertir casos de prueba a formato serializable
-        for tc in test_cases:
-            tc_dict = {
-                'id': tc.id,
-                'title': tc.title,
-                'description': tc.description,
-                'preconditions': tc.preconditions,
-                'steps': tc.steps,
-                'expected_result': tc.expected_result,
-                'test_type': tc.test_type.value,
-                'priority': tc.priority.value,
-                'user_story': tc.user_story,
-                'tags': tc.tags
-            }
-            result['test_cases'].append(tc_dict)
-        
         return jsonify(result)
         
     except Exception as e:
@@ -478,9 +487,57 @@ def generate_test_cases():
         # print(f"DEBUG: Traceback: {traceback.format_exc()}")
         return jsonify({'error': str(e)}), 500
 
+def _archive_requested():
+    """?archive=1: guardar también la exportación en outputs/ (por defecto solo se transmite)"""
+    return request.args.get('archive', '').lower() in ('1', 'true', 'yes')
+
+def _project_last_modified(project):
+    """Fecha del último cambio de contenido del proyecto (para Last-Modified)"""
+    try:
+        return datetime.fromisoformat(project.get('updated_at') or project['created_at']).astimezone(timezone.utc)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def _serve_export(project_id, project, fmt, options, mimetype, render):
+    """
+    Sirve una exportación desde la caché versionada (ETag / Last-Modified)
+
+    render() -> (filename, chunks) solo se llama si la exportación no está en caché;
+    los bloques se transmiten al cliente mientras se guardan en la caché.
+    """
+    key = export_cache_key(project_id, qa_manager.content_version(project_id), fmt, options)
+    last_modified = _project_last_modified(project)
+    
+    # El navegador ya tiene esta versión: 304 sin generar ni leer nada
+    if not is_resource_modified(request.environ, etag=key, last_modified=last_modified):
+        response = Response(status=304)
+    else:
+        entry = export_cache.get(key)
+        if entry is not None:
+            response = send_file(entry.path, mimetype=entry.mimetype, as_attachment=True,
+                                 download_name=entry.filename, conditional=False)
+        else:
+            filename, chunks = render()
+            response = Response(
+                stream_with_context(export_cache.store_stream(key, project_id, filename, mimetype, chunks)),
+                mimetype=mimetype, headers=attachment_headers(filename))
+    
+    response.set_etag(key)
+    if last_modified:
+        response.last_modified = last_modified
+    # Revalidar siempre: si el proyecto cambió la clave ya no coincide
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.route('/export_project/<project_id>')
 def export_project(project_id):
-    """Exporta proyecto a CSV"""
+    """
+    Exporta proyecto a CSV
+
+    Por defecto se transmite en streaming con el formato 2 (columnas de PROJECT_CSV_FIELDNAMES,
+    archivo *_casos_v2.csv). Con ?format_version=1 o ?archive=1 se genera el CSV clásico de
+    TestCaseExporter, que además se guarda en outputs/.
+    """
     try:
         project = qa_manager.get_project(project_id)
         if not project:
@@ -489,28 +546,19 @@ def export_project(project_id):
         if not project.get('test_cases'):
             return jsonify({'error': 'No hay casos de prueba para exportar'}), 400
         
-        # Convertir casos de prueba a objetos TestCase
-        from test_case_automation import TestCase, TestType, Priority
+        legacy_format = request.args.get('format_version', '') == '1'
+        if not _archive_requested() and not legacy_format:
+            version = PROJECT_CSV_FORMAT_VERSION
+            filename = "".join(c for c in f"proyecto_{project_id}_casos_v{version}.csv"
+                               if c.isalnum() or c in (' ', '-', '_', '.')).strip()
+            response = _serve_export(project_id, project, f'project_csv_v{version}', {}, 'text/csv; charset=utf-8',
+                                     lambda: (filename, iter_csv_bytes(iter_project_rows(project['test_cases']),
+                                                                       PROJECT_CSV_FIELDNAMES)))
+            response.headers['X-Export-Format-Version'] = str(version)
+            return response
         
-        test_cases = []
-        for tc_data in project['test_cases']:
-            # Manejar tanto formato string como enum
-            test_type = tc_data['test_type'] if isinstance(tc_data['test_type'], str) else tc_data['test_type'].value
-            priority = tc_data['priority'] if isinstance(tc_data['priority'], str) else tc_data['priority'].value
-            
-            tc = TestCase(
-                id=tc_data['id'],
-                title=tc_data['title'],
-                description=tc_data['description'],
-                preconditions=tc_data['preconditions'],
-                steps=tc_data['steps'],
-                expected_result=tc_data['expected_result'],
-                test_type=TestType(test_type),
-                priority=Priority(priority),
-                user_story=tc_data['user_story'],
-                tags=tc_data['tags']
-            )
-            test_cases.append(tc)
+        # Convertir casos de prueba al modelo compacto (tipo y prioridad como enum)
+        test_cases = compact_from_dicts(project['test_cases'])
         
         # Exportar a CSV
         exporter = TestCaseExporter()
@@ -527,18 +575,59 @@ def export_project(project_id):
         
         if not os.path.exists(filepath):
             return jsonify({'error': 'No se pudo crear el archivo de exportación'}), 500
+        artifact_store.register(filepath, project_id)
         
         try:
-            return send_file(filepath, as_attachment=True, download_name=filename, mimetype='text/csv')
+            response = send_file(filepath, as_attachment=True, download_name=filename, mimetype='text/csv')
+            response.headers['X-Export-Format-Version'] = '1'
+            return response
         except (OSError, IOError, PermissionError) as e:
             return jsonify({'error': f'Error al enviar archivo: {str(e)}'}), 500
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/export_excel/<project_id>')
+def export_excel(project_id):
+    """Exporta proyecto a Excel (libro write-only en streaming, sin pandas)"""
+    try:
+        project = qa_manager.get_project(project_id)
+        if not project:
+            return jsonify({'error': 'Proyecto no encontrado'}), 404
+        
+        if not project.get('test_cases'):
+            return jsonify({'error': 'No hay casos de prueba para exportar'}), 400
+        
+        return _serve_export(project_id, project, 'project_xlsx', {}, XLSX_MIMETYPE,
+                             lambda: stream_test_cases_xlsx(project['test_cases'], project.get('name') or project_id))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/export_word/<project_id>')
+def export_word(project_id):
+    """Exporta proyecto a Word (motor de plantilla, en streaming)"""
+    try:
+        if stream_word_report is None:
+            return jsonify({'error': 'La exportación a Word requiere python-docx'}), 501
+        
+        project = qa_manager.get_project(project_id)
+        if not project:
+            return jsonify({'error': 'Proyecto no encontrado'}), 404
+        
+        if not project.get('test_cases'):
+            return jsonify({'error': 'No hay casos de prueba para exportar'}), 400
+        
+        return _serve_export(project_id, project, 'project_docx', {}, DOCX_MIMETYPE,
+                             lambda: stream_word_report(project['test_cases'], project.get('name') or project_id,
+                                                        project.get('user_story', '')))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/export_linear/<project_id>')
 def export_linear(project_id):
-    """Exporta proyecto para Linear"""
+    """Exporta proyecto para Linear (en streaming; con ?archive=1 también se guarda en outputs/)"""
     try:
         project = qa_manager.get_project(project_id)
         if not project:
@@ -547,28 +636,12 @@ def export_linear(project_id):
         if not project.get('test_cases'):
             return jsonify({'error': 'No hay casos de prueba para exportar'}), 400
         
-        # Convertir casos de prueba a objetos TestCase
-        from test_case_automation import TestCase, TestType, Priority
-        
-        test_cases = []
-        for tc_data in project['test_cases']:
-            # Manejar tanto formato string como enum
-            test_type = tc_data['test_type'] if isinstance(tc_data['test_type'], str) else tc_data['test_type'].value
-            priority = tc_data['priority'] if isinstance(tc_data['priority'], str) else tc_data['priority'].value
-            
-            tc = TestCase(
-                id=tc_data['id'],
-                title=tc_data['title'],
-                description=tc_data['description'],
-                preconditions=tc_data['preconditions'],
-                steps=tc_data['steps'],
-                expected_result=tc_data['expected_result'],
-                test_type=TestType(test_type),
-                priority=Priority(priority),
-                user_story=tc_data['user_story'],
-                tags=tc_data['tags']
-            )
-            test_cases.append(tc)
+        if not _archive_requested():
+            # Normalización a texto caso por caso (un solo pool compartido), sin construir la lista completa
+            serializable_cases = (tc.to_dict() for tc in iter_compact_from_dicts(project['test_cases']))
+            return _serve_export(project_id, project, 'linear_csv', {}, 'text/csv; charset=utf-8',
+                                 lambda: LinearSimpleExporter(app.config['OUTPUT_FOLDER']).stream_linear_csv(
+                                     serializable_cases, f"proyecto_{project_id}", project.get('user_story', '')))
         
         # Exportar para Linear
         exporter = LinearSimpleExporter(app.config['OUTPUT_FOLDER'])
@@ -580,28 +653,15 @@ def export_linear(project_id):
         # Asegurar que el directorio existe
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
-        # Convertir casos de prueba a formato serializable para LinearSimpleExporter
-        serializable_cases = []
-        for tc in test_cases:
-            tc_dict = {
-                'id': tc.id,
-                'title': tc.title,
-                'description': tc.description,
-                'preconditions': tc.preconditions,
-                'steps': tc.steps,
-                'expected_result': tc.expected_result,
-                'test_type': tc.test_type.value,
-                'priority': tc.priority.value,
-                'user_story': tc.user_story,
-                'tags': tc.tags
-            }
-            serializable_cases.append(tc_dict)
+        # LinearSimpleExporter trabaja con el formato serializable (normalizado a texto)
+        serializable_cases = [tc.to_dict() for tc in compact_from_dicts(project['test_cases'])]
         
         csv_file = exporter.export_to_linear_csv(serializable_cases, f"proyecto_{project_id}", project.get('user_story', ''))
         
         # Validar que el archivo existe
         if not os.path.exists(csv_file):
             return jsonify({'error': 'No se pudo crear el archivo de exportación'}), 500
+        artifact_store.register(csv_file, project_id)
         
         try:
             return send_file(csv_file, as_attachment=True, download_name=os.path.basename(csv_file), mimetype='text/csv')
@@ -627,6 +687,216 @@ def get_templates():
             })
         
         return jsonify({'templates': templates})
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/parse_cache/stats')
+def get_parse_cache_stats():
+    """Métricas de la caché de parseo (aciertos, fallos, memoria)"""
+    try:
+        import sys
+        sys.path.insert(0, 'src')
+        # Importar a través del generador para leer la misma instancia que usan las rutas
+        from professional_qa_generator import get_parse_cache
+
+        if get_parse_cache is None:
+            return jsonify({'error': 'Caché de parseo no disponible'}), 503
+
+        return jsonify(get_parse_cache().stats())
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/export_cache/stats')
+def get_export_cache_stats():
+    """Métricas de la caché de exportaciones (aciertos, tamaño en disco, desalojos)"""
+    return jsonify(export_cache.stats())
+
+def _export_payload(project_id, project):
+    """Proyecto listo para los exportadores: casos normalizados una sola vez al formato serializable"""
+    return {
+        'project_id': project_id,
+        'name': project.get('name') or project_id,
+        'user_story': project.get('user_story', ''),
+        'test_cases': [tc.to_dict() for tc in compact_from_dicts(project.get('test_cases') or [])]
+    }
+
+def _request_list(data, key):
+    """Lista de un parámetro: JSON (lista o texto separado por comas) o query string"""
+    value = data.get(key) if data else None
+    if value is None:
+        value = request.args.get(key, '')
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(item).strip() for item in value if str(item).strip()]
+
+@app.route('/api/export_bundle', methods=['GET', 'POST'])
+def export_bundle():
+    """
+    Exporta varios proyectos en un ZIP transmitido mientras se genera
+
+    Parámetros (JSON o query string): project_ids y formats (csv, linear_csv, xlsx, docx, gherkin).
+    Cada proyecto se renderiza en el pool de procesos y se carga solo cuando hay un worker libre.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        project_ids = list(dict.fromkeys(_request_list(data, 'project_ids')))
+        formats = _request_list(data, 'formats') or ['csv']
+        
+        if not project_ids:
+            return jsonify({'error': 'Indica al menos un proyecto (project_ids)'}), 400
+        unknown = [fmt for fmt in formats if fmt not in BUNDLE_FORMATS]
+        if unknown:
+            return jsonify({'error': f"Formatos no soportados: {', '.join(unknown)}",
+                            'formats': list(BUNDLE_FORMATS)}), 400
+        if 'docx' in formats and stream_word_report is None:
+            return jsonify({'error': 'La exportación a Word requiere python-docx'}), 501
+        missing = [pid for pid in project_ids if not qa_manager.get_project(pid)]
+        if missing:
+            return jsonify({'error': 'Proyectos no encontrados', 'project_ids': missing}), 404
+        
+        # Generador perezoso: cada proyecto se normaliza cuando el paquete lo pide
+        payloads = (_export_payload(pid, qa_manager.get_project(pid)) for pid in project_ids
+                    if qa_manager.get_project(pid))
+        bundle = ExportBundle(formats)
+        return Response(stream_with_context(bundle.iter_bytes(payloads)), mimetype='application/zip',
+                        headers=attachment_headers(bundle_filename()))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/export_all/<project_id>')
+def export_all_formats(project_id):
+    """
+    Exporta un proyecto en varios formatos a la vez (?formats=csv,xlsx,docx) en un solo ZIP
+
+    Los casos se normalizan una vez y cada formato se genera en paralelo en el pool de procesos.
+    """
+    try:
+        project = qa_manager.get_project(project_id)
+        if not project:
+            return jsonify({'error': 'Proyecto no encontrado'}), 404
+        
+        if not project.get('test_cases'):
+            return jsonify({'error': 'No hay casos de prueba para exportar'}), 400
+        
+        formats = list(dict.fromkeys(_request_list(None, 'formats') or ['csv', 'xlsx', 'docx']))
+        unknown = [fmt for fmt in formats if fmt not in BUNDLE_FORMATS]
+        if unknown:
+            return jsonify({'error': f"Formatos no soportados: {', '.join(unknown)}",
+                            'formats': list(BUNDLE_FORMATS)}), 400
+        if 'docx' in formats and stream_word_report is None:
+            return jsonify({'error': 'La exportación a Word requiere python-docx'}), 501
+        
+        return _serve_export(project_id, project, 'multi_format_zip', {'formats': formats}, 'application/zip',
+                             lambda: (multi_format_filename(project_id),
+                                      MultiFormatExport(formats).iter_zip(_export_payload(project_id, project))))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/export_features/<project_id>')
+def export_feature_files_zip(project_id):
+    """
+    Exporta los casos del proyecto como archivos .feature en un ZIP, uno por feature / historia de usuario
+
+    Los pasos Given comunes van al Background, los escenarios que solo cambian en valores
+    se unen en un Scenario Outline con Examples y los repetidos se descartan.
+    """
+    try:
+        project = qa_manager.get_project(project_id)
+        if not project:
+            return jsonify({'error': 'Proyecto no encontrado'}), 404
+        
+        if not project.get('test_cases'):
+            return jsonify({'error': 'No hay casos de prueba para exportar'}), 400
+        
+        def render():
+            payload = _export_payload(project_id, project)
+            features = build_features(payload['test_cases'], payload['name'], payload['user_story'])
+            print(f"[INFO] Exportación .feature de {project_id}: {len(features)} features, {feature_summary(features)}", flush=True)
+            entries = ((filename, text.encode('utf-8'), zipfile.ZIP_DEFLATED)
+                       for filename, text in iter_feature_files(features))
+            return f"proyecto_{project_id}_features.zip", iter_zip_entries(entries)
+        
+        return _serve_export(project_id, project, 'gherkin_features', {}, 'application/zip', render)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/artifacts')
+def list_artifacts():
+    """Archivos exportados que se conservan en outputs/ (?project_id= para filtrar) y la política de retención"""
+    project_id = request.args.get('project_id') or None
+    return jsonify({
+        'artifacts': artifact_store.list(project_id),
+        'stats': artifact_store.stats()
+    })
+
+@app.route('/api/artifacts/gc', methods=['POST'])
+def collect_artifacts():
+    """Aplica la retención de outputs/ en este momento"""
+    try:
+        return jsonify(artifact_store.collect())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/export_jsonl/<project_id>')
+def export_jsonl(project_id):
+    """Exporta los casos del proyecto como JSON Lines (un caso por línea con los metadatos del proyecto)"""
+    try:
+        project = qa_manager.get_project(project_id)
+        if not project:
+            return jsonify({'error': 'Proyecto no encontrado'}), 404
+        
+        return _serve_export(project_id, project, 'jsonl', {}, JSONL_MIMETYPE,
+                             lambda: (f"proyecto_{project_id}_casos.jsonl", iter_jsonl_bytes([project])))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/export_jsonl')
+def export_jsonl_corpus():
+    """Exporta varios proyectos (?project_ids=a,b; todos si se omite) como JSON Lines en streaming"""
+    try:
+        project_ids = _request_list(None, 'project_ids') or list(qa_manager.projects)
+        missing = [pid for pid in project_ids if not qa_manager.get_project(pid)]
+        if missing:
+            return jsonify({'error': 'Proyectos no encontrados', 'project_ids': missing}), 404
+        
+        projects = (qa_manager.get_project(pid) for pid in project_ids if qa_manager.get_project(pid))
+        filename = f"casos_prueba_{datetime.now().strftime('%Y%m%d_%H%M')}.jsonl"
+        return Response(stream_with_context(iter_jsonl_bytes(projects)), mimetype=JSONL_MIMETYPE,
+                        headers=attachment_headers(filename))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/import_jsonl', methods=['POST'])
+def import_jsonl():
+    """
+    Importa casos desde JSON Lines (archivo 'file' en multipart o el cuerpo de la petición)
+    
+    Se lee línea a línea y se escribe por lotes (?batch_size=); las líneas inválidas se
+    informan con su número sin detener la importación. Con ?project_id= todo va a ese proyecto.
+    """
+    try:
+        target_project_id = request.args.get('project_id') or None
+        if target_project_id and not qa_manager.get_project(target_project_id):
+            return jsonify({'error': 'Proyecto no encontrado'}), 404
+        
+        upload = request.files.get('file')
+        stream = upload.stream if upload else request.stream
+        batch_size = request.args.get('batch_size', type=int) or JSONL_IMPORT_BATCH_SIZE
+        
+        importer = JsonlImporter(qa_manager, batch_size=batch_size, target_project_id=target_project_id)
+        importer.feed(stream)
+        report = importer.close()
+        
+        if report.imported == 0 and report.failed:
+            return jsonify({'error': 'Ninguna línea válida', **report.to_dict()}), 400
+        return jsonify({'success': True, **report.to_dict()})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -650,7 +920,7 @@ def get_validation_details(project_id):
 
 @app.route('/export_linear_simple/<project_id>')
 def export_linear_simple(project_id):
-    """Exporta proyecto para Linear en formato simplificado"""
+    """Exporta proyecto para Linear en formato simplificado (en streaming salvo ?archive=1)"""
     try:
         project = qa_manager.get_project(project_id)
         if not project:
@@ -659,6 +929,11 @@ def export_linear_simple(project_id):
         if not project.get('test_cases'):
             return jsonify({'error': 'No hay casos de prueba para exportar'}), 400
         
+        if not _archive_requested():
+            return _serve_export(project_id, project, 'linear_simple_csv', {}, 'text/csv; charset=utf-8',
+                                 lambda: LinearSimpleExporter(app.config['OUTPUT_FOLDER']).stream_linear_csv(
+                                     project['test_cases'], project['name'], project.get('user_story', '')))
+        
         # Usar el exportador simplificado
         linear_exporter = LinearSimpleExporter(app.config['OUTPUT_FOLDER'])
         csv_file = linear_exporter.export_to_linear_csv(
@@ -673,6 +948,7 @@ def export_linear_simple(project_id):
         
         csv_file = os.path.abspath(csv_file)
         filename = os.path.basename(csv_file)
+        artifact_store.register(csv_file, project_id)
         
         try:
             return send_file(csv_file, as_attachment=True, download_name=filename, mimetype='text/csv')
@@ -682,9 +958,83 @@ def export_linear_simple(project_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/export_linear_delta/<project_id>')
+def export_linear_delta(project_id):
+    """
+    Exporta para Linear solo los casos nuevos o modificados desde la última exportación
+    
+    Devuelve un ZIP con el CSV de cambios (ids estables en lugar de TC-001, TC-002...) y
+    manifest.json con los casos eliminados. La marca de agua del destino (?target=) avanza
+    solo si la descarga se completa; ?commit=0 previsualiza sin avanzarla.
+    """
+    try:
+        project = qa_manager.get_project(project_id)
+        if not project:
+            return jsonify({'error': 'Proyecto no encontrado'}), 404
+        
+        target = request.args.get('target') or DEFAULT_EXPORT_TARGET
+        commit = request.args.get('commit', '1').lower() not in ('0', 'false', 'no')
+        version = qa_manager.content_version(project_id)
+        test_cases = [tc.to_dict() for tc in compact_from_dicts(project.get('test_cases') or [])]
+        delta = compute_delta(test_cases, (project.get('export_watermarks') or {}).get(target), target)
+        manifest = delta.manifest(project_id, version)
+        
+        exporter = LinearSimpleExporter(app.config['OUTPUT_FOLDER'])
+        changed = delta.changed_cases
+        csv_name, csv_chunks = exporter.stream_linear_csv(
+            [test_case for _, test_case in changed], project['name'], project.get('user_story', ''),
+            case_ids=[case_id for case_id, _ in changed])
+        
+        def delta_chunks():
+            yield from iter_zip_entries([
+                (csv_name, b''.join(csv_chunks), zipfile.ZIP_DEFLATED),
+                ('manifest.json', json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'),
+                 zipfile.ZIP_DEFLATED)
+            ])
+            if commit:
+                # Descarga completa: registrar la marca de agua (no cambia la versión de contenido)
+                watermarks = dict((qa_manager.get_project(project_id) or {}).get('export_watermarks') or {})
+                watermarks[target] = delta.next_watermark(version).to_dict()
+                qa_manager.update_project(project_id, export_watermarks=watermarks)
+                print(f"[OK] Exportación delta de {project_id} ({target}): {len(delta.added)} nuevos, "
+                      f"{len(delta.modified)} modificados, {len(delta.deleted)} eliminados", flush=True)
+        
+        filename = f"proyecto_{project_id}_{'delta' if delta.base else 'completo'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        response = Response(stream_with_context(delta_chunks()), mimetype='application/zip',
+                            headers=attachment_headers(filename))
+        response.headers['X-Export-Summary'] = json.dumps({k: len(v) if isinstance(v, list) else v
+                                                           for k, v in manifest.items()
+                                                           if k in ('added', 'modified', 'deleted', 'unchanged')})
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/project/<project_id>/export_watermarks', methods=['GET', 'DELETE'])
+def project_export_watermarks(project_id):
+    """Consulta (GET) o reinicia (DELETE, ?target= opcional) las marcas de agua de exportación"""
+    project = qa_manager.get_project(project_id)
+    if not project:
+        return jsonify({'error': 'Proyecto no encontrado'}), 404
+    
+    watermarks = dict(project.get('export_watermarks') or {})
+    if request.method == 'DELETE':
+        target = request.args.get('target')
+        if target:
+            watermarks.pop(target, None)
+        else:
+            watermarks = {}
+        qa_manager.update_project(project_id, export_watermarks=watermarks)
+    
+    return jsonify({
+        target: {'exported_at': mark['exported_at'], 'content_version': mark.get('content_version', 0),
+                 'cases': len(mark.get('hashes') or {})}
+        for target, mark in watermarks.items()
+    })
+
 @app.route('/export_linear_subissues/<project_id>')
 def export_linear_subissues(project_id):
-    """Exporta proyecto como sub-issues para Linear"""
+    """Exporta proyecto como sub-issues para Linear (en streaming salvo ?archive=1)"""
     try:
         project = qa_manager.get_project(project_id)
         if not project:
@@ -696,6 +1046,13 @@ def export_linear_subissues(project_id):
         # Obtener parent_issue_id del parámetro de query
         parent_issue_id = request.args.get('parent_id', '')
         
+        if not _archive_requested():
+            return _serve_export(project_id, project, 'linear_subissues_csv', {'parent_id': parent_issue_id},
+                                 'text/csv; charset=utf-8',
+                                 lambda: LinearSimpleExporter(app.config['OUTPUT_FOLDER']).stream_linear_csv(
+                                     project['test_cases'], project['name'], project.get('user_story', ''),
+                                     parent_issue_id))
+        
         # Usar el exportador para sub-issues
         linear_exporter = LinearSimpleExporter(app.config['OUTPUT_FOLDER'])
         csv_file = linear_exporter.export_as_subissues(
@@ -711,6 +1068,7 @@ def export_linear_subissues(project_id):
         
         csv_file = os.path.abspath(csv_file)
         filename = os.path.basename(csv_file)
+        artifact_store.register(csv_file, project_id)
         
         try:
             return send_file(csv_file, as_attachment=True, download_name=filename, mimetype='text/csv')
@@ -720,9 +1078,130 @@ def export_linear_subissues(project_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _format_cases_for_linear(test_cases):
+    """Convierte los casos guardados al formato de dict que espera LinearAPIClient"""
+    formatted_cases = []
+    for case in test_cases:
+        if isinstance(case, dict):
+            formatted_cases.append(case)
+        else:
+            case_dict = {
+                'test_case_id': str(getattr(case, 'id', f'TC-{len(formatted_cases)+1:03d}')),
+                'title': str(getattr(case, 'title', 'Sin título')),
+                'description': str(getattr(case, 'description', '')),
+                'preconditions': str(getattr(case, 'preconditions', '')),
+                'steps': str(getattr(case, 'steps', '')),
+                'expected_result': str(getattr(case, 'expected_result', '')),
+                'priority': str(getattr(case, 'priority', 'Media')),
+                'type': str(getattr(case, 'type', 'Funcional'))
+            }
+            formatted_cases.append(case_dict)
+    return formatted_cases
+
+
+# Subidas y sincronizaciones de un proyecto con Linear comparten grupo: nunca corren a la vez
+LINEAR_TASK_GROUP = 'linear'
+
+
+def _linear_busy_response(task):
+    """409 cuando el proyecto ya tiene una operación con Linear en curso"""
+    return jsonify({
+        'error': 'Ya hay una operación con Linear en curso para este proyecto',
+        'task_id': task.id,
+        'task_kind': task.kind
+    }), 409
+
+
+def _run_linear_upload(project_id, project, api_key, parent_issue_id, batch_size=None, on_case_result=None):
+    """
+    Sube los casos del proyecto a Linear y devuelve (payload, status_code)
+
+    La usan tanto la ruta síncrona como la tarea en segundo plano.
+    on_case_result(result, case) se llama por cada caso procesado.
+    """
+    print("="*80, flush=True)
+    print(f"[INFO] Iniciando subida a Linear...", flush=True)
+    print(f"       HU ID: {parent_issue_id}", flush=True)
+    print(f"       Casos: {len(project['test_cases'])}", flush=True)
+    print("="*80, flush=True)
+    sys.stdout.flush()
+    
+    client = LinearAPIClient(api_key)
+    
+    # Verificar conexión
+    print("[INFO] Verificando conexion con Linear API...", flush=True)
+    if not client.test_connection():
+        print("[ERROR] No se pudo conectar con Linear", flush=True)
+        return {'error': 'No se pudo conectar con Linear. Verifica tu API Key'}, 400
+    print("[OK] Conexion exitosa con Linear API", flush=True)
+    
+    # Convertir casos al formato correcto
+    formatted_cases = _format_cases_for_linear(project['test_cases'])
+    
+    # Subir casos a Linear
+    print(f"[INFO] Llamando a upload_test_cases_as_subissues con {len(formatted_cases)} casos...", flush=True)
+    print(f"[INFO] Parent Issue ID: {parent_issue_id}", flush=True)
+    print(f"[INFO] Team ID: None (deteccion automatica)", flush=True)
+    print("="*80, flush=True)
+    sys.stdout.flush()
+    
+    # Trabajo persistido en el proyecto: un reintento solo sube lo pendiente
+    job = UploadJob.resume_or_create(project.get('linear_upload_job'), project_id, parent_issue_id)
+    
+    def save_job_progress(current_job):
+        # En memoria tras cada lote; en disco como mucho cada JOB_PROGRESS_SAVE_SECONDS
+        qa_manager.update_project(project_id, save=False, linear_upload_job=current_job.to_dict())
+        qa_manager.save_projects_throttled(JOB_PROGRESS_SAVE_SECONDS)
+    
+    try:
+        created_issues = client.upload_test_cases_as_subissues(
+            parent_issue_identifier=parent_issue_id,
+            test_cases=formatted_cases,
+            team_id=None,  # Auto-detectar
+            batch_size=batch_size,
+            job=job,
+            on_progress=save_job_progress,
+            on_case_result=on_case_result
+        )
+    finally:
+        # El avance final se guarda siempre, aunque la subida falle a medias
+        qa_manager.update_project(project_id, linear_upload_job=job.to_dict())
+    
+    skipped_issues = [result.issue_id for result in client.last_upload_results if result.skipped]
+    failed_cases = [
+        {'index': result.index, 'error': result.error}
+        for result in client.last_upload_results if not result.success
+    ]
+    
+    print("="*80, flush=True)
+    if created_issues or (skipped_issues and not failed_cases):
+        print(f"[OK] {len(created_issues)} casos subidos exitosamente, {len(skipped_issues)} ya existían", flush=True)
+        print(f"[OK] IDs creados: {created_issues[:3]}... (mostrando primeros 3)", flush=True)
+        print("="*80, flush=True)
+        sys.stdout.flush()
+        return {
+            'success': True,
+            'message': f'{len(created_issues)} casos de prueba subidos exitosamente'
+                       + (f' ({len(skipped_issues)} ya existían en Linear)' if skipped_issues else ''),
+            'created_issues': created_issues,
+            'skipped_issues': skipped_issues,
+            'failed_cases': failed_cases,
+            'job_status': job.status
+        }, 200
+    
+    print("[ERROR] No se crearon issues en Linear")
+    print("="*80)
+    return {'error': 'No se pudieron crear los casos en Linear', 'failed_cases': failed_cases}, 500
+
+
 @app.route('/upload_to_linear/<project_id>', methods=['POST'])
 def upload_to_linear_api(project_id):
-    """Sube casos de prueba directamente a Linear usando la API"""
+    """
+    Sube casos de prueba directamente a Linear usando la API
+
+    Con {"background": true} la subida corre en segundo plano: responde 202 con el
+    task_id y la URL de progreso (Server-Sent Events) en lugar de esperar a Linear.
+    """
     try:
         project = qa_manager.get_project(project_id)
         if not project:
@@ -750,77 +1229,135 @@ def upload_to_linear_api(project_id):
         if not parent_issue_id:
             return jsonify({'error': 'ID de Historia de Usuario es requerido'}), 400
         
-        # Crear cliente Linear
-        import sys
-        print("="*80, flush=True)
-        print(f"[INFO] Iniciando subida a Linear...", flush=True)
-        print(f"       HU ID: {parent_issue_id}", flush=True)
-        print(f"       Casos: {len(project['test_cases'])}", flush=True)
-        print("="*80, flush=True)
-        sys.stdout.flush()
+        # Casos por petición GraphQL (opcional, por defecto LinearAPIClient.DEFAULT_BATCH_SIZE)
+        try:
+            batch_size = int(data['batch_size']) if data.get('batch_size') else None
+        except (TypeError, ValueError):
+            return jsonify({'error': 'batch_size debe ser un número entero'}), 400
+        
+        if not data.get('background'):
+            with task_registry.hold('linear_upload', project_id, LINEAR_TASK_GROUP) as (task, acquired):
+                if not acquired:
+                    return _linear_busy_response(task)
+                payload, status = _run_linear_upload(project_id, project, api_key, parent_issue_id, batch_size)
+            return jsonify(payload), status
+        
+        total = len(project['test_cases'])
+        
+        def upload_task(current_task):
+            def publish_case(result, case):
+                current_task.publish('case', {
+                    'index': case.index,
+                    'total': total,
+                    'test_case_id': case.test_case_id,
+                    'title': case.title,
+                    'status': case.status,
+                    'identifier': case.identifier,
+                    'error': case.error,
+                    'elapsed_ms': result.elapsed_ms
+                })
+            
+            payload, status = _run_linear_upload(project_id, project, api_key, parent_issue_id,
+                                                 batch_size, on_case_result=publish_case)
+            if status != 200:
+                raise RuntimeError(payload.get('error', 'Error subiendo a Linear'))
+            return payload
+        
+        # Una sola operación con Linear por proyecto (comprobación y registro atómicos):
+        # si ya hay una subida se devuelve esa; si hay una sincronización, 409
+        task, created = task_registry.start_unique('linear_upload', project_id, upload_task, LINEAR_TASK_GROUP)
+        if created:
+            print(f"[INFO] Subida a Linear en segundo plano: tarea {task.id}", flush=True)
+        elif task.kind != 'linear_upload':
+            return _linear_busy_response(task)
         
-        client = LinearAPIClient(api_key)
-        
-        # Verificar conexión
-        print("[INFO] Verificando conexion con Linear API...", flush=True)
-        if not client.test_connection():
-            print("[ERROR] No se pudo conectar con Linear", flush=True)
-            return jsonify({'error': 'No se pudo conectar con Linear. Verifica tu API Key'}), 400
-        print("[OK] Conexion exitosa con Linear API", flush=True)
-        
-        # Convertir casos al formato correcto
-        formatted_cases = []
-        for case in project['test_cases']:
-            if isinstance(case, dict):
-                formatted_cases.append(case)
-            else:
-                case_dict = {
-                    'test_case_id': str(getattr(case, 'id', f'TC-{len(formatted_cases)+1:03d}')),
-                    'title': str(getattr(case, 'title', 'Sin título')),
-                    'description': str(getattr(case, 'description', '')),
-                    'preconditions': str(getattr(case, 'preconditions', '')),
-                    'steps': str(getattr(case, 'steps', '')),
-                    'expected_result': str(getattr(case, 'expected_result', '')),
-                    'priority': str(getattr(case, 'priority', 'Media')),
-                    'type': str(getattr(case, 'type', 'Funcional'))
-                }
-                formatted_cases.append(case_dict)
-        
-        # Subir casos a Linear
-        print(f"[INFO] Llamando a upload_test_cases_as_subissues con {len(formatted_cases)} casos...", flush=True)
-        print(f"[INFO] Parent Issue ID: {parent_issue_id}", flush=True)
-        print(f"[INFO] Team ID: None (deteccion automatica)", flush=True)
-        print("="*80, flush=True)
-        sys.stdout.flush()
+        return jsonify({
+            'success': True,
+            'task_id': task.id,
+            'stream_url': url_for('linear_upload_progress', project_id=project_id, task_id=task.id)
+        }), 202
         
-        created_issues = client.upload_test_cases_as_subissues(
-            parent_issue_identifier=parent_issue_id,
-            test_cases=formatted_cases,
-            team_id=None  # Auto-detectar
-        )
+    except Exception as e:
+        print(f"[ERROR] Error subiendo a Linear: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/upload_to_linear/<project_id>/progress/<task_id>')
+def linear_upload_progress(project_id, task_id):
+    """Progreso de una subida en segundo plano como Server-Sent Events"""
+    task = task_registry.get(task_id)
+    if not task or task.owner_id != project_id:
+        return jsonify({'error': 'Tarea no encontrada'}), 404
+    
+    # El navegador reenvía Last-Event-ID al reconectar: solo se mandan los eventos nuevos
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        last_event_id = 0
+    
+    return Response(
+        stream_with_context(task.stream(last_event_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/sync_to_linear/<project_id>', methods=['POST'])
+def sync_to_linear(project_id):
+    """
+    Sincroniza los casos del proyecto con los sub-issues ya existentes en Linear
+
+    Por defecto es un dry-run: devuelve qué se crearía, actualizaría y archivaría.
+    Con {"dry_run": false} aplica solo esas mutaciones.
+    """
+    try:
+        project = qa_manager.get_project(project_id)
+        if not project:
+            return jsonify({'error': 'Proyecto no encontrado'}), 404
         
-        print("="*80, flush=True)
-        if created_issues:
-            print(f"[OK] {len(created_issues)} casos subidos exitosamente", flush=True)
-            print(f"[OK] IDs creados: {created_issues[:3]}... (mostrando primeros 3)", flush=True)
-            print("="*80, flush=True)
-            sys.stdout.flush()
-            return jsonify({
-                'success': True,
-                'message': f'{len(created_issues)} casos de prueba subidos exitosamente',
-                'created_issues': created_issues
-            })
-        else:
-            print("[ERROR] No se crearon issues en Linear")
-            print("="*80)
-            return jsonify({'error': 'No se pudieron crear los casos en Linear'}), 500
+        data = request.get_json() or {}
+        api_key = data.get('api_key', '').strip()
+        parent_issue_id = data.get('parent_issue_id', '').strip() or project.get('linear_hu_id', '')
+        
+        if not api_key:
+            return jsonify({'error': 'API Key de Linear es requerida'}), 400
+        
+        if not parent_issue_id:
+            return jsonify({'error': 'ID de Historia de Usuario es requerido'}), 400
+        
+        dry_run = data.get('dry_run', True) is not False
+        
+        # Aplicar la sincronización comparte turno con las subidas del proyecto
+        with task_registry.hold('linear_sync', project_id, LINEAR_TASK_GROUP) as (task, acquired):
+            if not acquired and not dry_run:
+                return _linear_busy_response(task)
+            
+            job = UploadJob.resume_or_create(project.get('linear_upload_job'), project_id, parent_issue_id)
+            client = LinearAPIClient(api_key)
+            plan = client.sync_test_cases(
+                parent_issue_identifier=parent_issue_id,
+                test_cases=_format_cases_for_linear(project.get('test_cases', [])),
+                job=job,
+                dry_run=dry_run,
+                archive_orphans=data.get('archive_orphans', True) is not False
+            )
+            if plan is None:
+                return jsonify({'error': f'No se encontró la HU {parent_issue_id} en Linear'}), 404
+            
+            if not dry_run:
+                qa_manager.update_project(project_id, linear_upload_job=job.to_dict())
+        
+        return jsonify({'success': plan.summary()['failed'] == 0, **plan.to_dict()})
         
     except Exception as e:
-        print(f"[ERROR] Error subiendo a Linear: {e}")
+        print(f"[ERROR] Error sincronizando con Linear: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+
 @app.route('/api/project/<project_id>/test_case/<test_case_id>', methods=['GET'])
 def get_test_case(project_id, test_case_id):
     """Obtiene los datos de un caso de prueba específico"""
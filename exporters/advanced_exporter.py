@@ -8,7 +8,6 @@ Soporte para Word, Linear y Excel con caracteres especiales
 import os
 import json
 import csv
-import pandas as pd
 from datetime import datetime
 from typing import List, Dict, Any
 from docx import Document
@@ -17,6 +16,13 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT
 from docx.oxml.shared import OxmlElement, qn
 
+try:
+    from .streaming_xlsx import write_xlsx, iter_excel_rows, build_xlsx_filename
+    from .fast_docx import FastDocxRenderer, build_docx_filename
+except ImportError:
+    from streaming_xlsx import write_xlsx, iter_excel_rows, build_xlsx_filename
+    from fast_docx import FastDocxRenderer, build_docx_filename
+
 class AdvancedExporter:
     """Exportador avanzado con soporte para Word, Linear y Excel mejorado"""
     
@@ -24,10 +30,19 @@ class AdvancedExporter:
         self.output_folder = output_folder
         os.makedirs(output_folder, exist_ok=True)
     
-    def export_to_word(self, test_cases: List[Dict], project_name: str, user_story: str = "") -> str:
+    def export_to_word(self, test_cases: List[Dict], project_name: str, user_story: str = "",
+                       fast: bool = True) -> str:
         """
         Exporta casos de prueba a Word con formato profesional
+
+        Por defecto usa el motor de plantilla (fast_docx), que genera el mismo documento
+        en bloque; fast=False construye el documento con el modelo de objetos de python-docx.
         """
+        if fast:
+            filepath = os.path.join(self.output_folder, build_docx_filename(project_name))
+            FastDocxRenderer().render(test_cases, project_name, user_story, filepath)
+            return filepath
+        
         doc = Document()
         
         # Configurar estilos
@@ -262,50 +277,12 @@ class AdvancedExporter:
     def export_to_excel_enhanced(self, test_cases: List[Dict], project_name: str) -> str:
         """
         Exporta a Excel con mejor formato y soporte para caracteres especiales
+
+        Usa un libro write-only (streaming_xlsx): celdas tipadas, encabezado congelado,
+        autofiltro y anchos calculados fila a fila, sin DataFrame intermedio.
         """
-        # Preparar datos
-        data = []
-        for tc in test_cases:
-            row = {
-                'ID': tc.get('id', ''),
-                'Título': tc.get('title', ''),
-                'Descripción': tc.get('description', ''),
-                'Tipo': tc.get('test_type', ''),
-                'Prioridad': tc.get('priority', ''),
-                'Precondiciones': '\n'.join(tc.get('preconditions', [])) if isinstance(tc.get('preconditions'), list) else tc.get('preconditions', ''),
-                'Pasos': '\n'.join([f"{i+1}. {step}" for i, step in enumerate(tc.get('steps', []))]) if isinstance(tc.get('steps'), list) else tc.get('steps', ''),
-                'Resultado Esperado': tc.get('expected_result', ''),
-                'Tags': ', '.join(tc.get('tags', [])),
-                'Historia de Usuario': tc.get('user_story', '')
-            }
-            data.append(row)
-        
-        # Crear DataFrame
-        df = pd.DataFrame(data)
-        
-        # Guardar con encoding UTF-8
-        filename = f"casos_prueba_{project_name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
-        filepath = os.path.join(self.output_folder, filename)
-        
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Casos de Prueba', index=False)
-            
-            # Obtener la hoja de trabajo
-            worksheet = writer.sheets['Casos de Prueba']
-            
-            # Ajustar ancho de columnas
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        
+        filepath = os.path.join(self.output_folder, build_xlsx_filename(project_name))
+        write_xlsx(iter_excel_rows(test_cases), filepath)
         return filepath
 
 def main():
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exportación en Paquete ZIP (Varios Proyectos o Varios Formatos)
+Genera las exportaciones (CSV, CSV de Linear, Excel, Word, Gherkin) en un pool de procesos
+y las escribe en un ZIP que se transmite a medida que se arma, sin archivos temporales.
+- ExportBundle: varios proyectos, uno por worker; en memoria solo los que se renderizan.
+- MultiFormatExport: un proyecto, un worker por formato; tarda lo que el formato más lento.
+"""
+
+import io
+import os
+import time
+import pickle
+import zipfile
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from .streaming_csv import iter_csv_bytes, iter_project_rows, PROJECT_CSV_FIELDNAMES
+    from .streaming_xlsx import write_xlsx, iter_excel_rows, build_xlsx_filename
+    from .linear_simple_exporter import LinearSimpleExporter
+    from .feature_exporter import render_feature, feature_filename
+except ImportError:
+    from streaming_csv import iter_csv_bytes, iter_project_rows, PROJECT_CSV_FIELDNAMES
+    from streaming_xlsx import write_xlsx, iter_excel_rows, build_xlsx_filename
+    from linear_simple_exporter import LinearSimpleExporter
+    from feature_exporter import render_feature, feature_filename
+
+try:
+    try:
+        from .fast_docx import FastDocxRenderer, build_docx_filename
+    except ImportError:
+        from fast_docx import FastDocxRenderer, build_docx_filename
+except ImportError:
+    # python-docx es opcional: sin él el formato docx no está disponible
+    FastDocxRenderer = None
+
+# Procesos que renderizan proyectos en paralelo (0 = en el mismo proceso, en un hilo aparte;
+# sin definir o vacío = uno por CPU)
+_bundle_workers = os.environ.get('QA_BUNDLE_WORKERS', '')
+BUNDLE_WORKERS = int(_bundle_workers) if _bundle_workers.strip() else (os.cpu_count() or 1)
+
+# Tamaño aproximado de los bloques del ZIP enviados al cliente
+BUNDLE_CHUNK_BYTES = 64 * 1024
+
+
+# ==================== FORMATOS ====================
+# Cada formato recibe el payload de un proyecto y devuelve (nombre de archivo, bytes).
+# El payload es un dict serializable: project_id, name, user_story y test_cases ya
+# normalizados al formato del almacén (CompactTestCase.to_dict).
+
+def _render_csv(payload: Dict[str, Any]) -> Tuple[str, bytes]:
+    data = b''.join(iter_csv_bytes(iter_project_rows(payload['test_cases']), PROJECT_CSV_FIELDNAMES))
+    return f"proyecto_{payload['project_id']}_casos.csv", data
+
+
+def _render_linear_csv(payload: Dict[str, Any]) -> Tuple[str, bytes]:
+    filename, chunks = LinearSimpleExporter().stream_linear_csv(
+        payload['test_cases'], f"proyecto_{payload['project_id']}", payload.get('user_story', ''))
+    return filename, b''.join(chunks)
+
+
+def _render_xlsx(payload: Dict[str, Any]) -> Tuple[str, bytes]:
+    buffer = io.BytesIO()
+    write_xlsx(iter_excel_rows(payload['test_cases']), buffer)
+    return build_xlsx_filename(payload['name']), buffer.getvalue()
+
+
+def _render_docx(payload: Dict[str, Any]) -> Tuple[str, bytes]:
+    if FastDocxRenderer is None:
+        raise RuntimeError("La exportación a Word requiere python-docx")
+    buffer = io.BytesIO()
+    FastDocxRenderer().render(payload['test_cases'], payload['name'], payload.get('user_story', ''), buffer)
+    return build_docx_filename(payload['name']), buffer.getvalue()
+
+
+def _render_gherkin(payload: Dict[str, Any]) -> Tuple[str, bytes]:
+    text = render_feature(payload['name'], payload['test_cases'], payload.get('user_story', ''))
+    return feature_filename(payload['name']), text.encode('utf-8')
+
+
+# formato -> (renderizador, compresión dentro del ZIP; xlsx y docx ya vienen comprimidos)
+BUNDLE_FORMATS: Dict[str, Tuple[Callable[[Dict[str, Any]], Tuple[str, bytes]], int]] = {
+    'csv': (_render_csv, zipfile.ZIP_DEFLATED),
+    'linear_csv': (_render_linear_csv, zipfile.ZIP_DEFLATED),
+    'xlsx': (_render_xlsx, zipfile.ZIP_STORED),
+    'docx': (_render_docx, zipfile.ZIP_STORED),
+    'gherkin': (_render_gherkin, zipfile.ZIP_DEFLATED),
+}
+
+
+def project_folder(payload: Dict[str, Any]) -> str:
+    """Carpeta del proyecto dentro del ZIP (nombre legible + id para evitar choques)"""
+    name = "".join(c if (c.isascii() and c.isalnum()) or c in ('-', '_') else '_' for c in payload['name'])
+    return f"{name.strip('_') or 'proyecto'}_{payload['project_id']}"
+
+
+def render_project(payload: Dict[str, Any], formats: Sequence[str]) -> Tuple[List[Tuple[str, bytes, int]], float]:
+    """Tarea del pool: renderiza todos los formatos de un proyecto -> (entradas, segundos)"""
+    started = time.perf_counter()
+    folder = project_folder(payload)
+    entries = []
+    for fmt in formats:
+        render, compress_type = BUNDLE_FORMATS[fmt]
+        try:
+            filename, data = render(payload)
+        except Exception as e:
+            # Un formato que falla no aborta el paquete: queda registrado dentro del ZIP
+            filename, data, compress_type = f"ERROR_{fmt}.txt", f"{e}\n".encode('utf-8'), zipfile.ZIP_DEFLATED
+        entries.append((f"{folder}/{filename}", data, compress_type))
+    return entries, time.perf_counter() - started
+
+
+def render_format(payload_blob: bytes, fmt: str) -> Tuple[str, bytes, int, float]:
+    """
+    Tarea del pool: renderiza un formato de un proyecto -> (archivo, bytes, compresión, segundos)
+
+    El payload llega ya serializado con pickle: se convierte una vez en el proceso
+    principal y todos los formatos reciben los mismos bytes.
+    """
+    started = time.perf_counter()
+    render, compress_type = BUNDLE_FORMATS[fmt]
+    filename, data = render(pickle.loads(payload_blob))
+    return filename, data, compress_type, time.perf_counter() - started
+
+
+_export_pool: Optional[ProcessPoolExecutor] = None
+_export_pool_lock = threading.Lock()
+
+
+def get_export_pool() -> ProcessPoolExecutor:
+    """Pool de procesos compartido por las exportaciones (se crea la primera vez y se reutiliza)"""
+    global _export_pool
+    with _export_pool_lock:
+        if _export_pool is None:
+            _export_pool = ProcessPoolExecutor(max_workers=max(1, BUNDLE_WORKERS))
+        return _export_pool
+
+
+# ==================== ZIP EN STREAMING ====================
+
+class _ZipStream:
+    """
+    Destino de zipfile sin seek: acumula lo escrito hasta vaciarse
+
+    Al no poder posicionarse, zipfile escribe cada entrada con data descriptor,
+    así el ZIP se puede enviar mientras se construye.
+    """
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.parts.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self.parts)
+        self.parts = []
+        self.size = 0
+        return data
+
+
+class ExportBundle:
+    """
+    Paquete ZIP de varios proyectos
+
+    Los proyectos se envían al pool compartido a medida que se consumen del iterador, con
+    como máximo `workers` en vuelo; las entradas se escriben en el ZIP en el orden de los
+    proyectos, así la salida es determinista.
+    """
+
+    def __init__(self, formats: Sequence[str], workers: int = BUNDLE_WORKERS,
+                 chunk_bytes: int = BUNDLE_CHUNK_BYTES, executor=None):
+        unknown = [fmt for fmt in formats if fmt not in BUNDLE_FORMATS]
+        if unknown:
+            raise ValueError(f"Formatos no soportados: {', '.join(unknown)}")
+        self.formats = list(dict.fromkeys(formats))
+        self.workers = max(0, workers)
+        self.chunk_bytes = chunk_bytes
+        self.executor = executor
+        self.projects = 0
+        self.entries = 0
+        self.bytes_sent = 0
+        self.render_seconds = 0.0
+
+    def iter_bytes(self, payloads: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+        """Bloques del ZIP; cada proyecto se lee del iterador solo cuando hay un worker libre"""
+        started = time.perf_counter()
+        # El pool de procesos es compartido (no se cierra aquí); sin workers se usa un hilo propio
+        owned = None
+        if self.executor is not None:
+            executor = self.executor
+        elif self.workers:
+            executor = get_export_pool()
+        else:
+            executor = owned = ThreadPoolExecutor(max_workers=1)
+        stream = _ZipStream()
+        in_flight: deque = deque()
+        iterator = iter(payloads)
+        try:
+            with zipfile.ZipFile(stream, 'w') as bundle:
+                while True:
+                    while len(in_flight) < max(1, self.workers):
+                        payload = next(iterator, None)
+                        if payload is None:
+                            break
+                        in_flight.append(executor.submit(render_project, payload, self.formats))
+                    if not in_flight:
+                        break
+
+                    entries, seconds = in_flight.popleft().result()
+                    self.projects += 1
+                    self.render_seconds += seconds
+                    for arcname, data, compress_type in entries:
+                        _write_entry(bundle, arcname, data, compress_type)
+                        self.entries += 1
+                        if stream.size >= self.chunk_bytes:
+                            yield self._send(stream)
+                    del entries
+            if stream.size:
+                yield self._send(stream)
+        finally:
+            # Cliente desconectado o error: se descartan los proyectos aún en cola sin
+            # esperar a los que ya se están renderizando
+            for future in in_flight:
+                future.cancel()
+            if owned is not None:
+                owned.shutdown(wait=False)
+            print(f"[INFO] Paquete de exportación: {self.projects} proyectos, {self.entries} archivos, "
+                  f"{self.bytes_sent // 1024} KB en {time.perf_counter() - started:.2f}s "
+                  f"(render {self.render_seconds:.2f}s, {self.workers} workers)", flush=True)
+
+    def _send(self, stream: _ZipStream) -> bytes:
+        data = stream.drain()
+        self.bytes_sent += len(data)
+        return data
+
+
+def _write_entry(bundle: zipfile.ZipFile, arcname: str, data: bytes, compress_type: int):
+    info = zipfile.ZipInfo(arcname, date_time=datetime.now().timetuple()[:6])
+    info.compress_type = compress_type
+    info.external_attr = 0o644 << 16
+    bundle.writestr(info, data)
+
+
+def iter_zip_entries(entries: Iterable[Tuple[str, bytes, int]]) -> Iterator[bytes]:
+    """ZIP en streaming a partir de (archivo, bytes, compresión); un bloque por entrada"""
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w') as bundle:
+        for arcname, data, compress_type in entries:
+            _write_entry(bundle, arcname, data, compress_type)
+            yield stream.drain()
+    yield stream.drain()
+
+
+def _run_inline(fn, *args) -> Future:
+    future: Future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+class MultiFormatExport:
+    """
+    Varios formatos de un mismo proyecto en paralelo
+
+    Los casos del proyecto se convierten una sola vez (payload normalizado + pickle) y
+    cada formato se renderiza en su propio worker del pool compartido.
+    """
+
+    def __init__(self, formats: Sequence[str], executor=None):
+        unknown = [fmt for fmt in formats if fmt not in BUNDLE_FORMATS]
+        if unknown:
+            raise ValueError(f"Formatos no soportados: {', '.join(unknown)}")
+        self.formats = list(dict.fromkeys(formats))
+        self.executor = executor
+        self.timings: Dict[str, float] = {}
+
+    def render(self, payload: Dict[str, Any]) -> List[Tuple[str, bytes, int]]:
+        """(archivo, bytes, compresión) de cada formato, en el orden pedido"""
+        blob = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(self.formats) == 1:
+            # Un solo formato: no compensa pasar por el pool
+            futures = {self.formats[0]: _run_inline(render_format, blob, self.formats[0])}
+        else:
+            executor = self.executor or get_export_pool()
+            futures = {fmt: executor.submit(render_format, blob, fmt) for fmt in self.formats}
+        results = {}
+        for fmt, future in futures.items():
+            try:
+                results[fmt] = future.result()
+            except Exception as e:
+                # Un formato que falla no aborta el resto: queda registrado dentro del ZIP
+                results[fmt] = (f"ERROR_{fmt}.txt", f"{e}\n".encode('utf-8'), zipfile.ZIP_DEFLATED, 0.0)
+        entries = []
+        for fmt in self.formats:
+            filename, data, compress_type, seconds = results[fmt]
+            self.timings[fmt] = seconds
+            entries.append((filename, data, compress_type))
+        return entries
+
+    def iter_zip(self, payload: Dict[str, Any]) -> Iterator[bytes]:
+        """ZIP con un archivo por formato"""
+        started = time.perf_counter()
+        yield from iter_zip_entries(self.render(payload))
+        timings = ', '.join(f"{fmt} {seconds:.2f}s" for fmt, seconds in self.timings.items())
+        print(f"[INFO] Exportación multiformato de {payload['project_id']}: {time.perf_counter() - started:.2f}s "
+              f"({timings})", flush=True)
+
+
+def multi_format_filename(project_id: str) -> str:
+    return f"proyecto_{project_id}_exportacion.zip"
+
+
+def bundle_filename() -> str:
+    return f"exportacion_proyectos_{datetime.now().strftime('%Y%m%d_%H%M')}.zip"
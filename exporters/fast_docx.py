@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor Rápido de Reportes Word (DOCX)
+Construye una sola vez, con python-docx, una plantilla con marcadores y un prototipo XML
+de cada bloque del reporte (título de caso, tabla de datos, subtítulo, paso, separador).
+Cada exportación solo rellena esos fragmentos como texto y escribe el cuerpo en bloque,
+sin pasar por el modelo de objetos de python-docx por cada caso.
+"""
+
+import io
+import re
+import tempfile
+import threading
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.enum.table import WD_TABLE_ALIGNMENT
+from docx.shared import Pt
+from lxml import etree
+
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# Tamaño de los bloques leídos del archivo temporal al transmitir
+DOCX_CHUNK_BYTES = 64 * 1024
+
+# Casos renderizados antes de escribir al ZIP (acota la memoria del cuerpo)
+DOCX_FLUSH_CASES = 200
+
+_DOCUMENT_PART = 'word/document.xml'
+_PLACEHOLDER = re.compile(r'\{\{(\w+)\}\}')
+_NAMESPACE_DECLARATION = re.compile(r'\s+xmlns:\w+="[^"]*"')
+_ILLEGAL_XML_CHARS = dict.fromkeys(c for c in range(32) if c not in (9, 10, 13))
+_TEXT_OPEN = '<w:t xml:space="preserve">'
+
+
+def _xml_text(value: Any) -> str:
+    """Texto escapado para <w:t>; los saltos de línea se convierten en <w:br/> como en python-docx"""
+    text = '' if value is None else str(getattr(value, 'value', value))
+    text = text.translate(_ILLEGAL_XML_CHARS).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    if '\n' in text or '\t' in text:
+        text = text.replace('\r', '').replace('\n', f'</w:t><w:br/>{_TEXT_OPEN}').replace('\t', f'</w:t><w:tab/>{_TEXT_OPEN}')
+    return text
+
+
+class _Fragment:
+    """Fragmento XML con marcadores {{nombre}} ya partido para rellenarlo con un join"""
+
+    def __init__(self, xml: str):
+        parts = _PLACEHOLDER.split(xml)
+        self.literals = parts[0::2]
+        self.names = parts[1::2]
+
+    def render(self, **values: Any) -> str:
+        out = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            out.append(_xml_text(values.get(name, '')))
+            out.append(literal)
+        return ''.join(out)
+
+
+class DocxReportTemplate:
+    """
+    Plantilla del reporte de casos de prueba
+
+    Se genera con python-docx (mismos estilos y estructura que AdvancedExporter.export_to_word)
+    y se guarda como: partes del paquete DOCX, document.xml con marcadores y fragmentos.
+    """
+
+    def __init__(self):
+        doc = Document()
+        self._setup_document_styles(doc)
+
+        title = doc.add_heading('Casos de Prueba: {{project_name}}', 0)
+        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        user_story_marker = doc.add_paragraph('')
+
+        doc.add_heading('Resumen', level=1)
+        summary_table = doc.add_table(rows=1, cols=2)
+        summary_table.style = 'Table Grid'
+        summary_table.alignment = WD_TABLE_ALIGNMENT.CENTER
+        hdr_cells = summary_table.rows[0].cells
+        hdr_cells[0].text = 'Métrica'
+        hdr_cells[1].text = 'Valor'
+        for metric, value in [('Total de Casos', '{{total}}'), ('Fecha de Generación', '{{generated_at}}'),
+                              ('Casos Funcionales', '{{functional}}'), ('Casos de Integración', '{{integration}}'),
+                              ('Casos Negativos', '{{negative}}'), ('Casos Límite', '{{edge}}')]:
+            row_cells = summary_table.add_row().cells
+            row_cells[0].text = metric
+            row_cells[1].text = value
+
+        doc.add_heading('Casos de Prueba Detallados', level=1)
+        test_cases_marker = doc.add_paragraph('')
+
+        # Prototipos de cada bloque (se crean en el mismo documento para heredar estilos y se retiran)
+        prototypes = {
+            'heading1': doc.add_heading('{{text}}', level=1)._p,
+            'heading3': doc.add_heading('{{text}}', level=3)._p,
+            'case_title': doc.add_heading('TC-{{number}}: {{title}}', level=2)._p,
+            'info_table': self._info_table_prototype(doc)._tbl,
+            'paragraph': doc.add_paragraph('{{text}}')._p,
+            'list_item': doc.add_paragraph('{{text}}', style='List Number')._p,
+            'separator': doc.add_paragraph('─' * 50)._p,
+        }
+        self.fragments = {name: _Fragment(self._serialize(element)) for name, element in prototypes.items()}
+        for element in prototypes.values():
+            element.getparent().remove(element)
+
+        for name, marker in (('user_story', user_story_marker), ('test_cases', test_cases_marker)):
+            marker._p.addprevious(etree.Comment(f'@{name}'))
+            marker._p.getparent().remove(marker._p)
+
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        self.parts: List[Tuple[zipfile.ZipInfo, bytes]] = []
+        with zipfile.ZipFile(buffer) as package:
+            for info in package.infolist():
+                data = package.read(info.filename)
+                if info.filename == _DOCUMENT_PART:
+                    document_xml = data.decode('utf-8').replace('<w:t>', _TEXT_OPEN)
+                self.parts.append((info, data))
+
+        # document.xml partido en: antes de la historia, entre historia y casos, después de los casos
+        head, rest = document_xml.split('<!--@user_story-->')
+        middle, tail = rest.split('<!--@test_cases-->')
+        self.head = _Fragment(head)
+        self.middle = _Fragment(middle)
+        self.tail = tail
+
+    @staticmethod
+    def _setup_document_styles(doc):
+        """Estilo 'Test Case Title' (se busca una sola vez, al construir la plantilla)"""
+        styles = doc.styles
+        if 'Test Case Title' not in [style.name for style in styles]:
+            test_case_style = styles.add_style('Test Case Title', 1)
+            test_case_style.font.name = 'Arial'
+            test_case_style.font.size = Pt(14)
+            test_case_style.font.bold = True
+            test_case_style.font.color.rgb = None
+
+    @staticmethod
+    def _info_table_prototype(doc):
+        info_table = doc.add_table(rows=4, cols=2)
+        info_table.style = 'Table Grid'
+        info_table.alignment = WD_TABLE_ALIGNMENT.LEFT
+        for i, (label, value) in enumerate([('ID:', '{{id}}'), ('Tipo:', '{{test_type}}'),
+                                            ('Prioridad:', '{{priority}}'), ('Tags:', '{{tags}}')]):
+            info_table.rows[i].cells[0].text = label
+            info_table.rows[i].cells[1].text = value
+        return info_table
+
+    @staticmethod
+    def _serialize(element) -> str:
+        # Los namespaces ya están declarados en la raíz de document.xml
+        xml = etree.tostring(element, encoding='unicode')
+        return _NAMESPACE_DECLARATION.sub('', xml).replace('<w:t>', _TEXT_OPEN)
+
+
+_template: Optional[DocxReportTemplate] = None
+_template_lock = threading.Lock()
+
+
+def get_report_template() -> DocxReportTemplate:
+    """Plantilla compartida (se construye la primera vez que se usa)"""
+    global _template
+    with _template_lock:
+        if _template is None:
+            _template = DocxReportTemplate()
+        return _template
+
+
+class FastDocxRenderer:
+    """Renderiza el reporte Word de un proyecto a partir de la plantilla precompilada"""
+
+    def __init__(self, template: Optional[DocxReportTemplate] = None, flush_cases: int = DOCX_FLUSH_CASES):
+        self.template = template or get_report_template()
+        self.flush_cases = max(1, flush_cases)
+
+    def _render_case(self, test_case: Dict[str, Any], case_number: int, out: List[str]):
+        """Mismos bloques y orden que AdvancedExporter._add_test_case_to_doc"""
+        f = self.template.fragments
+        out.append(f['case_title'].render(number=f'{case_number:03d}', title=test_case.get('title', 'Sin título')))
+        out.append(f['info_table'].render(
+            id=test_case.get('id', 'N/A'),
+            test_type=test_case.get('test_type', 'N/A'),
+            priority=test_case.get('priority', 'N/A'),
+            tags=', '.join(test_case.get('tags', []))
+        ))
+
+        if test_case.get('description'):
+            out.append(f['heading3'].render(text='Descripción'))
+            out.append(f['paragraph'].render(text=test_case['description']))
+
+        for key, heading in (('preconditions', 'Precondiciones'), ('steps', 'Pasos de Ejecución')):
+            if test_case.get(key):
+                out.append(f['heading3'].render(text=heading))
+                items = test_case[key]
+                if isinstance(items, list):
+                    for i, item in enumerate(items, 1):
+                        out.append(f['list_item'].render(text=f'{i}. {item}'))
+                else:
+                    out.append(f['paragraph'].render(text=items))
+
+        if test_case.get('expected_result'):
+            out.append(f['heading3'].render(text='Resultado Esperado'))
+            out.append(f['paragraph'].render(text=test_case['expected_result']))
+
+        out.append(f['separator'].render())
+
+    @staticmethod
+    def _summary(test_cases: Sequence[Dict[str, Any]]) -> Dict[str, int]:
+        counts = {'funcional': 0, 'integración': 0, 'negativo': 0, 'caso límite': 0}
+        for tc in test_cases:
+            test_type = str(tc.get('test_type', '')).lower()
+            if test_type in counts:
+                counts[test_type] += 1
+        return counts
+
+    def render(self, test_cases: Sequence[Dict[str, Any]], project_name: str, user_story: str, target) -> int:
+        """Escribe el DOCX en una ruta o archivo binario y devuelve cuántos casos incluyó"""
+        template = self.template
+        counts = self._summary(test_cases)
+        user_story_xml = ''
+        if user_story:
+            user_story_xml = (template.fragments['heading1'].render(text='Historia de Usuario')
+                              + template.fragments['paragraph'].render(text=user_story))
+
+        with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) as package:
+            for info, data in template.parts:
+                if info.filename != _DOCUMENT_PART:
+                    package.writestr(info, data, compress_type=zipfile.ZIP_DEFLATED)
+                    continue
+                with package.open(_DOCUMENT_PART, 'w', force_zip64=True) as document:
+                    document.write(template.head.render(project_name=project_name).encode('utf-8'))
+                    document.write(user_story_xml.encode('utf-8'))
+                    document.write(template.middle.render(
+                        total=len(test_cases),
+                        generated_at=datetime.now().strftime('%d/%m/%Y %H:%M'),
+                        functional=counts['funcional'],
+                        integration=counts['integración'],
+                        negative=counts['negativo'],
+                        edge=counts['caso límite']
+                    ).encode('utf-8'))
+                    out: List[str] = []
+                    for number, test_case in enumerate(test_cases, 1):
+                        self._render_case(test_case, number, out)
+                        if number % self.flush_cases == 0:
+                            document.write(''.join(out).encode('utf-8'))
+                            out = []
+                    document.write(''.join(out).encode('utf-8'))
+                    document.write(template.tail.encode('utf-8'))
+        return len(test_cases)
+
+
+def build_docx_filename(project_name: str) -> str:
+    """Nombre de archivo con el mismo formato que AdvancedExporter.export_to_word"""
+    return f"casos_prueba_{project_name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M')}.docx"
+
+
+def iter_docx_bytes(test_cases: Sequence[Dict[str, Any]], project_name: str, user_story: str = "",
+                    chunk_bytes: int = DOCX_CHUNK_BYTES) -> Iterator[bytes]:
+    """Genera el DOCX en un archivo temporal y lo devuelve en bloques"""
+    with tempfile.TemporaryFile() as temp:
+        FastDocxRenderer().render(test_cases, project_name, user_story, temp)
+        temp.seek(0)
+        while True:
+            chunk = temp.read(chunk_bytes)
+            if not chunk:
+                break
+            yield chunk
+
+
+def stream_word_report(test_cases: Sequence[Dict[str, Any]], project_name: str,
+                       user_story: str = "") -> Tuple[str, Iterator[bytes]]:
+    """(filename, bloques) del reporte Word de un proyecto, listo para una respuesta en streaming"""
+    safe_name = "".join(c for c in project_name if (c.isascii() and c.isalnum()) or c in (' ', '-', '_', '.'))
+    return build_docx_filename(safe_name or 'proyecto'), iter_docx_bytes(test_cases, project_name, user_story)
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exportador de Archivos .feature (Gherkin)
+Convierte casos de prueba en archivos .feature para los runners BDD:
+- Agrupa los escenarios por feature / historia de usuario (un archivo por feature).
+- Sube a Background los pasos Given que comparten todos los escenarios de la feature.
+- Une en un Scenario Outline con tabla Examples los escenarios que solo difieren en
+  valores (textos entre comillas y números) y descarta los escenarios repetidos.
+Acepta los casos guardados del almacén (dicts) y los GherkinTestCase /
+EnhancedGherkinTestCase de los generadores.
+"""
+
+import os
+import re
+import zipfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+# Numeración que el generador antepone a los pasos ("1. ", "2) ")
+_STEP_NUMBER = re.compile(r'^\s*\d+[.)]\s*')
+
+# Palabra clave que algunos generadores ya incluyen en el paso ("Given que ...", "And ...")
+_STEP_KEYWORD = re.compile(r'^(Given|When|Then|And|But)\s+')
+
+# Valores que pueden pasar a una columna de Examples: texto entre comillas o número
+_PARAM_VALUE = re.compile(r'"([^"\n]*)"|\'([^\'\n]*)\'|(?<![\w<])(\d+(?:[.,]\d+)?)(?![\w>])')
+
+# Escenarios con parámetros explícitos (mismo criterio que GherkinGenerator._has_parameters)
+_OUTLINE_PARAM = re.compile(r'<[^<>\n]+>')
+
+# Mínimo de escenarios equivalentes para unirlos en un Scenario Outline
+MIN_OUTLINE_ROWS = 2
+
+# Ids de casos de origen que se listan en el comentario de cada escenario
+MAX_COMMENT_IDS = 10
+
+
+def _lines(value: Any) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        items = [str(item) for item in value]
+    else:
+        items = str(value or '').split('\n')
+    return [_STEP_KEYWORD.sub('', _STEP_NUMBER.sub('', item).strip()) for item in items if item and item.strip()]
+
+
+def _tag(tag: str) -> str:
+    tag = str(tag).strip().replace(' ', '_')
+    return tag if tag.startswith('@') else f'@{tag}'
+
+
+def _keyword_lines(keyword: str, items: List[str], indent: str) -> Iterator[str]:
+    for index, item in enumerate(items):
+        yield f"{indent}{keyword if index == 0 else 'And'} {item}"
+
+
+def _has_parameters(steps: Iterable[str]) -> bool:
+    return any(_OUTLINE_PARAM.search(step) for step in steps)
+
+
+# ==================== MODELO ====================
+
+@dataclass
+class FeatureScenario:
+    """Escenario listo para escribir (Scenario o Scenario Outline si tiene examples)"""
+    title: str
+    given: List[str] = field(default_factory=list)
+    when: List[str] = field(default_factory=list)
+    then: List[str] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+    examples: Dict[str, List[str]] = field(default_factory=dict)  # columna -> valores
+    case_ids: List[str] = field(default_factory=list)  # casos de origen (se escriben como comentario)
+
+    @property
+    def is_outline(self) -> bool:
+        return bool(self.examples)
+
+
+@dataclass
+class Feature:
+    """Una feature con su Background y sus escenarios"""
+    name: str
+    description: str = ''
+    background: List[str] = field(default_factory=list)
+    scenarios: List[FeatureScenario] = field(default_factory=list)
+    source_cases: int = 0
+    duplicates_removed: int = 0
+
+
+def _case_value(test_case: Any, name: str, default: Any = None) -> Any:
+    if isinstance(test_case, dict):
+        return test_case.get(name, default)
+    return getattr(test_case, name, default)
+
+
+def scenario_from_case(test_case: Any) -> FeatureScenario:
+    """
+    Escenario de un caso guardado o de un caso de los generadores Gherkin
+
+    Un caso del almacén aporta precondiciones (Given), pasos (When) y resultado esperado
+    (Then); un GherkinTestCase aporta sus pasos y, si es Scenario Outline, sus examples.
+    """
+    if _case_value(test_case, 'given_steps') is not None or _case_value(test_case, 'when_steps') is not None:
+        given = _lines(_case_value(test_case, 'given_steps') or [])
+        when = _lines(_case_value(test_case, 'when_steps') or [])
+        then = _lines(_case_value(test_case, 'then_steps') or [])
+        title = (_case_value(test_case, 'scenario_outline') or _case_value(test_case, 'scenario')
+                 or _case_value(test_case, 'title') or '')
+    else:
+        given = _lines(_case_value(test_case, 'preconditions'))
+        when = _lines(_case_value(test_case, 'steps'))
+        then = _lines(_case_value(test_case, 'expected_result'))
+        title = _case_value(test_case, 'title') or ''
+
+    examples = {}
+    raw_examples = _case_value(test_case, 'examples') or {}
+    if raw_examples and _has_parameters(given + when + then):
+        rows = min(len(values) for values in raw_examples.values())
+        examples = {str(column): [str(value) for value in values[:rows]] for column, values in raw_examples.items()}
+
+    case_id = str(_case_value(test_case, 'id') or '')
+    return FeatureScenario(
+        title=str(title).strip() or case_id or 'Sin título',
+        given=given, when=when, then=then,
+        tags=[_tag(tag) for tag in (_case_value(test_case, 'tags') or []) if str(tag).strip()],
+        examples=examples,
+        case_ids=[case_id] if case_id else []
+    )
+
+
+# ==================== AGRUPACIÓN ====================
+
+def _feature_name(test_case: Any, default: str) -> str:
+    return str(_case_value(test_case, 'feature') or _case_value(test_case, 'user_story') or default).strip() or default
+
+
+def _common_prefix(lists: List[List[str]]) -> List[str]:
+    prefix = []
+    for items in zip(*lists):
+        if any(item != items[0] for item in items[1:]):
+            break
+        prefix.append(items[0])
+    return prefix
+
+
+def _hoist_background(feature: Feature):
+    """Pasa al Background los pasos Given iniciales que comparten todos los escenarios"""
+    scenarios = feature.scenarios
+    if len(scenarios) < 2:
+        return
+    shared = _common_prefix([scenario.given for scenario in scenarios])
+    # Un paso con parámetros del Outline no puede ir al Background
+    shared = shared[:next((i for i, step in enumerate(shared) if _OUTLINE_PARAM.search(step)), len(shared))]
+    if shared:
+        for scenario in scenarios:
+            scenario.given = scenario.given[len(shared):]
+        feature.background = shared
+
+
+def _shape(scenario: FeatureScenario) -> Tuple[Tuple, List[Tuple[str, str]]]:
+    """Forma del escenario (pasos sin sus valores) y los valores en orden como (tipo, valor)"""
+    values: List[Tuple[str, str]] = []
+
+    def mark(match):
+        if match.group(3) is not None:
+            values.append(('n', match.group(3)))
+            return '\x00n'
+        quote = '"' if match.group(1) is not None else "'"
+        values.append((quote, match.group(1) if match.group(1) is not None else match.group(2)))
+        return f'\x00{quote}'
+
+    sections = tuple(tuple(_PARAM_VALUE.sub(mark, step) for step in steps)
+                     for steps in (scenario.given, scenario.when, scenario.then))
+    return (sections, tuple(scenario.tags)), values
+
+
+def _fill(template: str, replacements: Iterator[str]) -> str:
+    return re.sub(r'\x00[n"\']', lambda _: next(replacements), template)
+
+
+def _outline_title(titles: List[str], rows: List[Tuple[str, ...]], columns: Dict[int, str]) -> str:
+    """Título con <paramN> donde cada escenario tenía el valor de esa columna; si no, el prefijo común"""
+    templates = set()
+    for title, row in zip(titles, rows):
+        by_value = {row[i]: name for i, name in columns.items()}
+
+        def placeholder(match):
+            value = next(group for group in match.groups() if group is not None)
+            if value not in by_value:
+                return match.group(0)
+            return match.group(0).replace(value, f"<{by_value[value]}>")
+
+        templates.add(_PARAM_VALUE.sub(placeholder, title))
+    if len(templates) == 1:
+        return templates.pop()
+    prefix = os.path.commonprefix(titles).rsplit(' ', 1)[0].strip(' -:,')
+    return prefix if len(prefix) >= 12 else titles[0]
+
+
+def _collapse_scenarios(feature: Feature):
+    """Une escenarios que solo difieren en valores en un Scenario Outline y quita los repetidos"""
+    groups: Dict[Tuple, List[Tuple[FeatureScenario, List[Tuple[str, str]]]]] = {}
+    order: List[Any] = []
+    for scenario in feature.scenarios:
+        if scenario.is_outline:
+            order.append(scenario)
+            continue
+        key, values = _shape(scenario)
+        if key not in groups:
+            groups[key] = []
+            order.append(key)
+        groups[key].append((scenario, values))
+
+    collapsed: List[FeatureScenario] = []
+    for item in order:
+        if isinstance(item, FeatureScenario):
+            collapsed.append(item)
+            continue
+        members = groups[item]
+        distinct: Dict[Tuple[str, ...], FeatureScenario] = {}
+        for scenario, values in members:
+            row = tuple(value for _, value in values)
+            if row in distinct:
+                distinct[row].case_ids.extend(scenario.case_ids)
+                feature.duplicates_removed += 1
+            else:
+                distinct[row] = scenario
+        if len(distinct) < MIN_OUTLINE_ROWS:
+            collapsed.append(next(iter(distinct.values())))
+            continue
+
+        rows = list(distinct)
+        kinds = [kind for kind, _ in members[0][1]]
+        varying = [i for i in range(len(kinds)) if len({row[i] for row in rows}) > 1]
+        columns = {i: f"param{n}" for n, i in enumerate(varying, 1)}
+        first = next(iter(distinct.values()))
+
+        def replacement(i: int) -> str:
+            value = f"<{columns[i]}>" if i in columns else rows[0][i]
+            return value if kinds[i] == 'n' else f"{kinds[i]}{value}{kinds[i]}"
+
+        templated = iter([replacement(i) for i in range(len(kinds))])
+        sections, _ = item
+        given, when, then = ([_fill(step, templated) for step in steps] for steps in sections)
+        collapsed.append(FeatureScenario(
+            title=_outline_title([scenario.title for scenario in distinct.values()], rows, columns),
+            given=given, when=when, then=then, tags=list(first.tags),
+            examples={columns[i]: [row[i] for row in rows] for i in varying},
+            case_ids=[case_id for scenario in distinct.values() for case_id in scenario.case_ids]
+        ))
+    feature.scenarios = collapsed
+
+
+def build_features(test_cases: Iterable[Any], default_feature: str, description: str = '',
+                   group: bool = True) -> List[Feature]:
+    """
+    Agrupa los casos en features listas para escribir
+
+    Args:
+        test_cases: Casos del almacén (dicts) o GherkinTestCase / EnhancedGherkinTestCase
+        default_feature: Nombre de la feature de los casos sin feature ni historia de usuario
+        description: Texto bajo "Feature:" (solo si todo queda en una feature)
+        group: False para poner todos los casos en una sola feature
+    """
+    grouped: Dict[str, List[FeatureScenario]] = {}
+    for test_case in test_cases:
+        name = _feature_name(test_case, default_feature) if group else default_feature
+        scenario = scenario_from_case(test_case)
+        # El background propio del caso (generadores Gherkin) va delante de sus Given;
+        # si todos los escenarios lo comparten termina en el Background de la feature
+        background = [step for step in _lines(_case_value(test_case, 'background')) if step not in scenario.given]
+        scenario.given = background + scenario.given
+        grouped.setdefault(name, []).append(scenario)
+
+    features = []
+    for name, scenarios in grouped.items():
+        feature = Feature(name=name, description=description if len(grouped) == 1 else '',
+                          scenarios=scenarios, source_cases=len(scenarios))
+        _collapse_scenarios(feature)
+        _hoist_background(feature)
+        features.append(feature)
+    return features
+
+
+# ==================== ESCRITURA ====================
+
+def _table_lines(examples: Dict[str, List[str]], indent: str) -> Iterator[str]:
+    columns = list(examples)
+    cells = [columns] + [list(row) for row in zip(*(examples[column] for column in columns))]
+    cells = [[str(cell).replace('|', '\\|') for cell in row] for row in cells]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(columns))]
+    for row in cells:
+        yield indent + '| ' + ' | '.join(cell.ljust(width) for cell, width in zip(row, widths)) + ' |'
+
+
+def iter_scenario_lines(scenario: FeatureScenario, indent: str = '  ') -> Iterator[str]:
+    """Líneas de un Scenario / Scenario Outline"""
+    if scenario.case_ids:
+        ids = ', '.join(scenario.case_ids[:MAX_COMMENT_IDS])
+        extra = len(scenario.case_ids) - MAX_COMMENT_IDS
+        yield f"{indent}# {ids}" + (f" (+{extra})" if extra > 0 else '')
+    if scenario.tags:
+        yield indent + ' '.join(scenario.tags)
+    keyword = 'Scenario Outline' if scenario.is_outline else 'Scenario'
+    yield f"{indent}{keyword}: {scenario.title}"
+    step_indent = indent * 2
+    yield from _keyword_lines('Given', scenario.given, step_indent)
+    yield from _keyword_lines('When', scenario.when, step_indent)
+    yield from _keyword_lines('Then', scenario.then, step_indent)
+    if scenario.is_outline:
+        yield ''
+        yield f"{step_indent}Examples:"
+        yield from _table_lines(scenario.examples, step_indent + indent)
+
+
+def iter_feature_lines(feature: Feature) -> Iterator[str]:
+    """Líneas de un archivo .feature"""
+    yield f"Feature: {feature.name}"
+    for line in _lines(feature.description):
+        yield f"  {line}"
+    if feature.background:
+        yield ''
+        yield "  Background:"
+        yield from _keyword_lines('Given', feature.background, '    ')
+    for scenario in feature.scenarios:
+        yield ''
+        yield from iter_scenario_lines(scenario)
+
+
+def feature_text(feature: Feature) -> str:
+    return '\n'.join(iter_feature_lines(feature)) + '\n'
+
+
+def render_feature(feature: str, test_cases: Iterable[Any], description: str = '') -> str:
+    """Un solo archivo .feature con todos los casos (Background, Outlines y sin repetidos)"""
+    return feature_text(build_features(test_cases, feature, description, group=False)[0])
+
+
+def feature_filename(name: str) -> str:
+    """Nombre de archivo .feature en minúsculas y sin caracteres especiales"""
+    slug = re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')[:80].rstrip('_')
+    return f"{slug or 'casos_de_prueba'}.feature"
+
+
+def iter_feature_files(features: Iterable[Feature]) -> Iterator[Tuple[str, str]]:
+    """(nombre de archivo, contenido) de cada feature; los nombres repetidos llevan sufijo"""
+    used = set()
+    for feature in features:
+        filename = feature_filename(feature.name)
+        stem, suffix = filename[:-len('.feature')], 2
+        while filename in used:
+            filename = f"{stem}_{suffix}.feature"
+            suffix += 1
+        used.add(filename)
+        yield filename, feature_text(feature)
+
+
+def export_feature_files(features: List[Feature], target: str) -> List[str]:
+    """
+    Escribe un archivo .feature por feature en una carpeta o, si target termina en .zip, en un ZIP
+
+    Returns:
+        Rutas escritas (o nombres dentro del ZIP)
+    """
+    written = []
+    if target.lower().endswith('.zip'):
+        os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+        with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) as bundle:
+            for filename, text in iter_feature_files(features):
+                bundle.writestr(filename, text.encode('utf-8'))
+                written.append(filename)
+    else:
+        os.makedirs(target, exist_ok=True)
+        for filename, text in iter_feature_files(features):
+            path = os.path.join(target, filename)
+            with open(path, 'w', encoding='utf-8', newline='\n') as f:
+                f.write(text)
+            written.append(path)
+    print(f"[OK] {len(written)} archivos .feature exportados en {target} "
+          f"({feature_summary(features)})", flush=True)
+    return written
+
+
+def feature_summary(features: List[Feature]) -> str:
+    cases = sum(feature.source_cases for feature in features)
+    scenarios = sum(len(feature.scenarios) for feature in features)
+    outlines = sum(1 for feature in features for scenario in feature.scenarios if scenario.is_outline)
+    duplicates = sum(feature.duplicates_removed for feature in features)
+    return f"{cases} casos -> {scenarios} escenarios, {outlines} Scenario Outline, {duplicates} repetidos"
@@ -9,15 +9,33 @@ import os
 import csv
 import json
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple
 import re
 
+try:
+    from .streaming_csv import iter_csv_bytes
+except ImportError:
+    from streaming_csv import iter_csv_bytes
+
 class LinearSimpleExporter:
     """Exportador simplificado para Linear con un solo archivo CSV"""
     
+    # Columnas del CSV (en orden)
+    FIELDNAMES = [
+        'Title', 'Description', 'Labels', 'Priority', 'Type', 'State', 'Assignee', 'Project',
+        'Created', 'Test_ID', 'Test_Type', 'Original_Priority', 'Tags', 'User_Story', 'Parent'
+    ]
+    
     def __init__(self, output_folder: str = "outputs"):
-        # Normalizar ruta y asegurar que sea absoluta
+        # Normalizar ruta (la carpeta se crea solo al escribir un archivo)
         self.output_folder = os.path.abspath(output_folder)
+        self._output_ready = False
+    
+    def _ensure_output_folder(self):
+        """Crea la carpeta de salida la primera vez que se escribe un archivo"""
+        if self._output_ready:
+            return
+        self._output_ready = True
         try:
             os.makedirs(self.output_folder, exist_ok=True)
         except (OSError, PermissionError) as e:
@@ -49,11 +67,8 @@ class LinearSimpleExporter:
         
         return filename
     
-    def export_to_linear_csv(self, test_cases: List[Dict], project_name: str, user_story: str = "", parent_issue_id: str = "") -> str:
-        """
-        Exporta casos de prueba a un solo archivo CSV optimizado para Linear
-        Puede exportar como issues independientes o como sub-issues de una HU
-        """
+    def build_filename(self, project_name: str, parent_issue_id: str = "") -> str:
+        """Nombre del CSV exportado (sanitizado y con marca de tiempo)"""
         # Limpiar nombre del proyecto
         clean_project_name = self._sanitize_filename(project_name)
         
@@ -65,22 +80,21 @@ class LinearSimpleExporter:
             filename = f"linear_test_cases_{clean_project_name}_{timestamp}.csv"
         
         # Sanitizar nombre de archivo adicional
-        filename = self._sanitize_filename(filename)
-        
-        # Usar ruta absoluta y normalizada
-        filepath = os.path.abspath(os.path.join(self.output_folder, filename))
-        
-        # Validar longitud de ruta (Windows tiene límite de 260 caracteres)
-        if len(filepath) > 250:
-            # Truncar nombre si es necesario
-            name, ext = os.path.splitext(filename)
-            filename = name[:200] + ext
-            filepath = os.path.abspath(os.path.join(self.output_folder, filename))
+        return self._sanitize_filename(filename)
+    
+    def iter_rows(self, test_cases: Iterable[Dict], project_name: str, user_story: str = "",
+                  parent_issue_id: str = "", case_ids: Optional[Sequence[str]] = None) -> Iterator[Dict[str, str]]:
+        """
+        Filas del CSV de Linear, generadas de a una (sin materializar la lista)
         
-        # Preparar datos para CSV
-        csv_data = []
+        Con case_ids el título y Test_ID usan esos ids estables en lugar de la posición
+        (TC-001, TC-002...), que cambia al agregar o borrar casos.
+        """
+        created = datetime.now().strftime('%Y-%m-%d')
+        user_story_excerpt = user_story[:100] + '...' if len(user_story) > 100 else user_story
         
         for i, test_case in enumerate(test_cases, 1):
+            stable_id = case_ids[i - 1] if case_ids is not None else None
             # Crear descripción estructurada para Linear
             description = self._create_linear_description(test_case, user_story)
             
@@ -91,8 +105,8 @@ class LinearSimpleExporter:
             labels = self._create_linear_labels(test_case)
             
             # Crear fila para CSV
-            row = {
-                'Title': f"TC-{i:03d}: {test_case.get('title', 'Sin título')}",
+            yield {
+                'Title': f"{stable_id or f'TC-{i:03d}'}: {test_case.get('title', 'Sin título')}",
                 'Description': description,
                 'Labels': labels,
                 'Priority': priority,
@@ -100,23 +114,53 @@ class LinearSimpleExporter:
                 'State': 'Todo',
                 'Assignee': '',  # Se puede asignar manualmente en Linear
                 'Project': project_name,
-                'Created': datetime.now().strftime('%Y-%m-%d'),
-                'Test_ID': test_case.get('id', f'TC-{i:03d}'),
+                'Created': created,
+                'Test_ID': stable_id or test_case.get('id', f'TC-{i:03d}'),
                 'Test_Type': test_case.get('test_type', 'Funcional'),
                 'Original_Priority': test_case.get('priority', 'Media'),
                 'Tags': ', '.join(test_case.get('tags', [])),
-                'User_Story': user_story[:100] + '...' if len(user_story) > 100 else user_story,
+                'User_Story': user_story_excerpt,
                 'Parent': parent_issue_id if parent_issue_id else ''  # Para sub-issues
             }
-            
-            csv_data.append(row)
+    
+    def stream_linear_csv(self, test_cases: Iterable[Dict], project_name: str, user_story: str = "",
+                          parent_issue_id: str = "", case_ids: Optional[Sequence[str]] = None) -> Tuple[str, Iterator[bytes]]:
+        """
+        CSV de Linear como flujo de bytes (UTF-8 con BOM), sin escribir en disco
+        
+        Returns:
+            (nombre de archivo sugerido, iterador de bloques de bytes)
+        """
+        rows = self.iter_rows(test_cases, project_name, user_story, parent_issue_id, case_ids)
+        return self.build_filename(project_name, parent_issue_id), iter_csv_bytes(rows, self.FIELDNAMES)
+    
+    def export_to_linear_csv(self, test_cases: List[Dict], project_name: str, user_story: str = "", parent_issue_id: str = "") -> str:
+        """
+        Exporta casos de prueba a un solo archivo CSV optimizado para Linear
+        Puede exportar como issues independientes o como sub-issues de una HU
+        """
+        self._ensure_output_folder()
+        filename = self.build_filename(project_name, parent_issue_id)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M')
+        
+        # Usar ruta absoluta y normalizada
+        filepath = os.path.abspath(os.path.join(self.output_folder, filename))
+        
+        # Validar longitud de ruta (Windows tiene límite de 260 caracteres)
+        if len(filepath) > 250:
+            # Truncar nombre si es necesario
+            name, ext = os.path.splitext(filename)
+            filename = name[:200] + ext
+            filepath = os.path.abspath(os.path.join(self.output_folder, filename))
+        
+        # Preparar datos para CSV
+        csv_data = list(self.iter_rows(test_cases, project_name, user_story, parent_issue_id))
         
         # Escribir CSV con encoding UTF-8 y BOM para Excel (corrige tildes)
         try:
             with open(filepath, 'w', newline='', encoding='utf-8-sig', errors='replace') as csvfile:
                 if csv_data:
-                    fieldnames = csv_data[0].keys()
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                    writer = csv.DictWriter(csvfile, fieldnames=self.FIELDNAMES)
                     writer.writeheader()
                     writer.writerows(csv_data)
             
@@ -132,8 +176,7 @@ class LinearSimpleExporter:
             try:
                 with open(alt_filepath, 'w', newline='', encoding='utf-8-sig', errors='replace') as csvfile:
                     if csv_data:
-                        fieldnames = csv_data[0].keys()
-                        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                        writer = csv.DictWriter(csvfile, fieldnames=self.FIELDNAMES)
                         writer.writeheader()
                         writer.writerows(csv_data)
                 print(f"[WARN] Archivo creado con nombre alternativo: {alt_filepath}")
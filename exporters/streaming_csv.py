@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exportación CSV en Streaming
+Codifica filas a medida que se generan (UTF-8 con BOM para Excel) en bloques de bytes
+listos para una respuesta HTTP chunked, sin archivo intermedio en disco
+"""
+
+import csv
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+# BOM UTF-8: Excel lo usa para detectar la codificación (corrige tildes)
+CSV_BOM = '\ufeff'
+
+# Tamaño aproximado de cada bloque enviado al cliente
+CSV_CHUNK_BYTES = 64 * 1024
+
+# Columnas del CSV de proyecto en streaming (atributos del caso de prueba). No coinciden con
+# las de TestCaseExporter.export_to_csv (formato 1, disponible con ?format_version=1 o
+# ?archive=1), por eso la descarga lleva su propia versión de formato.
+PROJECT_CSV_FORMAT_VERSION = 2
+PROJECT_CSV_FIELDNAMES = [
+    'id', 'title', 'description', 'preconditions', 'steps', 'expected_result',
+    'test_type', 'priority', 'user_story', 'tags'
+]
+
+
+class _TextBuffer:
+    """Destino de csv.writer que acumula texto hasta vaciarse"""
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.size = 0
+
+    def write(self, text: str):
+        self.parts.append(text)
+        self.size += len(text)
+
+    def drain(self) -> str:
+        text = ''.join(self.parts)
+        self.parts = []
+        self.size = 0
+        return text
+
+
+def iter_csv_bytes(rows: Iterable[Dict[str, Any]], fieldnames: Sequence[str], bom: bool = True,
+                   chunk_bytes: int = CSV_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Codifica filas como CSV de forma incremental
+
+    El primer bloque (BOM + encabezado) sale antes de leer ninguna fila; después se emite
+    un bloque cada ~chunk_bytes, así la memoria no depende del número de filas.
+    """
+    buffer = _TextBuffer()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore')
+    if bom:
+        buffer.write(CSV_BOM)
+    writer.writeheader()
+    yield buffer.drain().encode('utf-8', errors='replace')
+
+    for row in rows:
+        writer.writerow(row)
+        if buffer.size >= chunk_bytes:
+            yield buffer.drain().encode('utf-8', errors='replace')
+
+    if buffer.size:
+        yield buffer.drain().encode('utf-8', errors='replace')
+
+
+def _join(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return '\n'.join(str(item) for item in value)
+    return '' if value is None else str(getattr(value, 'value', value))
+
+
+def iter_project_rows(test_cases: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, str]]:
+    """Filas del CSV de proyecto a partir de los casos guardados (formato serializable)"""
+    for test_case in test_cases:
+        row = {name: _join(test_case.get(name)) for name in PROJECT_CSV_FIELDNAMES}
+        row['tags'] = ', '.join(test_case.get('tags') or [])
+        yield row
+
+
+def attachment_headers(filename: str) -> Dict[str, str]:
+    """Headers de descarga para una respuesta en streaming"""
+    return {
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    }
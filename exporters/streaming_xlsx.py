@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exportación Excel en Streaming
+Escribe los casos de prueba con un libro de openpyxl en modo write-only (sin pandas):
+las filas se serializan a medida que llegan, con encabezado congelado y autofiltro,
+sin DataFrame intermedio.
+"""
+
+import os
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Ancho máximo de columna (caracteres), igual que el exportador anterior
+MAX_COLUMN_WIDTH = 50
+
+# Filas retenidas para medir anchos antes de escribir: en modo write-only las columnas
+# (<cols>) van antes que los datos, así que se fijan al vaciar esta ventana
+XLSX_WIDTH_SAMPLE_ROWS = int(os.environ.get('QA_XLSX_WIDTH_SAMPLE_ROWS', '500'))
+
+# Tamaño de los bloques leídos del archivo temporal al transmitir
+XLSX_CHUNK_BYTES = 64 * 1024
+
+# (encabezado, tipo): 'text' o 'multiline' (ajuste de línea). Mismas columnas que el
+# DataFrame del exportador anterior
+XLSX_COLUMNS: List[Tuple[str, str]] = [
+    ('ID', 'text'),
+    ('Título', 'text'),
+    ('Descripción', 'multiline'),
+    ('Tipo', 'text'),
+    ('Prioridad', 'text'),
+    ('Precondiciones', 'multiline'),
+    ('Pasos', 'multiline'),
+    ('Resultado Esperado', 'multiline'),
+    ('Tags', 'text'),
+    ('Historia de Usuario', 'multiline'),
+]
+
+# Caracteres de control que el XML de Excel no admite
+_ILLEGAL_XML_CHARS = dict.fromkeys(c for c in range(32) if c not in (9, 10, 13))
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ''
+    return str(getattr(value, 'value', value)).translate(_ILLEGAL_XML_CHARS)
+
+
+def _as_list(value: Any) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        return [_text(item) for item in value]
+    text = _text(value)
+    return [line for line in text.split('\n') if line.strip()] if text else []
+
+
+def iter_excel_rows(test_cases: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Any, ...]]:
+    """Filas (en el orden de XLSX_COLUMNS) a partir de los casos guardados"""
+    for tc in test_cases:
+        steps = tc.get('steps')
+        if isinstance(steps, (list, tuple)):
+            steps_text = '\n'.join(f"{i}. {_text(step)}" for i, step in enumerate(steps, 1))
+        else:
+            steps_text = _text(steps)
+        preconditions = tc.get('preconditions')
+        yield (
+            _text(tc.get('id')),
+            _text(tc.get('title')),
+            _text(tc.get('description')),
+            _text(tc.get('test_type')),
+            _text(tc.get('priority')),
+            '\n'.join(_as_list(preconditions)) if isinstance(preconditions, (list, tuple)) else _text(preconditions),
+            steps_text,
+            _text(tc.get('expected_result')),
+            ', '.join(_text(tag) for tag in (tc.get('tags') or [])),
+            _text(tc.get('user_story')),
+        )
+
+
+class ColumnWidthTracker:
+    """Ancho de cada columna calculado fila a fila (línea más larga, con tope)"""
+
+    def __init__(self, headers: Sequence[str], max_width: int = MAX_COLUMN_WIDTH):
+        self.max_width = max_width
+        self.lengths = [len(header) for header in headers]
+
+    def observe(self, values: Sequence[Any]):
+        for index, value in enumerate(values):
+            if value is None or self.lengths[index] >= self.max_width:
+                continue
+            if isinstance(value, str):
+                length = max(len(line) for line in value.split('\n'))
+            else:
+                length = len(str(value))
+            if length > self.lengths[index]:
+                self.lengths[index] = length
+
+    def widths(self) -> List[int]:
+        return [min(length + 2, self.max_width) for length in self.lengths]
+
+
+class StreamingXlsxWriter:
+    """
+    Escritor XLSX en modo write-only
+
+    Las primeras XLSX_WIDTH_SAMPLE_ROWS filas se retienen para medir los anchos de
+    columna; después cada fila se escribe directamente al archivo temporal de openpyxl.
+    openpyxl sigue guardando algo de estado por fila, así que la memoria crece (poco)
+    con el tamaño del libro.
+    """
+
+    def __init__(self, sheet_title: str = 'Casos de Prueba', columns: Sequence[Tuple[str, str]] = XLSX_COLUMNS,
+                 width_sample_rows: int = XLSX_WIDTH_SAMPLE_ROWS):
+        self.columns = list(columns)
+        self.width_sample_rows = max(1, width_sample_rows)
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(title=sheet_title[:31])
+        self.widths = ColumnWidthTracker([header for header, _ in self.columns])
+        self.rows_written = 0
+        self._pending: Optional[List[Tuple[Any, ...]]] = []
+
+        # Estilos compartidos por todas las celdas de una columna
+        self._header_font = Font(bold=True, color='FFFFFF')
+        self._header_fill = PatternFill('solid', fgColor='1F4E78')
+        self._wrap = Alignment(wrap_text=True, vertical='top')
+        self._top = Alignment(vertical='top')
+
+        self.sheet.freeze_panes = 'A2'
+
+    def _cell(self, value: Any, kind: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(self.sheet, value=value)
+        cell.alignment = self._wrap if kind == 'multiline' else self._top
+        return cell
+
+    def _write_header(self):
+        for index, width in enumerate(self.widths.widths(), 1):
+            self.sheet.column_dimensions[get_column_letter(index)].width = width
+        header = []
+        for title, _ in self.columns:
+            cell = WriteOnlyCell(self.sheet, value=title)
+            cell.font = self._header_font
+            cell.fill = self._header_fill
+            header.append(cell)
+        self.sheet.append(header)
+
+    def _emit(self, values: Sequence[Any]):
+        self.sheet.append([self._cell(value, kind) for value, (_, kind) in zip(values, self.columns)])
+        self.rows_written += 1
+
+    def _flush_pending(self):
+        pending, self._pending = self._pending, None
+        self._write_header()
+        for values in pending:
+            self._emit(values)
+
+    def append(self, values: Sequence[Any]):
+        """Agrega una fila (valores en el orden de las columnas)"""
+        self.widths.observe(values)
+        if self._pending is not None:
+            self._pending.append(tuple(values))
+            if len(self._pending) >= self.width_sample_rows:
+                self._flush_pending()
+            return
+        self._emit(values)
+
+    def save(self, target) -> int:
+        """Cierra el libro en una ruta o archivo binario y devuelve las filas escritas"""
+        if self._pending is not None:
+            self._flush_pending()
+        last_column = get_column_letter(len(self.columns))
+        self.sheet.auto_filter.ref = f"A1:{last_column}{self.rows_written + 1}"
+        self.workbook.save(target)
+        return self.rows_written
+
+
+def write_xlsx(rows: Iterable[Sequence[Any]], target, sheet_title: str = 'Casos de Prueba') -> int:
+    """Escribe filas en un XLSX (ruta o archivo binario) y devuelve cuántas se escribieron"""
+    writer = StreamingXlsxWriter(sheet_title)
+    for values in rows:
+        writer.append(values)
+    return writer.save(target)
+
+
+def iter_xlsx_bytes(rows: Iterable[Sequence[Any]], sheet_title: str = 'Casos de Prueba',
+                    chunk_bytes: int = XLSX_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Genera el XLSX y lo devuelve en bloques
+
+    Un XLSX es un ZIP cuyo índice va al final, así que el libro se completa en un archivo
+    temporal y luego se lee por bloques (nunca entero en memoria).
+    """
+    with tempfile.TemporaryFile() as temp:
+        write_xlsx(rows, temp, sheet_title)
+        temp.seek(0)
+        while True:
+            chunk = temp.read(chunk_bytes)
+            if not chunk:
+                break
+            yield chunk
+
+
+def build_xlsx_filename(project_name: str) -> str:
+    """Nombre de archivo con el mismo formato que AdvancedExporter"""
+    safe_name = "".join(c for c in project_name.replace(' ', '_') if (c.isascii() and c.isalnum()) or c in ('-', '_', '.'))
+    return f"casos_prueba_{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
+
+
+def stream_test_cases_xlsx(test_cases: Iterable[Dict[str, Any]], project_name: str) -> Tuple[str, Iterator[bytes]]:
+    """(filename, bloques) del XLSX de un proyecto, listo para una respuesta en streaming"""
+    return build_xlsx_filename(project_name), iter_xlsx_bytes(iter_excel_rows(test_cases))
@@ -13,7 +13,10 @@ from enum import Enum
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'exporters'))
 from test_case_automation import UserStory, TestCase, TestType, Priority
+from feature_exporter import build_features, export_feature_files
+from batch_story_analyzer import get_batch_analyzer
 
 @dataclass
 class EnhancedGherkinTestCase:
@@ -122,14 +125,7 @@ class EnhancedGherkinGenerator:
     
     def _detect_specific_domain(self, text: str) -> str:
         """Detecta el dominio específico de la aplicación"""
-        if any(word in text for word in ['alumbrado', 'público', 'municipio', 'acuerdo']):
-            return 'alumbrado_publico'
-        elif any(word in text for word in ['login', 'sesión', 'credenciales']):
-            return 'authentication'
-        elif any(word in text for word in ['carrito', 'compra', 'pago']):
-            return 'ecommerce'
-        else:
-            return 'general'
+        return get_batch_analyzer().classify_one(text, 'enhanced_gherkin')
     
     def _extract_ui_elements(self, text: str, domain: str) -> List[str]:
         """Extrae elementos UI específicos mencionados"""
@@ -564,6 +560,12 @@ class EnhancedGherkinGenerator:
             gherkin_text.append(f"  Then {step}")
         
         return "\n".join(gherkin_text)
+    
+    def export_feature_files(self, gherkin_cases: List[EnhancedGherkinTestCase], target: str,
+                             default_feature: str = "Casos de prueba") -> List[str]:
+        """Exporta los casos como archivos .feature (uno por feature) en una carpeta o en un ZIP"""
+        return export_feature_files(build_features(gherkin_cases, default_feature), target)
+
 
 def main():
     """Función principal para probar el generador mejorado"""
@@ -13,7 +13,9 @@ from enum import Enum
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'exporters'))
 from test_case_automation import UserStory, TestCase, TestType, Priority
+from feature_exporter import build_features, export_feature_files
 
 @dataclass
 class GherkinTestCase:
@@ -620,6 +622,12 @@ class GherkinGenerator:
                 gherkin_text.append("    | " + " | ".join(row) + " |")
         
         return "\n".join(gherkin_text)
+    
+    def export_feature_files(self, gherkin_cases: List[GherkinTestCase], target: str,
+                             default_feature: str = "Casos de prueba") -> List[str]:
+        """Exporta los casos como archivos .feature (uno por feature) en una carpeta o en un ZIP"""
+        return export_feature_files(build_features(gherkin_cases, default_feature), target)
+
 
 def main():
     """Función principal para probar el generador Gherkin"""
@@ -6,29 +6,20 @@ Permite generar casos de prueba directamente desde issues de Linear
 """
 
 import json
-import requests
+import sys
 import os
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from linear_transport import LinearTransport
 from test_case_automation import UserStoryParser, TestCaseGenerator, QAValidator, TestCaseExporter
 from test_templates import TemplateManager
 
-class LinearAPI:
-    """Cliente para la API de Linear"""
-    
-    def __init__(self, api_key: str = None):
-        self.api_key = api_key or os.getenv('LINEAR_API_KEY')
-        self.base_url = "https://api.linear.app/graphql"
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-    
-    def get_issues_by_label(self, label: str, team_id: str = None) -> List[Dict[str, Any]]:
-        """Obtiene issues de Linear por label"""
-        query = """
-        query GetIssues($filter: IssueFilter) {
-            issues(filter: $filter) {
-                nodes {
+# Issues por página en las consultas paginadas (Linear acepta hasta 250)
+DEFAULT_PAGE_SIZE = int(os.environ.get('LINEAR_PAGE_SIZE', '50'))
+MAX_PAGE_SIZE = 250
+
+ISSUE_FIELDS = """
                     id
                     title
                     description
@@ -47,10 +38,83 @@ class LinearAPI:
                     assignee {
                         name
                     }
+"""
+
+class IncompleteIssueListError(RuntimeError):
+    """La paginación falló después de entregar issues: el listado quedó incompleto"""
+    
+    def __init__(self, fetched: int, cause: Exception):
+        super().__init__(f"Listado de issues incompleto: falló tras {fetched} issues ({cause})")
+        self.fetched = fetched
+
+class LinearAPI:
+    """Cliente para la API de Linear"""
+    
+    def __init__(self, api_key: str = None, page_size: int = DEFAULT_PAGE_SIZE, base_url: str = None):
+        self.api_key = api_key or os.getenv('LINEAR_API_KEY')
+        self.page_size = page_size
+        self.transport = LinearTransport(self.api_key, base_url=base_url)
+        self.base_url = self.transport.base_url
+        self.headers = self.transport.headers
+    
+    def iter_pages(self, query: str, variables: Dict[str, Any], connection_path: List[str],
+                   page_size: Optional[int] = None, prefetch: bool = True) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Recorre una conexión paginada por cursor y devuelve sus nodos página a página
+        
+        La consulta debe aceptar $first y $after y pedir pageInfo { hasNextPage endCursor }.
+        Con prefetch=True la página siguiente se pide en segundo plano en cuanto se conoce
+        su cursor, así el consumidor procesa una página mientras la otra viaja por la red.
+        En memoria hay como mucho dos páginas.
+        """
+        page_size = max(1, min(page_size or self.page_size, MAX_PAGE_SIZE))
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        
+        def fetch(cursor):
+            response = self.transport.post(query, dict(variables, first=page_size, after=cursor))
+            if response.status_code != 200:
+                raise RuntimeError(f"Error API Linear: {response.status_code}")
+            connection = response.json().get('data') or {}
+            for key in connection_path:
+                connection = (connection or {}).get(key) or {}
+            return connection.get('nodes', []), connection.get('pageInfo') or {}
+        
+        pending = None
+        try:
+            pending = executor.submit(fetch, None) if executor else None
+            cursor = None
+            while True:
+                nodes, page_info = pending.result() if executor else fetch(cursor)
+                cursor = page_info.get('endCursor')
+                has_next = page_info.get('hasNextPage') and cursor
+                if has_next and executor:
+                    pending = executor.submit(fetch, cursor)
+                if nodes:
+                    yield nodes
+                if not has_next:
+                    return
+        finally:
+            if executor:
+                # La página precargada que ya no se va a leer se cancela a mano
+                # (shutdown(cancel_futures=True) requiere Python 3.9)
+                if pending is not None:
+                    pending.cancel()
+                executor.shutdown(wait=False)
+    
+    def iter_issues_by_label(self, label: str, team_id: str = None,
+                             page_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Issues de Linear por label, sin cargar todas las páginas en memoria"""
+        query = """
+        query GetIssues($filter: IssueFilter, $first: Int, $after: String) {
+            issues(filter: $filter, first: $first, after: $after) {
+                nodes {%s}
+                pageInfo {
+                    hasNextPage
+                    endCursor
                 }
             }
         }
-        """
+        """ % ISSUE_FIELDS
         
         variables = {
             "filter": {
@@ -59,68 +123,55 @@ class LinearAPI:
             }
         }
         
-        try:
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                json={"query": query, "variables": variables}
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('data', {}).get('issues', {}).get('nodes', [])
-            else:
-                print(f"❌ Error API Linear: {response.status_code}")
-                return []
-                
-        except Exception as e:
-            print(f"❌ Error conectando con Linear: {e}")
-            return []
+        yield from self._iter_issues(query, variables, ['issues'], page_size, "❌ Error conectando con Linear")
     
-    def get_issues_by_team(self, team_name: str) -> List[Dict[str, Any]]:
-        """Obtiene issues de un equipo específico"""
+    def iter_issues_by_team(self, team_name: str, page_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Issues de un equipo específico, sin cargar todas las páginas en memoria"""
         query = """
-        query GetTeamIssues($teamName: String!) {
+        query GetTeamIssues($teamName: String!, $first: Int, $after: String) {
             team(name: $teamName) {
-                issues {
-                    nodes {
-                        id
-                        title
-                        description
-                        labels {
-                            nodes {
-                                name
-                            }
-                        }
-                        state {
-                            name
-                        }
-                        priority
+                issues(first: $first, after: $after) {
+                    nodes {%s}
+                    pageInfo {
+                        hasNextPage
+                        endCursor
                     }
                 }
             }
         }
-        """
+        """ % ISSUE_FIELDS
         
-        variables = {"teamName": team_name}
+        yield from self._iter_issues(query, {"teamName": team_name}, ['team', 'issues'], page_size,
+                                     "❌ Error obteniendo issues del equipo")
+    
+    def _iter_issues(self, query: str, variables: Dict[str, Any], connection_path: List[str],
+                     page_size: Optional[int], error_message: str) -> Iterator[Dict[str, Any]]:
+        """
+        Nodos de todas las páginas de la consulta
         
+        Si falla la primera página se avisa y no se devuelve nada (como antes). Si falla una
+        página posterior se lanza IncompleteIssueListError: devolver lo leído hasta ahí
+        haría pasar un backlog cortado por completo.
+        """
+        fetched = 0
         try:
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                json={"query": query, "variables": variables}
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                team_data = data.get('data', {}).get('team')
-                if team_data:
-                    return team_data.get('issues', {}).get('nodes', [])
-            return []
-                
+            for page in self.iter_pages(query, variables, connection_path, page_size):
+                for issue in page:
+                    fetched += 1
+                    yield issue
         except Exception as e:
-            print(f"❌ Error obteniendo issues del equipo: {e}")
-            return []
+            if fetched:
+                print(f"{error_message}: {e} (tras {fetched} issues, listado incompleto)")
+                raise IncompleteIssueListError(fetched, e) from e
+            print(f"{error_message}: {e}")
+    
+    def get_issues_by_label(self, label: str, team_id: str = None) -> List[Dict[str, Any]]:
+        """Obtiene issues de Linear por label (todas las páginas; IncompleteIssueListError si se corta)"""
+        return list(self.iter_issues_by_label(label, team_id))
+    
+    def get_issues_by_team(self, team_name: str) -> List[Dict[str, Any]]:
+        """Obtiene issues de un equipo específico (todas las páginas; IncompleteIssueListError si se corta)"""
+        return list(self.iter_issues_by_team(team_name))
 
 class LinearTestCaseGenerator:
     """Generador de casos de prueba desde Linear"""
@@ -132,37 +183,48 @@ class LinearTestCaseGenerator:
         self.validator = QAValidator()
         self.template_manager = TemplateManager()
     
-    def generate_from_linear_issues(self, issues: List[Dict[str, Any]], template: str = None) -> List[Dict[str, Any]]:
-        """Genera casos de prueba desde issues de Linear"""
+    def generate_from_linear_issues(self, issues: Iterable[Dict[str, Any]], template: str = None) -> List[Dict[str, Any]]:
+        """
+        Genera casos de prueba desde issues de Linear
+        
+        `issues` puede ser una lista o un iterador (p. ej. LinearAPI.iter_issues_by_label):
+        con un iterador la generación empieza con la primera página mientras llega la siguiente.
+        """
         all_test_cases = []
         
         for issue in issues:
-            # Convertir issue a historia de usuario
-            user_story = self._convert_issue_to_user_story(issue)
-            
-            if user_story:
-                # Generar casos de prueba
-                test_cases = self.generator.generate_test_cases(user_story)
-                
-                # Aplicar plantilla si se especifica
-                if template:
-                    test_cases = self.template_manager.apply_template(template, user_story, test_cases)
-                
-                # Validar calidad
-                validation_result = self.validator.validate_test_suite(test_cases)
-                
-                # Agregar metadatos de Linear
-                for tc in test_cases:
-                    tc_data = {
-                        'test_case': tc,
-                        'linear_issue': issue,
-                        'validation': validation_result,
-                        'template_used': template
-                    }
-                    all_test_cases.append(tc_data)
+            all_test_cases.extend(self.generate_for_issue(issue, template))
         
         return all_test_cases
     
+    def generate_for_issue(self, issue: Dict[str, Any], template: str = None) -> List[Dict[str, Any]]:
+        """Convierte, genera, aplica plantilla y valida los casos de un solo issue"""
+        # Convertir issue a historia de usuario
+        user_story = self._convert_issue_to_user_story(issue)
+        if not user_story:
+            return []
+        
+        # Generar casos de prueba
+        test_cases = self.generator.generate_test_cases(user_story)
+        
+        # Aplicar plantilla si se especifica
+        if template:
+            test_cases = self.template_manager.apply_template(template, user_story, test_cases)
+        
+        # Validar calidad
+        validation_result = self.validator.validate_test_suite(test_cases)
+        
+        # Agregar metadatos de Linear
+        return [
+            {
+                'test_case': tc,
+                'linear_issue': issue,
+                'validation': validation_result,
+                'template_used': template
+            }
+            for tc in test_cases
+        ]
+    
     def _convert_issue_to_user_story(self, issue: Dict[str, Any]) -> Optional[Any]:
         """Convierte un issue de Linear a historia de usuario"""
         title = issue.get('title', '')
@@ -279,8 +341,9 @@ def main():
     print("1. Generar desde label específico")
     print("2. Generar desde equipo QA")
     print("3. Generar desde issues con criterios de aceptación")
+    print("4. Generar backlog completo por label (pipeline, exporta JSONL)")
     
-    choice = input("\nSelecciona una opción (1-3): ").strip()
+    choice = input("\nSelecciona una opción (1-4): ").strip()
     
     if choice == "1":
         label = input("Ingresa el label a buscar: ").strip()
@@ -306,6 +369,15 @@ def main():
         # Implementar búsqueda por contenido
         print("💡 Esta funcionalidad está en desarrollo")
     
+    elif choice == "4":
+        from linear_pipeline import LinearGenerationPipeline, JsonLinesSink
+        label = input("Ingresa el label a buscar: ").strip()
+        output_file = f"linear_{label.replace(' ', '_')}.jsonl"
+        sink = JsonLinesSink(output_file)
+        # Las páginas de Linear se leen mientras el pool genera los lotes anteriores
+        LinearGenerationPipeline(sink=sink).run(linear_api.iter_issues_by_label(label))
+        print(f"✅ {sink.count} casos generados en {output_file}")
+    
     else:
         print("❌ Opción inválida")
 
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline de Generación Masiva desde el Backlog de Linear
+Tres etapas conectadas por colas acotadas: lectura paginada de Linear (red), generación
+de casos en un pool de procesos (CPU) y destino (guardar / exportar). Mientras un lote
+se genera, el siguiente ya se está descargando.
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict, is_dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(__file__))
+from linear_generator import LinearTestCaseGenerator
+
+# Procesos de generación (0 = en el mismo proceso, en un hilo aparte; sin definir o vacío = uno por CPU)
+_pipeline_workers = os.environ.get('QA_PIPELINE_WORKERS', '')
+PIPELINE_WORKERS = int(_pipeline_workers) if _pipeline_workers.strip() else (os.cpu_count() or 1)
+
+# Issues por tarea enviada al pool (amortiza el coste de serializar entre procesos)
+PIPELINE_CHUNK_SIZE = int(os.environ.get('QA_PIPELINE_CHUNK_SIZE', '10'))
+
+# Lotes que caben en cada cola antes de frenar a la etapa anterior
+PIPELINE_QUEUE_SIZE = int(os.environ.get('QA_PIPELINE_QUEUE_SIZE', '0') or 0) or 2 * max(1, PIPELINE_WORKERS)
+
+_END = object()
+
+# Generador por proceso del pool (se crea en la primera tarea y se reutiliza)
+_worker_generator: Optional[LinearTestCaseGenerator] = None
+
+
+def _generate_chunk(issues: List[Dict[str, Any]], template: Optional[str]) -> Tuple[List[Dict[str, Any]], float]:
+    """Tarea del pool: genera los casos de un lote de issues y devuelve (resultados, segundos de CPU)"""
+    global _worker_generator
+    started = time.perf_counter()
+    if _worker_generator is None:
+        _worker_generator = LinearTestCaseGenerator()
+    results = []
+    for issue in issues:
+        results.extend(_worker_generator.generate_for_issue(issue, template))
+    return results, time.perf_counter() - started
+
+
+# ==================== ESTADÍSTICAS ====================
+
+@dataclass
+class StageStats:
+    """Métricas de una etapa del pipeline"""
+    name: str
+    items: int = 0
+    batches: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    max_queue_depth: int = 0  # Profundidad de la cola que alimenta la etapa
+    _depth_total: int = field(default=0, repr=False)
+    _depth_samples: int = field(default=0, repr=False)
+
+    def record_queue_depth(self, depth: int):
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self._depth_total += depth
+        self._depth_samples += 1
+
+    @property
+    def avg_queue_depth(self) -> float:
+        return self._depth_total / self._depth_samples if self._depth_samples else 0.0
+
+    def to_dict(self, elapsed: float, workers: int = 1) -> Dict[str, Any]:
+        return {
+            'items': self.items,
+            'batches': self.batches,
+            'errors': self.errors,
+            'items_per_second': round(self.items / elapsed, 2) if elapsed else 0.0,
+            'busy_seconds': round(self.busy_seconds, 3),
+            # Fracción del tiempo en que la etapa (todos sus workers) estuvo trabajando
+            'utilization': round(self.busy_seconds / (elapsed * workers), 3) if elapsed else 0.0,
+            'max_queue_depth': self.max_queue_depth,
+            'avg_queue_depth': round(self.avg_queue_depth, 2)
+        }
+
+
+@dataclass
+class PipelineStats:
+    """Métricas de una ejecución completa"""
+    workers: int
+    queue_size: int
+    elapsed_seconds: float = 0.0
+    fetch: StageStats = field(default_factory=lambda: StageStats('fetch'))
+    generate: StageStats = field(default_factory=lambda: StageStats('generate'))
+    sink: StageStats = field(default_factory=lambda: StageStats('sink'))
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = self.elapsed_seconds
+        return {
+            'elapsed_seconds': round(elapsed, 3),
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'stages': {
+                'fetch': self.fetch.to_dict(elapsed),
+                'generate': self.generate.to_dict(elapsed, max(1, self.workers)),
+                'sink': self.sink.to_dict(elapsed)
+            }
+        }
+
+    def report(self):
+        """Imprime el resumen por etapa (para dimensionar workers y colas)"""
+        data = self.to_dict()
+        print(f"[INFO] Pipeline: {data['elapsed_seconds']}s, {self.workers} workers, colas de {self.queue_size}", flush=True)
+        for name, stage in data['stages'].items():
+            print(f"       {name:<8} {stage['items']:>6} items  {stage['items_per_second']:>8}/s  "
+                  f"uso {stage['utilization']:.0%}  cola max {stage['max_queue_depth']} "
+                  f"(media {stage['avg_queue_depth']})  errores {stage['errors']}", flush=True)
+
+
+# ==================== DESTINOS ====================
+
+class CollectSink:
+    """Destino por defecto: acumula los casos generados en memoria"""
+
+    def __init__(self):
+        self.results: List[Dict[str, Any]] = []
+
+    def __call__(self, results: List[Dict[str, Any]]):
+        self.results.extend(results)
+
+
+def _to_jsonable(value: Any) -> Any:
+    # Enum antes que __dict__: vars() de un miembro vuelca sus atributos internos
+    if isinstance(value, Enum):
+        return value.value
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if hasattr(value, '__dict__'):
+        return vars(value)
+    return str(value)
+
+
+class JsonLinesSink:
+    """Escribe cada caso generado como una línea JSON a medida que llega (memoria acotada)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def __call__(self, results: List[Dict[str, Any]]):
+        for item in results:
+            self._file.write(json.dumps(item, ensure_ascii=False, default=_to_jsonable) + "\n")
+        self.count += len(results)
+
+    def close(self):
+        self._file.close()
+
+
+# ==================== PIPELINE ====================
+
+class LinearGenerationPipeline:
+    """
+    Genera casos de prueba para un backlog completo de Linear solapando red y CPU
+
+    fetch    → recorre el iterador de issues (p. ej. LinearAPI.iter_issues_by_label) y arma lotes
+    generate → cada lote se genera en el pool de procesos
+    sink     → cada lote generado se entrega, en orden, a sink(resultados)
+
+    Las colas entre etapas son acotadas: si el pool o el destino se atrasan, la lectura de
+    Linear se frena en lugar de acumular issues en memoria.
+    """
+
+    def __init__(self, template: Optional[str] = None, workers: int = PIPELINE_WORKERS,
+                 chunk_size: int = PIPELINE_CHUNK_SIZE, queue_size: int = PIPELINE_QUEUE_SIZE,
+                 sink: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        self.template = template
+        self.workers = max(0, workers)
+        self.chunk_size = max(1, chunk_size)
+        self.queue_size = max(1, queue_size)
+        self.sink = sink if sink is not None else CollectSink()
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    def run(self, issues: Iterable[Dict[str, Any]]) -> PipelineStats:
+        """Ejecuta el pipeline hasta agotar los issues y devuelve las métricas"""
+        stats = PipelineStats(workers=self.workers, queue_size=self.queue_size)
+        fetch_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        result_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._stop.clear()
+        self._error = None
+        started = time.perf_counter()
+
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers else ThreadPoolExecutor(max_workers=1)
+        threads = [
+            threading.Thread(target=self._fetch_stage, args=(issues, fetch_queue, stats), name="pipeline-fetch", daemon=True),
+            threading.Thread(target=self._dispatch_stage, args=(executor, fetch_queue, result_queue, stats),
+                             name="pipeline-generate", daemon=True)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            self._sink_stage(result_queue, stats)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            # Los lotes que quedaron en cola se cancelan a mano (cancel_futures requiere Python 3.9)
+            self._cancel_pending(result_queue)
+            executor.shutdown(wait=True)
+            if hasattr(self.sink, 'close'):
+                self.sink.close()
+            stats.elapsed_seconds = time.perf_counter() - started
+
+        stats.report()
+        if self._error is not None:
+            raise self._error
+        return stats
+
+    def _fail(self, error: BaseException):
+        if self._error is None:
+            self._error = error
+        self._stop.set()
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        """put bloqueante que se interrumpe si el pipeline se detiene"""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue, stage: StageStats) -> Any:
+        stage.record_queue_depth(source.qsize())
+        while True:
+            try:
+                return source.get(timeout=0.2)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return _END
+
+    @staticmethod
+    def _cancel_pending(result_queue: queue.Queue):
+        """Cancela los lotes enviados al pool que nadie va a recoger"""
+        while True:
+            try:
+                entry = result_queue.get_nowait()
+            except queue.Empty:
+                return
+            if entry is not _END:
+                entry[1].cancel()
+
+    # ==================== ETAPAS ====================
+
+    def _fetch_stage(self, issues: Iterable[Dict[str, Any]], fetch_queue: queue.Queue, stats: PipelineStats):
+        """Lee issues (el iterador pagina contra Linear) y los agrupa en lotes"""
+        stage = stats.fetch
+        try:
+            iterator = iter(issues)
+            chunk: List[Dict[str, Any]] = []
+            while not self._stop.is_set():
+                waited = time.perf_counter()
+                issue = next(iterator, _END)
+                stage.busy_seconds += time.perf_counter() - waited
+                if issue is _END:
+                    break
+                chunk.append(issue)
+                stage.items += 1
+                if len(chunk) >= self.chunk_size:
+                    stage.batches += 1
+                    if not self._put(fetch_queue, chunk):
+                        return
+                    chunk = []
+            if chunk:
+                stage.batches += 1
+                self._put(fetch_queue, chunk)
+        except Exception as e:
+            stage.errors += 1
+            print(f"[ERROR] Etapa fetch del pipeline: {e}", flush=True)
+            self._fail(e)
+        finally:
+            self._put(fetch_queue, _END)
+
+    def _dispatch_stage(self, executor, fetch_queue: queue.Queue, result_queue: queue.Queue, stats: PipelineStats):
+        """Envía cada lote al pool; la cola de resultados limita las tareas en vuelo"""
+        try:
+            while True:
+                chunk = self._get(fetch_queue, stats.generate)
+                if chunk is _END:
+                    break
+                future = executor.submit(_generate_chunk, chunk, self.template)
+                if not self._put(result_queue, (len(chunk), future)):
+                    future.cancel()
+                    break
+        except Exception as e:
+            print(f"[ERROR] Etapa generate del pipeline: {e}", flush=True)
+            self._fail(e)
+        finally:
+            self._put(result_queue, _END)
+
+    def _sink_stage(self, result_queue: queue.Queue, stats: PipelineStats):
+        """Recoge los lotes en orden de envío y los entrega al destino"""
+        while True:
+            entry = self._get(result_queue, stats.sink)
+            if entry is _END:
+                return
+            issue_count, future = entry
+            try:
+                results, cpu_seconds = future.result()
+            except Exception as e:
+                stats.generate.errors += 1
+                print(f"[WARN] Lote de {issue_count} issues falló en la generación: {e}", flush=True)
+                continue
+            stats.generate.items += issue_count
+            stats.generate.batches += 1
+            stats.generate.busy_seconds += cpu_seconds
+
+            started = time.perf_counter()
+            self.sink(results)
+            stats.sink.busy_seconds += time.perf_counter() - started
+            stats.sink.items += len(results)
+            stats.sink.batches += 1
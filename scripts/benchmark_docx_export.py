@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de Exportación Word
+Compara AdvancedExporter.export_to_word con el modelo de objetos de python-docx (fast=False)
+contra el motor de plantilla de exporters/fast_docx.py y verifica que ambos documentos
+tengan la misma estructura (párrafos, estilos, tablas y textos).
+
+Uso:
+    python scripts/benchmark_docx_export.py --sizes 100,1000,5000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'exporters'))
+from advanced_exporter import AdvancedExporter
+from fast_docx import get_report_template
+from docx import Document
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+TEST_TYPES = ['Funcional', 'Integración', 'Negativo', 'Caso límite']
+
+
+def build_cases(count: int):
+    """Casos de prueba sintéticos con el formato del proyecto"""
+    return [
+        {
+            'id': f'TC-{i:04d}',
+            'title': f'Validar escenario {i} del flujo de pagos',
+            'description': f'Verificar el comportamiento del escenario {i} con datos válidos',
+            'test_type': TEST_TYPES[i % len(TEST_TYPES)],
+            'priority': ('Alta', 'Media', 'Baja')[i % 3],
+            'preconditions': ['Usuario autenticado', 'Saldo disponible'],
+            'steps': ['Abrir el módulo de pagos', f'Ejecutar la acción {i}', 'Confirmar la operación'],
+            'expected_result': 'La operación se registra correctamente',
+            'tags': ['pagos', 'regresion']
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def document_structure(path: str):
+    """(tipo, estilo, contenido) de cada bloque del cuerpo, sin la fecha de generación"""
+    doc = Document(path)
+    blocks = []
+    for element in doc.element.body.iterchildren():
+        tag = element.tag.split('}')[1]
+        if tag == 'p':
+            paragraph = Paragraph(element, doc)
+            blocks.append(('p', paragraph.style.name, paragraph.text, paragraph.alignment))
+        elif tag == 'tbl':
+            table = Table(element, doc)
+            rows = [[cell.text for cell in row.cells] for row in table.rows]
+            blocks.append(('tbl', table.style.name, table.alignment,
+                           [row for row in rows if row[0] != 'Fecha de Generación']))
+    return blocks
+
+
+def measure(folder: str, cases, fast: bool):
+    # Carpeta distinta por motor: ambos archivos llevan el mismo nombre de proyecto
+    exporter = AdvancedExporter(os.path.join(folder, 'plantilla' if fast else 'python-docx'))
+    started = time.perf_counter()
+    path = exporter.export_to_word(cases, "benchmark", "Historia de usuario", fast=fast)
+    return time.perf_counter() - started, path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de exportación Word")
+    parser.add_argument('--sizes', default='100,1000,5000')
+    parser.add_argument('--skip-check', action='store_true', help="No comparar la estructura de los documentos")
+    args = parser.parse_args()
+
+    # La plantilla se construye una vez por proceso; se mide aparte
+    started = time.perf_counter()
+    get_report_template()
+    print(f"[INFO] Plantilla DOCX construida en {time.perf_counter() - started:.3f}s")
+
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"       {'casos':>6} {'python-docx':>12} {'plantilla':>10} {'x':>6} {'KB':>7} {'estructura':>10}")
+        for size in [int(value) for value in args.sizes.split(',')]:
+            cases = build_cases(size)
+            legacy_seconds, legacy_path = measure(folder, cases, fast=False)
+            fast_seconds, fast_path = measure(folder, cases, fast=True)
+            same = 'n/d' if args.skip_check else (
+                'igual' if document_structure(legacy_path) == document_structure(fast_path) else 'DISTINTA')
+            print(f"       {size:>6} {legacy_seconds:>11.2f}s {fast_seconds:>9.2f}s "
+                  f"{legacy_seconds / fast_seconds:>5.0f}x {os.path.getsize(fast_path) // 1024:>7} {same:>10}")
+
+
+if __name__ == "__main__":
+    main()
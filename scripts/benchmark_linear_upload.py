@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de Subida y Sincronización contra Linear Simulado
+Levanta scripts/mock_linear_server.py en el mismo proceso y mide upload_test_cases_as_subissues
+y sync_test_cases con distintos tamaños de lote y concurrencia.
+
+Uso:
+    python scripts/benchmark_linear_upload.py --cases 200 --latency-ms 80 --jitter-ms 30
+
+--max-rate fija el techo del token bucket (peticiones por segundo); el servidor simulado no
+limita por ritmo, así que un techo alto deja ver lo que aporta la concurrencia.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from mock_linear_server import MockConfig, MockLinearServer
+from linear_api_client import LinearAPIClient
+from linear_upload_jobs import UploadJob
+
+MOCK_API_KEY = "lin_api_mock_benchmark"
+
+
+def build_cases(count: int):
+    """Casos de prueba sintéticos con el formato del proyecto"""
+    return [
+        {
+            'test_case_id': f'TC-{i:03d}',
+            'title': f'Validar escenario {i} del flujo de pagos',
+            'description': f'Verificar el comportamiento del escenario {i}',
+            'preconditions': 'Usuario autenticado',
+            'steps': f'1. Abrir el módulo\n2. Ejecutar la acción {i}\n3. Confirmar',
+            'expected_result': 'La operación se registra correctamente',
+            'priority': ('Alta', 'Media', 'Baja')[i % 3],
+            'type': 'Funcional'
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def run_upload(config: MockConfig, cases, batch_size: int, concurrency: int, max_rate: float):
+    with MockLinearServer(config) as server:
+        client = LinearAPIClient(MOCK_API_KEY, batch_size=batch_size, max_concurrency=concurrency,
+                                 base_url=server.url, max_rate=max_rate)
+        started = time.perf_counter()
+        created = client.upload_test_cases_as_subissues("FIN-1", cases)
+        elapsed = time.perf_counter() - started
+        return elapsed, len(created), dict(server.stats)
+
+
+def run_sync(config: MockConfig, cases, edit_ratio: float):
+    with MockLinearServer(config) as server:
+        client = LinearAPIClient(MOCK_API_KEY, base_url=server.url)
+        job = UploadJob(project_id="benchmark", parent_issue_identifier="FIN-1")
+        client.upload_test_cases_as_subissues("FIN-1", cases, job=job)
+
+        edited = [dict(case) for case in cases]
+        for case in edited[::max(1, int(1 / edit_ratio))]:
+            case['steps'] += '\n4. Paso agregado'
+        requests_before = server.stats['requests']
+        started = time.perf_counter()
+        plan = client.sync_test_cases("FIN-1", edited, job=job, dry_run=False)
+        elapsed = time.perf_counter() - started
+        return elapsed, plan.summary(), server.stats['requests'] - requests_before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de subida a Linear (servidor simulado)")
+    parser.add_argument('--cases', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--jitter-ms', type=float, default=20.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--batch-sizes', default='1,10,25')
+    parser.add_argument('--concurrency', default='1,4')
+    parser.add_argument('--edit-ratio', type=float, default=0.05)
+    parser.add_argument('--max-rate', type=float, default=100.0)
+    args = parser.parse_args()
+
+    config = MockConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                        error_rate=args.error_rate, seed=42)
+    cases = build_cases(args.cases)
+
+    # Silenciar el log por caso del cliente durante las mediciones
+    stdout = sys.stdout
+    results = []
+    for batch_size in [int(value) for value in args.batch_sizes.split(',')]:
+        for concurrency in [int(value) for value in args.concurrency.split(',')]:
+            sys.stdout = open(os.devnull, 'w')
+            try:
+                elapsed, created, stats = run_upload(config, cases, batch_size, concurrency, args.max_rate)
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+            results.append((batch_size, concurrency, elapsed, created, stats))
+
+    print(f"[INFO] Subida de {args.cases} casos (latencia {args.latency_ms}±{args.jitter_ms} ms, "
+          f"techo {args.max_rate:g} peticiones/s)")
+    print(f"       {'lote':>5} {'conc.':>5} {'segundos':>9} {'casos/s':>8} {'creados':>8} {'peticiones':>10}")
+    for batch_size, concurrency, elapsed, created, stats in results:
+        print(f"       {batch_size:>5} {concurrency:>5} {elapsed:>9.2f} {created / elapsed:>8.1f} "
+              f"{created:>8} {stats['requests']:>10}")
+
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        elapsed, summary, requests_used = run_sync(config, cases, args.edit_ratio)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    print(f"[INFO] Sincronización tras editar {args.edit_ratio:.0%} de los casos: {elapsed:.2f}s, "
+          f"{requests_used} peticiones, {summary}")
+
+
+if __name__ == "__main__":
+    main()
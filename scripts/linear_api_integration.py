@@ -6,22 +6,22 @@ Sube casos de prueba directamente sin CSV manual
 """
 
 import os
+import sys
 import json
-import requests
 from typing import List, Dict, Any
 from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from linear_transport import LinearTransport
 
 class LinearAPIIntegration:
     """Integración directa con Linear API"""
     
-    def __init__(self, api_key: str, team_id: str):
+    def __init__(self, api_key: str, team_id: str, base_url: str = None):
         self.api_key = api_key
         self.team_id = team_id
-        self.base_url = "https://api.linear.app/graphql"
-        self.headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
+        self.transport = LinearTransport(api_key, base_url=base_url)
+        self.base_url = self.transport.base_url
+        self.headers = self.transport.headers
     
     def create_test_case_issue(self, test_case: Dict[str, Any]) -> str:
         """Crea un issue en Linear para un caso de prueba"""
@@ -61,11 +61,7 @@ class LinearAPIIntegration:
             }
         }
         
-        response = requests.post(
-            self.base_url,
-            headers=self.headers,
-            json={"query": mutation, "variables": variables}
-        )
+        response = self.transport.post(mutation, variables)
         
         if response.status_code == 200:
             result = response.json()
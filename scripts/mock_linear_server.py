@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor Simulado de la API GraphQL de Linear
+Implementa en memoria las consultas y mutaciones que usa la herramienta (viewer, teams,
+issue, issues, team.labels, team.states, issueCreate/issueUpdate/issueArchive, incluidos
+los lotes con alias) para probar y medir las subidas sin un workspace real.
+
+Uso:
+    python scripts/mock_linear_server.py --port 8765 --latency-ms 80 --jitter-ms 40
+    set LINEAR_API_URL=http://127.0.0.1:8765/graphql   (o export en bash)
+"""
+
+import argparse
+import gzip
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# ==================== CONFIGURACIÓN ====================
+
+@dataclass
+class MockConfig:
+    """Comportamiento simulado del servidor"""
+    latency_ms: float = 0.0           # Latencia base por petición
+    jitter_ms: float = 0.0            # Variación aleatoria (+/-) sobre la latencia
+    error_rate: float = 0.0           # Probabilidad de responder HTTP 500
+    alias_error_rate: float = 0.0     # Probabilidad de fallar cada mutación (error GraphQL con path)
+    requests_limit: int = 1500        # Peticiones por ventana (X-RateLimit-Requests-*)
+    complexity_limit: int = 250000    # Complejidad por ventana (X-RateLimit-Complexity-*)
+    window_seconds: float = 3600.0    # Duración de la ventana de rate limit
+    seed: Optional[int] = None
+
+
+# ==================== MINI PARSER GRAPHQL ====================
+# Soporta el subconjunto que usan los clientes: operación opcional con variables,
+# campos con alias, argumentos (variables, literales, objetos, listas) y sub-selecciones.
+
+_TOKEN = re.compile(r'\s*(?:(#[^\n]*)|(\.\.\.)|([{}()\[\]:!$,=@])|("(?:[^"\\]|\\.)*")|(-?\d+(?:\.\d+)?)|([_A-Za-z][_0-9A-Za-z]*))')
+
+
+@dataclass
+class Field:
+    name: str
+    alias: str
+    args: Dict[str, Any]
+    selections: Optional[List["Field"]]
+
+
+class _Variable:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class GraphQLSyntaxError(Exception):
+    pass
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.tokens: List[str] = []
+        position = 0
+        text = text.strip()
+        while position < len(text):
+            match = _TOKEN.match(text, position)
+            if not match or match.end() == position:
+                raise GraphQLSyntaxError(f"Token inválido cerca de: {text[position:position + 20]!r}")
+            position = match.end()
+            token = next((group for group in match.groups()[1:] if group is not None), None)
+            if token is not None:
+                self.tokens.append(token)
+        self.position = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self, expected: Optional[str] = None) -> str:
+        token = self.peek()
+        if token is None or (expected is not None and token != expected):
+            raise GraphQLSyntaxError(f"Se esperaba {expected or 'un token'} y llegó {token!r}")
+        self.position += 1
+        return token
+
+    def document(self) -> Tuple[str, List[Field]]:
+        operation = 'query'
+        if self.peek() in ('query', 'mutation'):
+            operation = self.take()
+            if self.peek() not in ('(', '{'):
+                self.take()  # Nombre de la operación
+            if self.peek() == '(':
+                self._skip_balanced('(', ')')  # Definición de variables
+        return operation, self.selection_set()
+
+    def _skip_balanced(self, opening: str, closing: str):
+        depth = 0
+        while True:
+            token = self.take()
+            if token == opening:
+                depth += 1
+            elif token == closing:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def selection_set(self) -> List[Field]:
+        self.take('{')
+        fields = []
+        while self.peek() != '}':
+            fields.append(self.field())
+            if self.peek() == ',':
+                self.take()
+        self.take('}')
+        return fields
+
+    def field(self) -> Field:
+        alias = name = self.take()
+        if self.peek() == ':':
+            self.take()
+            name = self.take()
+        args = {}
+        if self.peek() == '(':
+            self.take('(')
+            while self.peek() != ')':
+                arg_name = self.take()
+                self.take(':')
+                args[arg_name] = self.value()
+                if self.peek() == ',':
+                    self.take()
+            self.take(')')
+        selections = self.selection_set() if self.peek() == '{' else None
+        return Field(name=name, alias=alias, args=args, selections=selections)
+
+    def value(self) -> Any:
+        token = self.take()
+        if token == '$':
+            return _Variable(self.take())
+        if token == '{':
+            result = {}
+            while self.peek() != '}':
+                key = self.take()
+                self.take(':')
+                result[key] = self.value()
+                if self.peek() == ',':
+                    self.take()
+            self.take('}')
+            return result
+        if token == '[':
+            items = []
+            while self.peek() != ']':
+                items.append(self.value())
+                if self.peek() == ',':
+                    self.take()
+            self.take(']')
+            return items
+        if token.startswith('"'):
+            return json.loads(token)
+        if re.fullmatch(r'-?\d+', token):
+            return int(token)
+        if re.fullmatch(r'-?\d+\.\d+', token):
+            return float(token)
+        return {'true': True, 'false': False, 'null': None}.get(token, token)
+
+
+def _bind(value: Any, variables: Dict[str, Any]) -> Any:
+    """Sustituye las variables en los argumentos"""
+    if isinstance(value, _Variable):
+        return variables.get(value.name)
+    if isinstance(value, dict):
+        return {key: _bind(item, variables) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_bind(item, variables) for item in value]
+    return value
+
+
+class FieldError(Exception):
+    """Error de un campo raíz (se reporta con su path, como hace Linear)"""
+
+
+# ==================== ALMACÉN EN MEMORIA ====================
+
+class LinearStore:
+    """Equipos, labels, estados e issues del workspace simulado"""
+
+    def __init__(self, team_key: str = "FIN", team_name: str = "Finanzas"):
+        self.lock = threading.RLock()
+        self.viewer = {'id': 'user-mock', 'name': 'QA Mock', 'email': 'qa@mock.local'}
+        self.teams: List[Dict[str, Any]] = []
+        self.issues: Dict[str, Dict[str, Any]] = {}
+        self._counters: Dict[str, int] = {}
+        self._clock = 0
+        team = self.add_team(team_key, team_name)
+        self.add_issue(team['id'], "Historia de usuario de ejemplo",
+                       "Como usuario quiero probar la subida de casos de prueba")
+
+    def add_team(self, key: str, name: str) -> Dict[str, Any]:
+        with self.lock:
+            team_id = f"team-{key.lower()}"
+            team = {
+                'id': team_id, 'key': key, 'name': name,
+                'labels': [{'id': f"{team_id}-label-test-case", 'name': 'Test_Case'}],
+                'states': [
+                    {'id': f"{team_id}-state-triage", 'name': 'Triage', 'type': 'triage'},
+                    {'id': f"{team_id}-state-todo", 'name': 'Todo', 'type': 'unstarted'},
+                    {'id': f"{team_id}-state-progress", 'name': 'In Progress', 'type': 'started'},
+                    {'id': f"{team_id}-state-done", 'name': 'Done', 'type': 'completed'}
+                ]
+            }
+            self.teams.append(team)
+            return team
+
+    def team(self, team_id: Optional[str] = None, name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        return next((team for team in self.teams
+                     if team['id'] == team_id or (name and team['name'] == name) or team['key'] == team_id), None)
+
+    def add_issue(self, team_id: str, title: str, description: str = "", parent_id: Optional[str] = None,
+                  priority: int = 0, label_ids: Optional[List[str]] = None,
+                  state_id: Optional[str] = None) -> Dict[str, Any]:
+        with self.lock:
+            team = self.team(team_id)
+            if team is None:
+                raise FieldError(f"Entity not found: Team {team_id}")
+            if parent_id is not None and self.find_issue(parent_id) is None:
+                raise FieldError(f"Entity not found: Issue {parent_id}")
+            number = self._counters[team['key']] = self._counters.get(team['key'], 0) + 1
+            self._clock += 1
+            issue = {
+                'id': str(uuid.uuid4()),
+                'identifier': f"{team['key']}-{number}",
+                'title': title,
+                'description': description,
+                'priority': priority,
+                'teamId': team['id'],
+                'parentId': self.find_issue(parent_id)['id'] if parent_id else None,
+                'stateId': state_id or team['states'][0]['id'],
+                'labelIds': list(label_ids or []),
+                'archived': False,
+                'updatedAt': self._clock
+            }
+            self.issues[issue['id']] = issue
+            return issue
+
+    def find_issue(self, id_or_identifier: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not id_or_identifier:
+            return None
+        issue = self.issues.get(id_or_identifier)
+        if issue is None:
+            issue = next((item for item in self.issues.values()
+                          if item['identifier'] == id_or_identifier), None)
+        return issue if issue is not None and not issue['archived'] else None
+
+    def update_issue(self, issue_id: str, changes: Dict[str, Any]) -> Dict[str, Any]:
+        with self.lock:
+            issue = self.find_issue(issue_id)
+            if issue is None:
+                raise FieldError(f"Entity not found: Issue {issue_id}")
+            for key in ('title', 'description', 'priority', 'stateId', 'labelIds'):
+                if key in changes:
+                    issue[key] = changes[key]
+            self._clock += 1
+            issue['updatedAt'] = self._clock
+            return issue
+
+    def archive_issue(self, issue_id: str):
+        with self.lock:
+            issue = self.find_issue(issue_id)
+            if issue is None:
+                raise FieldError(f"Entity not found: Issue {issue_id}")
+            issue['archived'] = True
+
+    def children(self, parent_id: str) -> List[Dict[str, Any]]:
+        return [issue for issue in self.issues.values() if issue['parentId'] == parent_id and not issue['archived']]
+
+
+def _connection(items: List[Dict[str, Any]], args: Dict[str, Any], view) -> Dict[str, Any]:
+    """Conexión paginada por cursor (el cursor es la posición en la lista)"""
+    first = min(int(args.get('first') or 50), 250)
+    start = int(args.get('after') or 0)
+    page = items[start:start + first]
+    return {
+        'nodes': [view(item) for item in page],
+        'pageInfo': {'hasNextPage': start + first < len(items), 'endCursor': str(start + len(page))}
+    }
+
+
+# ==================== RESOLUCIÓN ====================
+
+class MockLinearAPI:
+    """Resuelve documentos GraphQL contra el almacén en memoria"""
+
+    def __init__(self, store: LinearStore, config: MockConfig):
+        self.store = store
+        self.config = config
+        self.random = random.Random(config.seed)
+
+    # ---- Vistas de las entidades (los campos con argumentos son funciones) ----
+
+    def team_view(self, team: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'id': team['id'], 'key': team['key'], 'name': team['name'],
+            'labels': {'nodes': team['labels']},
+            'states': {'nodes': team['states']},
+            'issues': lambda args: _connection(
+                [issue for issue in self.store.issues.values()
+                 if issue['teamId'] == team['id'] and not issue['archived']], args, self.issue_view)
+        }
+
+    def issue_view(self, issue: Dict[str, Any]) -> Dict[str, Any]:
+        team = self.store.team(issue['teamId'])
+        state = next((state for state in team['states'] if state['id'] == issue['stateId']), None)
+        labels = [label for label in team['labels'] if label['id'] in issue['labelIds']]
+        return {
+            'id': issue['id'], 'identifier': issue['identifier'], 'title': issue['title'],
+            'description': issue['description'], 'priority': issue['priority'],
+            'url': f"https://linear.mock/issue/{issue['identifier']}",
+            'team': {'id': team['id'], 'key': team['key'], 'name': team['name']},
+            'state': state,
+            'labels': {'nodes': labels},
+            'assignee': None,
+            'parent': ({'id': issue['parentId']} if issue['parentId'] else None),
+            'children': lambda args: _connection(self.store.children(issue['id']), args, self.issue_view)
+        }
+
+    # ---- Campos raíz ----
+
+    def resolve_root(self, operation: str, field: Field) -> Any:
+        args = field.args
+        if operation == 'query':
+            if field.name == 'viewer':
+                return self.store.viewer
+            if field.name == 'teams':
+                return {'nodes': [self.team_view(team) for team in self.store.teams]}
+            if field.name == 'team':
+                team = self.store.team(args.get('id'), args.get('name'))
+                return self.team_view(team) if team else None
+            if field.name == 'issue':
+                issue = self.store.find_issue(args.get('id'))
+                return self.issue_view(issue) if issue else None
+            if field.name == 'issues':
+                return _connection(self._filter_issues(args.get('filter') or {}), args, self.issue_view)
+        elif field.name in ('issueCreate', 'issueUpdate', 'issueArchive'):
+            if self.config.alias_error_rate and self.random.random() < self.config.alias_error_rate:
+                raise FieldError("Simulated mutation failure")
+            if field.name == 'issueCreate':
+                data = args.get('input') or {}
+                if not data.get('title') or not data.get('teamId'):
+                    raise FieldError("Argument Validation Error: title and teamId are required")
+                issue = self.store.add_issue(data['teamId'], data['title'], data.get('description') or "",
+                                             data.get('parentId'), data.get('priority') or 0,
+                                             data.get('labelIds'), data.get('stateId'))
+                return {'success': True, 'issue': self.issue_view(issue)}
+            if field.name == 'issueUpdate':
+                issue = self.store.update_issue(args.get('id'), args.get('input') or {})
+                return {'success': True, 'issue': self.issue_view(issue)}
+            self.store.archive_issue(args.get('id'))
+            return {'success': True}
+        raise FieldError(f"Cannot query field \"{field.name}\" on type \"{operation.capitalize()}\"")
+
+    def _filter_issues(self, issue_filter: Dict[str, Any]) -> List[Dict[str, Any]]:
+        issues = [issue for issue in self.store.issues.values() if not issue['archived']]
+        label_names = ((issue_filter.get('labels') or {}).get('contains')) or []
+        team_id = (((issue_filter.get('team') or {}).get('id')) or {}).get('eq')
+        if team_id:
+            issues = [issue for issue in issues if issue['teamId'] == team_id]
+        if label_names:
+            def names(issue):
+                team = self.store.team(issue['teamId'])
+                return {label['name'] for label in team['labels'] if label['id'] in issue['labelIds']}
+            issues = [issue for issue in issues if set(label_names) <= names(issue)]
+        return sorted(issues, key=lambda issue: issue['updatedAt'], reverse=True)
+
+    def project(self, value: Any, selections: Optional[List[Field]], variables: Dict[str, Any]) -> Any:
+        """Aplica la selección de campos al valor resuelto"""
+        if selections is None or value is None:
+            return value
+        if isinstance(value, list):
+            return [self.project(item, selections, variables) for item in value]
+        result = {}
+        for field in selections:
+            item = value.get(field.name)
+            if callable(item):
+                item = item(_bind(field.args, variables))
+            result[field.alias] = self.project(item, field.selections, variables)
+        return result
+
+    def execute(self, query: str, variables: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        """Ejecuta un documento y devuelve (respuesta JSON, complejidad aproximada)"""
+        try:
+            operation, fields = _Parser(query).document()
+        except GraphQLSyntaxError as e:
+            return {'errors': [{'message': f"Syntax Error: {e}"}]}, 0
+
+        data: Dict[str, Any] = {}
+        errors = []
+        complexity = 0
+        for field in fields:
+            bound = Field(field.name, field.alias, _bind(field.args, variables), field.selections)
+            try:
+                with self.store.lock:
+                    data[field.alias] = self.project(self.resolve_root(operation, bound),
+                                                     field.selections, variables)
+            except FieldError as e:
+                data[field.alias] = None
+                errors.append({'message': str(e), 'path': [field.alias]})
+            complexity += 1 + (10 if operation == 'mutation' else len(field.selections or []))
+        response: Dict[str, Any] = {'data': data}
+        if errors:
+            response['errors'] = errors
+        return response, complexity
+
+
+# ==================== SERVIDOR HTTP ====================
+
+class _RateWindow:
+    """Presupuesto de peticiones y complejidad por ventana de tiempo"""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.reset_at = time.time() + config.window_seconds
+        self.requests = config.requests_limit
+        self.complexity = config.complexity_limit
+
+    def consume(self, complexity: int) -> Tuple[bool, Dict[str, str]]:
+        with self.lock:
+            now = time.time()
+            if now >= self.reset_at:
+                self.reset_at = now + self.config.window_seconds
+                self.requests = self.config.requests_limit
+                self.complexity = self.config.complexity_limit
+            allowed = self.requests > 0 and self.complexity >= complexity
+            if allowed:
+                self.requests -= 1
+                self.complexity -= complexity
+            reset_ms = str(int(self.reset_at * 1000))
+            return allowed, {
+                'X-RateLimit-Requests-Limit': str(self.config.requests_limit),
+                'X-RateLimit-Requests-Remaining': str(max(0, self.requests)),
+                'X-RateLimit-Requests-Reset': reset_ms,
+                'X-RateLimit-Complexity-Limit': str(self.config.complexity_limit),
+                'X-RateLimit-Complexity-Remaining': str(max(0, self.complexity)),
+                'X-RateLimit-Complexity-Reset': reset_ms
+            }
+
+
+class MockLinearServer:
+    """
+    Servidor HTTP con la API simulada
+
+        with MockLinearServer(MockConfig(latency_ms=50)) as server:
+            client = LinearAPIClient("lin_api_mock", base_url=server.url)
+    """
+
+    def __init__(self, config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0,
+                 store: Optional[LinearStore] = None):
+        self.config = config or MockConfig()
+        self.store = store or LinearStore()
+        self.api = MockLinearAPI(self.store, self.config)
+        self.window = _RateWindow(self.config)
+        self.stats = {'requests': 0, 'errors_500': 0, 'throttled_429': 0, 'mutations': 0}
+        self._stats_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/graphql"
+
+    def start(self) -> "MockLinearServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-linear", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def __enter__(self) -> "MockLinearServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, como la API real
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.headers.get('Content-Encoding') == 'gzip':
+                    raw = gzip.decompress(raw)
+                server._count('requests')
+
+                config = server.config
+                delay = config.latency_ms + (server.api.random.uniform(-1, 1) * config.jitter_ms)
+                if delay > 0:
+                    time.sleep(delay / 1000)
+
+                if not self.headers.get('Authorization'):
+                    self._send(401, {'errors': [{'message': 'Authentication required'}]})
+                    return
+                if config.error_rate and server.api.random.random() < config.error_rate:
+                    server._count('errors_500')
+                    self._send(500, {'errors': [{'message': 'Simulated internal error'}]})
+                    return
+
+                try:
+                    body = json.loads(raw or b'{}')
+                except ValueError:
+                    self._send(400, {'errors': [{'message': 'Invalid JSON body'}]})
+                    return
+
+                response, complexity = server.api.execute(body.get('query', ''), body.get('variables') or {})
+                allowed, headers = server.window.consume(complexity)
+                if not allowed:
+                    server._count('throttled_429')
+                    self._send(429, {'errors': [{'message': 'Rate limit exceeded',
+                                                 'extensions': {'code': 'RATELIMITED'}}]}, headers)
+                    return
+                if body.get('query', '').lstrip().startswith('mutation'):
+                    server._count('mutations')
+                status = 400 if 'errors' in response and not response.get('data') else 200
+                self._send(status, response, headers)
+
+            def do_GET(self):
+                self._send(200, {'status': 'ok', 'issues': len(server.store.issues), 'stats': server.stats})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor simulado de la API GraphQL de Linear")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--alias-error-rate', type=float, default=0.0)
+    parser.add_argument('--requests-limit', type=int, default=1500)
+    parser.add_argument('--complexity-limit', type=int, default=250000)
+    parser.add_argument('--window-seconds', type=float, default=3600.0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        alias_error_rate=args.alias_error_rate, requests_limit=args.requests_limit,
+        complexity_limit=args.complexity_limit, window_seconds=args.window_seconds, seed=args.seed
+    )
+    server = MockLinearServer(config, host=args.host, port=args.port)
+    print(f"[OK] Linear simulado en {server.url} (HU de ejemplo: FIN-1)", flush=True)
+    print(f"[INFO] Configura LINEAR_API_URL={server.url} para que los clientes lo usen", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[INFO] Servidor detenido", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Almacén de Artefactos Exportados (outputs/)
+Lleva un índice de los archivos exportados y aplica retención: antigüedad máxima,
+tamaño total máximo y número máximo de archivos por proyecto. La recolección corre
+en un hilo en segundo plano y también se puede lanzar a mano.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+# Límites de retención (0 = sin límite)
+OUTPUTS_MAX_AGE_DAYS = float(os.environ.get('OUTPUTS_MAX_AGE_DAYS', '30'))
+OUTPUTS_MAX_MB = float(os.environ.get('OUTPUTS_MAX_MB', '500'))
+OUTPUTS_MAX_PER_PROJECT = int(os.environ.get('OUTPUTS_MAX_PER_PROJECT', '10'))
+
+# Archivos modificados hace menos de esto no se adoptan ni se borran (pueden estar a medio escribir)
+OUTPUTS_MIN_AGE_SECONDS = float(os.environ.get('OUTPUTS_MIN_AGE_SECONDS', '10'))
+
+# Cada cuánto corre la recolección en segundo plano
+OUTPUTS_GC_INTERVAL_SECONDS = float(os.environ.get('OUTPUTS_GC_INTERVAL_SECONDS', '3600'))
+
+INDEX_FILENAME = '.artifacts.json'
+
+# Tipo de artefacto según el nombre que usan los exportadores
+ARTIFACT_KINDS = [
+    ('linear_subissues_csv', re.compile(r'^linear_subissues_.*\.csv$')),
+    ('linear_csv', re.compile(r'^(linear_test_cases_|proyecto_.*_linear).*\.csv$')),
+    ('linear_import', re.compile(r'^linear_import_.*\.(json|csv)$')),
+    ('xlsx', re.compile(r'\.xlsx$')),
+    ('docx', re.compile(r'\.docx$')),
+    ('zip', re.compile(r'\.zip$')),
+    ('feature', re.compile(r'\.feature$')),
+    ('jsonl', re.compile(r'\.jsonl$')),
+    ('csv', re.compile(r'\.csv$')),
+]
+
+# Id de proyecto dentro del nombre de archivo (proj_<n>_<timestamp>)
+_PROJECT_ID = re.compile(r'(proj_\d+_\d+)')
+
+
+def classify_artifact(filename: str) -> str:
+    for kind, pattern in ARTIFACT_KINDS:
+        if pattern.search(filename):
+            return kind
+    return 'other'
+
+
+@dataclass
+class Artifact:
+    """Archivo exportado registrado en el índice"""
+    name: str
+    kind: str
+    size: int
+    created_at: float
+    project_id: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['age_hours'] = round((time.time() - self.created_at) / 3600, 2)
+        return data
+
+
+class ArtifactStore:
+    """
+    Índice y retención de la carpeta de exportaciones
+
+    Los archivos se registran al crearse (register) y los que aparezcan sin registrar
+    (exportadores usados por consola, versiones anteriores) se adoptan en cada
+    recolección. Solo se gestionan salidas de los exportadores (ARTIFACT_KINDS): los
+    archivos de tipo 'other', los modificados hace menos de OUTPUTS_MIN_AGE_SECONDS y
+    las subcarpetas, como la caché de exportaciones, no se tocan.
+    """
+
+    def __init__(self, folder: str = 'outputs', max_age_days: float = OUTPUTS_MAX_AGE_DAYS,
+                 max_total_mb: float = OUTPUTS_MAX_MB, max_per_project: int = OUTPUTS_MAX_PER_PROJECT,
+                 min_age_seconds: float = OUTPUTS_MIN_AGE_SECONDS):
+        self.folder = os.path.abspath(folder)
+        self.index_path = os.path.join(self.folder, INDEX_FILENAME)
+        self.max_age_seconds = max_age_days * 86400
+        self.max_total_bytes = int(max_total_mb * 1024 * 1024)
+        self.max_per_project = max_per_project
+        self.min_age_seconds = min_age_seconds
+        self._artifacts: Dict[str, Artifact] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_gc: Optional[Dict[str, Any]] = None
+        self._load_index()
+
+    # ==================== ÍNDICE ====================
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for data in json.load(f):
+                    artifact = Artifact(**data)
+                    self._artifacts[artifact.name] = artifact
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            print(f"[WARN] Índice de outputs/ inválido, se reconstruye: {e}", flush=True)
+            self._artifacts = {}
+
+    def _save_index(self):
+        os.makedirs(self.folder, exist_ok=True)
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump([asdict(artifact) for artifact in self._artifacts.values()], f, ensure_ascii=False)
+        os.replace(temp_path, self.index_path)
+
+    def register(self, path: str, project_id: Optional[str] = None) -> Optional[Artifact]:
+        """Registra un archivo recién exportado en outputs/ (rutas fuera de la carpeta o de tipo 'other' se ignoran)"""
+        path = os.path.abspath(path)
+        if os.path.dirname(path) != self.folder or not os.path.isfile(path):
+            return None
+        name = os.path.basename(path)
+        kind = classify_artifact(name)
+        if kind == 'other':
+            return None
+        stat = os.stat(path)
+        artifact = Artifact(name=name, kind=kind, size=stat.st_size,
+                            created_at=stat.st_mtime, project_id=project_id or self._guess_project(name))
+        with self._lock:
+            self._artifacts[name] = artifact
+            self._save_index()
+        return artifact
+
+    @staticmethod
+    def _guess_project(name: str) -> Optional[str]:
+        match = _PROJECT_ID.search(name)
+        return match.group(1) if match else None
+
+    def _sync_with_disk(self):
+        """Adopta exportaciones sin registrar y olvida las que ya no existen (con el lock tomado)"""
+        on_disk = {}
+        if os.path.isdir(self.folder):
+            for entry in os.scandir(self.folder):
+                if entry.is_file() and not entry.name.startswith('.') and classify_artifact(entry.name) != 'other':
+                    on_disk[entry.name] = entry.stat()
+        for name in list(self._artifacts):
+            # Índices de versiones anteriores podían incluir archivos 'other': se olvidan sin borrarlos
+            if name not in on_disk:
+                del self._artifacts[name]
+        adopt_before = time.time() - self.min_age_seconds
+        for name, stat in on_disk.items():
+            artifact = self._artifacts.get(name)
+            if artifact is None:
+                if stat.st_mtime > adopt_before:
+                    continue
+                self._artifacts[name] = Artifact(name=name, kind=classify_artifact(name), size=stat.st_size,
+                                                 created_at=stat.st_mtime, project_id=self._guess_project(name))
+            else:
+                artifact.size = stat.st_size
+
+    # ==================== RECOLECCIÓN ====================
+
+    def _expired(self, now: float) -> List[Artifact]:
+        """Artefactos a borrar: por antigüedad, por exceso por proyecto y por tamaño total"""
+        remove: Dict[str, Artifact] = {}
+        if self.max_age_seconds > 0:
+            for artifact in self._artifacts.values():
+                if now - artifact.created_at > self.max_age_seconds:
+                    remove[artifact.name] = artifact
+
+        if self.max_per_project > 0:
+            by_project: Dict[str, List[Artifact]] = {}
+            for artifact in self._artifacts.values():
+                if artifact.project_id and artifact.name not in remove:
+                    by_project.setdefault(artifact.project_id, []).append(artifact)
+            for artifacts in by_project.values():
+                artifacts.sort(key=lambda a: a.created_at, reverse=True)
+                for artifact in artifacts[self.max_per_project:]:
+                    remove[artifact.name] = artifact
+
+        if self.max_total_bytes > 0:
+            kept = sorted((a for a in self._artifacts.values() if a.name not in remove), key=lambda a: a.created_at)
+            total = sum(a.size for a in kept)
+            # Se conserva siempre el más reciente, aunque supere el tope por sí solo
+            for artifact in kept[:-1]:
+                if total <= self.max_total_bytes:
+                    break
+                remove[artifact.name] = artifact
+                total -= artifact.size
+        return list(remove.values())
+
+    def collect(self) -> Dict[str, Any]:
+        """Aplica la retención ahora y devuelve el resumen"""
+        started = time.perf_counter()
+        with self._lock:
+            self._sync_with_disk()
+            removed, freed = 0, 0
+            now = time.time()
+            for artifact in self._expired(now):
+                path = os.path.join(self.folder, artifact.name)
+                try:
+                    # Reescrito hace un momento (otra exportación con el mismo nombre): se conserva
+                    if now - os.stat(path).st_mtime < self.min_age_seconds:
+                        continue
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"[WARN] No se pudo borrar {artifact.name}: {e}", flush=True)
+                    continue
+                del self._artifacts[artifact.name]
+                removed += 1
+                freed += artifact.size
+            self._save_index()
+            self.last_gc = {
+                'at': time.time(),
+                'removed': removed,
+                'freed_bytes': freed,
+                'kept': len(self._artifacts),
+                'seconds': round(time.perf_counter() - started, 3)
+            }
+        if removed:
+            print(f"[INFO] Retención de outputs/: {removed} archivos borrados ({freed // 1024} KB liberados)", flush=True)
+        return self.last_gc
+
+    def start_background_gc(self, interval: float = OUTPUTS_GC_INTERVAL_SECONDS):
+        """Lanza (una vez) el hilo que recolecta cada `interval` segundos"""
+        if self._thread is not None or interval <= 0:
+            return
+        self._stop.clear()
+
+        def loop():
+            while True:
+                try:
+                    self.collect()
+                except Exception as e:
+                    print(f"[WARN] Recolección de outputs/ falló: {e}", flush=True)
+                if self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(target=loop, name="outputs-gc", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    # ==================== CONSULTA ====================
+
+    def list(self, project_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Artefactos retenidos, del más reciente al más antiguo"""
+        with self._lock:
+            artifacts = [a for a in self._artifacts.values() if project_id is None or a.project_id == project_id]
+        return [a.to_dict() for a in sorted(artifacts, key=lambda a: a.created_at, reverse=True)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(a.size for a in self._artifacts.values())
+            by_kind: Dict[str, int] = {}
+            for artifact in self._artifacts.values():
+                by_kind[artifact.kind] = by_kind.get(artifact.kind, 0) + 1
+            return {
+                'artifacts': len(self._artifacts),
+                'total_bytes': total,
+                'by_kind': by_kind,
+                'limits': {
+                    'max_age_days': self.max_age_seconds / 86400,
+                    'max_total_bytes': self.max_total_bytes,
+                    'max_per_project': self.max_per_project
+                },
+                'last_gc': self.last_gc
+            }
+
+
+# Almacén compartido por la aplicación
+artifact_store = ArtifactStore()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analizador por Lotes de Historias de Usuario
+Clasifica el dominio y calcula la complejidad de muchas HUs a la vez construyendo
+una matriz de presencia de términos y multiplicándola por matrices de pesos por dominio
+"""
+
+from typing import List, Dict, Any, Optional, Sequence
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+except ImportError:
+    # Sin numpy se usa la implementación en Python puro (mismos resultados, más lenta)
+    np = None
+
+
+# Reglas de decisión de un esquema de dominios
+RULE_ARGMAX = "argmax"            # El dominio con más palabras clave presentes (empate: el primero)
+RULE_FIRST_MATCH = "first_match"  # El primer dominio (en orden) con al menos una palabra clave
+
+
+@dataclass
+class DomainScheme:
+    """Esquema de clasificación: dominios ordenados con sus palabras clave"""
+    name: str
+    domains: Dict[str, List[str]]
+    rule: str = RULE_ARGMAX
+    default: str = "general"
+
+
+# ==================== TABLAS DE PALABRAS CLAVE ====================
+
+# IntelligentStoryParser._detect_domain
+INTELLIGENT_DOMAIN_KEYWORDS = {
+    'backend': ['backend', 'api', 'servidor', 'base de datos', 'odoo', 'erp'],
+    'frontend': ['frontend', 'ui', 'interfaz', 'usuario', 'pantalla', 'vista'],
+    'integration': ['integración', 'api', 'servicio', 'conectar', 'sincronizar'],
+    'data': ['datos', 'información', 'campo', 'variable', 'json', 'xml'],
+    'business': ['negocio', 'regla', 'política', 'proceso', 'flujo'],
+    'validation': ['validación', 'verificar', 'comprobar', 'obligatorio']
+}
+
+# IntelligentStoryParser._calculate_complexity
+COMPLEXITY_INDICATORS = {
+    'high': ['integración', 'api', 'múltiple', 'complejo', 'avanzado', 'dinámico'],
+    'medium': ['configurar', 'validar', 'procesar', 'calcular', 'generar'],
+    'low': ['mostrar', 'visualizar', 'listar', 'simple', 'básico']
+}
+COMPLEXITY_WEIGHTS = {'high': 3, 'medium': 2, 'low': 1}
+
+# EnhancedGherkinGenerator._detect_specific_domain
+ENHANCED_DOMAIN_KEYWORDS = {
+    'alumbrado_publico': ['alumbrado', 'público', 'municipio', 'acuerdo'],
+    'authentication': ['login', 'sesión', 'credenciales'],
+    'ecommerce': ['carrito', 'compra', 'pago']
+}
+
+# ImprovedTestGenerator._analyze_domain_context (elementos + acciones de cada dominio)
+IMPROVED_DOMAIN_CONTEXTS = {
+    'autenticacion': {
+        'elementos': ['formulario de login', 'campo de email', 'campo de contraseña', 'botón iniciar sesión'],
+        'acciones': ['iniciar sesión', 'validar credenciales', 'mostrar error', 'redirigir'],
+        'estados': ['autenticado', 'no autenticado', 'credenciales inválidas']
+    },
+    'facturacion': {
+        'elementos': ['factura', 'cliente', 'producto', 'impuesto', 'total'],
+        'acciones': ['generar factura', 'calcular impuestos', 'enviar por email', 'guardar'],
+        'estados': ['borrador', 'enviada', 'pagada', 'vencida']
+    },
+    'inventario': {
+        'elementos': ['producto', 'stock', 'almacén', 'categoría', 'proveedor'],
+        'acciones': ['agregar producto', 'actualizar stock', 'generar reporte', 'alertar'],
+        'estados': ['disponible', 'agotado', 'descontinuado', 'en tránsito']
+    }
+}
+
+# QuickTestGenerator._analyze_user_story
+QUICK_DOMAIN_KEYWORDS = {
+    'autenticacion': ['login', 'sesión', 'autenticación', 'credenciales'],
+    'facturacion': ['factura', 'pago', 'cliente', 'producto'],
+    'inventario': ['inventario', 'stock', 'almacén', 'producto']
+}
+QUICK_ACTION_KEYWORDS = {
+    'crear': ['crear', 'generar'],
+    'editar': ['editar', 'modificar'],
+    'eliminar': ['eliminar', 'borrar'],
+    'consultar': ['buscar', 'consultar']
+}
+
+DEFAULT_SCHEMES = [
+    DomainScheme('intelligent', INTELLIGENT_DOMAIN_KEYWORDS, RULE_ARGMAX, 'General'),
+    DomainScheme('enhanced_gherkin', ENHANCED_DOMAIN_KEYWORDS, RULE_FIRST_MATCH, 'general'),
+    DomainScheme('improved', {
+        domain: context['elementos'] + context['acciones']
+        for domain, context in IMPROVED_DOMAIN_CONTEXTS.items()
+    }, RULE_FIRST_MATCH, 'general'),
+    DomainScheme('quick', QUICK_DOMAIN_KEYWORDS, RULE_FIRST_MATCH, 'general'),
+    DomainScheme('quick_action', QUICK_ACTION_KEYWORDS, RULE_FIRST_MATCH, 'validar'),
+]
+
+
+class BatchStoryAnalyzer:
+    """
+    Clasificador vectorizado de dominio y complejidad
+
+    Construye un vocabulario único con las palabras clave de todos los esquemas,
+    comprueba cada término una sola vez por HU y resuelve todos los esquemas con un
+    producto de matrices: presencia (HUs x términos) @ pesos (términos x dominios)
+    """
+
+    def __init__(self, schemes: Optional[Sequence[DomainScheme]] = None,
+                 complexity_indicators: Optional[Dict[str, List[str]]] = None):
+        self.schemes = {scheme.name: scheme for scheme in (schemes or DEFAULT_SCHEMES)}
+        self.complexity_indicators = complexity_indicators or COMPLEXITY_INDICATORS
+
+        # Vocabulario: cada término aparece una sola vez aunque esté en varios esquemas
+        vocabulary: Dict[str, int] = {}
+        for scheme in self.schemes.values():
+            for keywords in scheme.domains.values():
+                for keyword in keywords:
+                    vocabulary.setdefault(keyword, len(vocabulary))
+        for indicators in self.complexity_indicators.values():
+            for indicator in indicators:
+                vocabulary.setdefault(indicator, len(vocabulary))
+        self.vocabulary = vocabulary
+        self.terms = list(vocabulary.keys())
+
+        # Matrices de pesos (términos x dominios) por esquema
+        self._weights = {
+            name: self._build_weights([scheme.domains[d] for d in scheme.domains])
+            for name, scheme in self.schemes.items()
+        }
+        self._complexity_levels = list(self.complexity_indicators.keys())
+        self._complexity_weights = self._build_weights(
+            [self.complexity_indicators[level] for level in self._complexity_levels]
+        )
+
+    def _build_weights(self, columns: List[List[str]]):
+        """Matriz términos x columnas con el número de veces que cada término aparece en la lista"""
+        if np is not None:
+            weights = np.zeros((len(self.terms), len(columns)), dtype=np.int32)
+            for j, keywords in enumerate(columns):
+                for keyword in keywords:
+                    weights[self.vocabulary[keyword], j] += 1
+            return weights
+
+        weights = [[0] * len(columns) for _ in self.terms]
+        for j, keywords in enumerate(columns):
+            for keyword in keywords:
+                weights[self.vocabulary[keyword]][j] += 1
+        return weights
+
+    # ==================== MATRIZ DE TÉRMINOS ====================
+
+    def term_matrix(self, texts: Sequence[str]):
+        """
+        Construye la matriz de presencia de términos (HUs x vocabulario)
+
+        Cada HU se pasa a minúsculas una sola vez y la matriz se arma por columnas con
+        comprobaciones `término in texto`, que se detienen en la primera coincidencia
+        (solo importa la presencia, no cuántas veces aparece el término).
+        """
+        lowered = [text.lower() for text in texts]
+        columns = [[term in text for text in lowered] for term in self.terms]
+
+        if np is not None:
+            if not lowered:
+                return np.zeros((0, len(self.terms)), dtype=np.int32)
+            return np.array(columns, dtype=np.int32).T
+
+        return [[int(column[i]) for column in columns] for i in range(len(lowered))]
+
+    def _presence_scores(self, matrix, weights):
+        """Producto presencia @ pesos: cuántas palabras clave de cada columna aparecen"""
+        if np is not None:
+            return (matrix > 0).astype(np.int32) @ weights
+
+        n_cols = len(weights[0]) if weights else 0
+        scores = []
+        for row in matrix:
+            present = [j for j, count in enumerate(row) if count > 0]
+            scores.append([sum(weights[j][c] for j in present) for c in range(n_cols)])
+        return scores
+
+    # ==================== CLASIFICACIÓN ====================
+
+    def classify(self, texts: Sequence[str], scheme_name: str, matrix=None) -> List[str]:
+        """Clasifica el dominio de cada HU según un esquema"""
+        scheme = self.schemes[scheme_name]
+        if matrix is None:
+            matrix = self.term_matrix(texts)
+        scores = self._presence_scores(matrix, self._weights[scheme_name])
+        domains = list(scheme.domains.keys())
+
+        if np is not None:
+            if scheme.rule == RULE_FIRST_MATCH:
+                best = np.argmax(scores > 0, axis=1)
+            else:
+                best = np.argmax(scores, axis=1)
+            has_match = (scores > 0).any(axis=1)
+            return [domains[b] if hit else scheme.default for b, hit in zip(best.tolist(), has_match.tolist())]
+
+        results = []
+        for row in scores:
+            if not any(row):
+                results.append(scheme.default)
+            elif scheme.rule == RULE_FIRST_MATCH:
+                results.append(domains[next(j for j, s in enumerate(row) if s > 0)])
+            else:
+                results.append(domains[row.index(max(row))])
+        return results
+
+    def complexity_features(self, texts: Sequence[str], matrix=None):
+        """Columnas de complejidad (alta, media, baja): indicadores presentes por HU"""
+        if matrix is None:
+            matrix = self.term_matrix(texts)
+        return self._presence_scores(matrix, self._complexity_weights)
+
+    def complexity(self, texts: Sequence[str], matrix=None) -> List[float]:
+        """Score de complejidad 0-10 de cada HU"""
+        features = self.complexity_features(texts, matrix)
+        level_weights = [COMPLEXITY_WEIGHTS.get(level, 1) for level in self._complexity_levels]
+
+        if np is not None:
+            scores = features @ np.array(level_weights, dtype=np.float64)
+            return np.minimum(scores / 2, 10.0).tolist()
+
+        return [min(sum(f * w for f, w in zip(row, level_weights)) / 2, 10.0) for row in features]
+
+    def analyze(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Analiza un backlog completo: todos los esquemas y la complejidad con una
+        sola matriz de términos
+
+        Returns:
+            Una entrada por HU con el dominio de cada esquema y 'complexity_score'
+        """
+        matrix = self.term_matrix(texts)
+        per_scheme = {name: self.classify(texts, name, matrix) for name in self.schemes}
+        complexity = self.complexity(texts, matrix)
+
+        results = []
+        for i in range(len(texts)):
+            entry = {name: domains[i] for name, domains in per_scheme.items()}
+            entry['complexity_score'] = complexity[i]
+            results.append(entry)
+        return results
+
+    # ==================== API POR HISTORIA ====================
+
+    # Para una sola HU no compensa armar la matriz: se recorren solo las palabras clave
+    # del esquema pedido y RULE_FIRST_MATCH se detiene en el primer dominio con coincidencia.
+
+    def classify_one(self, text: str, scheme_name: str) -> str:
+        """Clasifica una sola HU (mismo resultado que classify)"""
+        scheme = self.schemes[scheme_name]
+        text_lower = text.lower()
+        best, best_score = scheme.default, 0
+        for domain, keywords in scheme.domains.items():
+            if scheme.rule == RULE_FIRST_MATCH:
+                if any(keyword in text_lower for keyword in keywords):
+                    return domain
+                continue
+            score = sum(1 for keyword in keywords if keyword in text_lower)
+            if score > best_score:
+                best, best_score = domain, score
+        return best
+
+    def complexity_one(self, text: str) -> float:
+        """Complejidad de una sola HU (mismo resultado que complexity)"""
+        text_lower = text.lower()
+        score = 0
+        for level in self._complexity_levels:
+            count = sum(1 for indicator in self.complexity_indicators[level] if indicator in text_lower)
+            score += count * COMPLEXITY_WEIGHTS.get(level, 1)
+        return min(score / 2, 10.0)
+
+
+_shared_analyzer: Optional[BatchStoryAnalyzer] = None
+
+
+def get_batch_analyzer() -> BatchStoryAnalyzer:
+    """Analizador compartido del proceso (las matrices de pesos se construyen una vez)"""
+    global _shared_analyzer
+    if _shared_analyzer is None:
+        _shared_analyzer = BatchStoryAnalyzer()
+    return _shared_analyzer
+
+
+def analyze_backlog(texts: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Función de utilidad para re-clasificar un backlog de HUs
+
+    Args:
+        texts: Textos de las historias de usuario
+
+    Returns:
+        Dominio por esquema y complejidad de cada HU
+    """
+    return get_batch_analyzer().analyze(texts)
+
+
+# Test
+if __name__ == "__main__":
+    import time
+
+    stories = [
+        "Como backend de Odoo, todas las variables dinámicas llegan en JSON por la API",
+        "Como usuario quiero iniciar sesión con mis credenciales para ver el dashboard",
+        "Gestionar condicionales de alumbrado público por municipio sin acuerdo vigente",
+        "Agregar producto al carrito y proceder al pago de la compra",
+        "Mostrar el listado simple de sedes",
+    ]
+
+    for story, result in zip(stories, analyze_backlog(stories)):
+        print(f"{story[:60]:<62} {result}")
+
+    backlog = stories * 2000
+    start = time.perf_counter()
+    analyze_backlog(backlog)
+    print(f"\n{len(backlog)} HUs analizadas en {time.perf_counter() - start:.2f}s "
+          f"({'numpy' if np is not None else 'python puro'})")
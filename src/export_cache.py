@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché de Exportaciones Versionada
+Guarda en disco los archivos exportados por (proyecto, versión de contenido, formato,
+opciones) para que descargar de nuevo un proyecto sin cambios no vuelva a generarlo
+"""
+
+import os
+import json
+import time
+import uuid
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+# Tope de disco de la caché (MB) y carpeta donde se guarda
+EXPORT_CACHE_MAX_MB = float(os.environ.get('EXPORT_CACHE_MAX_MB', '200'))
+EXPORT_CACHE_FOLDER = os.environ.get('EXPORT_CACHE_FOLDER', os.path.join('outputs', '.export_cache'))
+
+
+def export_cache_key(project_id: str, version: int, fmt: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """Clave (y ETag) de una exportación: cambia si cambia el contenido, el formato o las opciones"""
+    raw = json.dumps([project_id, version, fmt, options or {}], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+
+@dataclass
+class CachedExport:
+    """Archivo exportado guardado en la caché"""
+    key: str
+    project_id: str
+    filename: str
+    mimetype: str
+    size: int
+    created_at: float
+    path: str = ""
+
+    @property
+    def etag(self) -> str:
+        return self.key
+
+
+class ExportCache:
+    """
+    Caché LRU en disco con tope de tamaño
+
+    Cada entrada son dos archivos: <clave>.bin (bytes exportados) y <clave>.json (metadatos),
+    así el índice se reconstruye al reiniciar. Al superar max_bytes se eliminan las
+    entradas usadas hace más tiempo.
+    """
+
+    def __init__(self, folder: str = EXPORT_CACHE_FOLDER, max_bytes: int = int(EXPORT_CACHE_MAX_MB * 1024 * 1024)):
+        self.folder = os.path.abspath(folder)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedExport]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load_index()
+
+    # ==================== ÍNDICE ====================
+
+    def _paths(self, key: str):
+        return os.path.join(self.folder, f"{key}.bin"), os.path.join(self.folder, f"{key}.json")
+
+    def _load_index(self):
+        """Reconstruye el índice desde disco (orden LRU por fecha de último acceso)"""
+        if not os.path.isdir(self.folder):
+            return
+        loaded = []
+        for name in os.listdir(self.folder):
+            if not name.endswith('.json'):
+                continue
+            data_path, meta_path = self._paths(name[:-5])
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    entry = CachedExport(**json.load(f))
+                entry.path = data_path
+                loaded.append((os.path.getatime(data_path), entry))
+            except (OSError, ValueError, TypeError):
+                self._remove_files(name[:-5])
+        for _, entry in sorted(loaded, key=lambda item: item[0]):
+            self._entries[entry.key] = entry
+            self.total_bytes += entry.size
+        if loaded:
+            print(f"[INFO] Caché de exportaciones: {len(loaded)} archivos ({self.total_bytes // 1024} KB)", flush=True)
+
+    def _remove_files(self, key: str):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    # ==================== LECTURA ====================
+
+    def get(self, key: str) -> Optional[CachedExport]:
+        """Entrada en caché (y la marca como usada recientemente) o None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not os.path.exists(entry.path):
+                if entry is not None:
+                    self._discard(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    # ==================== ESCRITURA ====================
+
+    def store_stream(self, key: str, project_id: str, filename: str, mimetype: str,
+                     chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Reenvía los bloques de una exportación mientras los guarda en la caché
+
+        La entrada solo se registra si el flujo se completa; si el cliente corta la
+        descarga el archivo temporal se descarta.
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        data_path, meta_path = self._paths(key)
+        temp_path = f"{data_path}.{uuid.uuid4().hex}.tmp"
+        size = 0
+        completed = False
+        try:
+            with open(temp_path, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+                    yield chunk
+            completed = True
+        finally:
+            if completed:
+                self._commit(key, project_id, filename, mimetype, size, temp_path)
+            else:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    def store_bytes(self, key: str, project_id: str, filename: str, mimetype: str, data: bytes) -> CachedExport:
+        """Guarda una exportación ya generada en memoria"""
+        for _ in self.store_stream(key, project_id, filename, mimetype, [data]):
+            pass
+        return self._entries[key]
+
+    def _commit(self, key: str, project_id: str, filename: str, mimetype: str, size: int, temp_path: str):
+        data_path, meta_path = self._paths(key)
+        entry = CachedExport(key=key, project_id=project_id, filename=filename, mimetype=mimetype,
+                             size=size, created_at=time.time())
+        os.replace(temp_path, data_path)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({k: v for k, v in asdict(entry).items() if k != 'path'}, f, ensure_ascii=False)
+        entry.path = data_path
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous.size
+            self._entries[key] = entry
+            self.total_bytes += size
+            self._evict()
+
+    def _evict(self):
+        """Elimina entradas LRU hasta quedar bajo el tope (se conserva siempre la más reciente)"""
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            self._discard(key)
+            self.evictions += 1
+
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+        self._remove_files(key)
+
+    # ==================== INVALIDACIÓN ====================
+
+    def invalidate(self, project_id: Optional[str] = None):
+        """Elimina las exportaciones de un proyecto (o todas)"""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items()
+                    if project_id is None or entry.project_id == project_id]
+            for key in keys:
+                self._discard(key)
+        if keys:
+            print(f"[INFO] Caché de exportaciones: {len(keys)} archivos invalidados"
+                  + (f" del proyecto {project_id}" if project_id else ""), flush=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+
+# Caché compartida por la aplicación
+export_cache = ExportCache()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Marcas de Agua de Exportación (Exportaciones Delta)
+Guarda por proyecto y destino el hash de contenido de cada caso en la última exportación,
+para que la siguiente solo incluya los casos nuevos o modificados y liste los eliminados
+"""
+
+import json
+import hashlib
+from datetime import datetime
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Destino por defecto (cada flujo de importación lleva su propia marca)
+DEFAULT_EXPORT_TARGET = "linear_csv"
+
+# Campos del caso que definen su contenido exportado
+HASHED_FIELDS = ('title', 'description', 'preconditions', 'steps', 'expected_result',
+                 'test_type', 'priority', 'user_story', 'tags')
+
+
+def case_content_hash(test_case: Dict[str, Any]) -> str:
+    """Hash del contenido exportable de un caso (independiente de su posición)"""
+    payload = json.dumps([test_case.get(name) for name in HASHED_FIELDS], ensure_ascii=False,
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def stable_case_ids(test_cases: List[Dict[str, Any]]) -> List[str]:
+    """
+    Id estable de cada caso: su id guardado; si falta o se repite, uno derivado del título
+
+    Así un caso conserva su id aunque se agreguen o borren otros antes que él.
+    """
+    ids, seen = [], set()
+    for test_case in test_cases:
+        case_id = str(test_case.get('id') or '').strip()
+        if not case_id or case_id in seen:
+            digest = hashlib.sha256(str(test_case.get('title', '')).encode('utf-8')).hexdigest()[:8]
+            case_id = f"TC-{digest}"
+            suffix = 2
+            while case_id in seen:
+                case_id = f"TC-{digest}-{suffix}"
+                suffix += 1
+        seen.add(case_id)
+        ids.append(case_id)
+    return ids
+
+
+@dataclass
+class ExportWatermark:
+    """Estado de la última exportación confirmada hacia un destino"""
+    target: str
+    exported_at: str
+    content_version: int = 0
+    hashes: Dict[str, str] = field(default_factory=dict)  # id estable -> hash de contenido
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ExportWatermark":
+        return cls(target=data['target'], exported_at=data['exported_at'],
+                   content_version=data.get('content_version', 0), hashes=dict(data.get('hashes') or {}))
+
+
+@dataclass
+class DeltaExport:
+    """Diferencia entre los casos actuales y la última marca de agua"""
+    target: str
+    base: Optional[ExportWatermark]
+    added: List[Tuple[str, Dict[str, Any]]] = field(default_factory=list)     # (id estable, caso)
+    modified: List[Tuple[str, Dict[str, Any]]] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    hashes: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def changed_cases(self) -> List[Tuple[str, Dict[str, Any]]]:
+        return self.added + self.modified
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.modified or self.deleted)
+
+    def next_watermark(self, content_version: int = 0) -> ExportWatermark:
+        """Marca que queda registrada cuando la exportación se completa"""
+        return ExportWatermark(target=self.target, exported_at=datetime.now().isoformat(),
+                               content_version=content_version, hashes=dict(self.hashes))
+
+    def manifest(self, project_id: str, content_version: int = 0) -> Dict[str, Any]:
+        return {
+            'project_id': project_id,
+            'target': self.target,
+            'mode': 'delta' if self.base else 'full',
+            'since': self.base.exported_at if self.base else None,
+            'content_version': content_version,
+            'added': [case_id for case_id, _ in self.added],
+            'modified': [case_id for case_id, _ in self.modified],
+            'deleted': self.deleted,
+            'unchanged': self.unchanged
+        }
+
+
+def compute_delta(test_cases: List[Dict[str, Any]], stored: Optional[Dict[str, Any]],
+                  target: str = DEFAULT_EXPORT_TARGET) -> DeltaExport:
+    """Compara los casos con la marca de agua guardada (sin marca, todo es nuevo)"""
+    base = ExportWatermark.from_dict(stored) if stored else None
+    previous = base.hashes if base else {}
+    delta = DeltaExport(target=target, base=base)
+    for case_id, test_case in zip(stable_case_ids(test_cases), test_cases):
+        hash_value = case_content_hash(test_case)
+        delta.hashes[case_id] = hash_value
+        if case_id not in previous:
+            delta.added.append((case_id, test_case))
+        elif previous[case_id] != hash_value:
+            delta.modified.append((case_id, test_case))
+        else:
+            delta.unchanged += 1
+    delta.deleted = [case_id for case_id in previous if case_id not in delta.hashes]
+    return delta
@@ -14,6 +14,7 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 from test_case_automation import UserStory, TestCase, TestType, Priority
+from batch_story_analyzer import get_batch_analyzer, IMPROVED_DOMAIN_CONTEXTS
 
 @dataclass
 class ImprovedTestCase:
@@ -59,23 +60,7 @@ class ImprovedTestGenerator:
             'procesar': ['procesar', 'ejecutar', 'realizar', 'completar']
         }
         
-        self.domain_contexts = {
-            'autenticacion': {
-                'elementos': ['formulario de login', 'campo de email', 'campo de contraseña', 'botón iniciar sesión'],
-                'acciones': ['iniciar sesión', 'validar credenciales', 'mostrar error', 'redirigir'],
-                'estados': ['autenticado', 'no autenticado', 'credenciales inválidas']
-            },
-            'facturacion': {
-                'elementos': ['factura', 'cliente', 'producto', 'impuesto', 'total'],
-                'acciones': ['generar factura', 'calcular impuestos', 'enviar por email', 'guardar'],
-                'estados': ['borrador', 'enviada', 'pagada', 'vencida']
-            },
-            'inventario': {
-                'elementos': ['producto', 'stock', 'almacén', 'categoría', 'proveedor'],
-                'acciones': ['agregar producto', 'actualizar stock', 'generar reporte', 'alertar'],
-                'estados': ['disponible', 'agotado', 'descontinuado', 'en tránsito']
-            }
-        }
+        self.domain_contexts = IMPROVED_DOMAIN_CONTEXTS
     
     def generate_improved_cases(self, user_story: UserStory, qa_comments: str = "") -> List[ImprovedTestCase]:
         """Genera casos de prueba mejorados con títulos únicos y descripciones concisas"""
@@ -102,11 +87,7 @@ class ImprovedTestGenerator:
         full_text = f"{user_story.title} {user_story.description} {qa_comments}".lower()
         
         # Detectar dominio principal
-        detected_domain = 'general'
-        for domain, context in self.domain_contexts.items():
-            if any(keyword in full_text for keyword in context['elementos'] + context['acciones']):
-                detected_domain = domain
-                break
+        detected_domain = get_batch_analyzer().classify_one(full_text, 'improved')
         
         # Extraer elementos clave
         key_elements = self._extract_key_elements(full_text)
@@ -11,6 +11,11 @@ from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    from .batch_story_analyzer import get_batch_analyzer, INTELLIGENT_DOMAIN_KEYWORDS, COMPLEXITY_INDICATORS
+except ImportError:
+    from batch_story_analyzer import get_batch_analyzer, INTELLIGENT_DOMAIN_KEYWORDS, COMPLEXITY_INDICATORS
+
 @dataclass
 class IntelligentUserStory:
     """Historia de usuario con análisis inteligente"""
@@ -99,22 +104,11 @@ class IntelligentStoryParser:
             ]
         }
         
-        # Palabras clave para detectar dominios
-        self.domain_keywords = {
-            'backend': ['backend', 'api', 'servidor', 'base de datos', 'odoo', 'erp'],
-            'frontend': ['frontend', 'ui', 'interfaz', 'usuario', 'pantalla', 'vista'],
-            'integration': ['integración', 'api', 'servicio', 'conectar', 'sincronizar'],
-            'data': ['datos', 'información', 'campo', 'variable', 'json', 'xml'],
-            'business': ['negocio', 'regla', 'política', 'proceso', 'flujo'],
-            'validation': ['validación', 'verificar', 'comprobar', 'obligatorio']
-        }
+        # Palabras clave para detectar dominios (tabla compartida con el analizador por lotes)
+        self.domain_keywords = INTELLIGENT_DOMAIN_KEYWORDS
         
         # Indicadores de complejidad
-        self.complexity_indicators = {
-            'high': ['integración', 'api', 'múltiple', 'complejo', 'avanzado', 'dinámico'],
-            'medium': ['configurar', 'validar', 'procesar', 'calcular', 'generar'],
-            'low': ['mostrar', 'visualizar', 'listar', 'simple', 'básico']
-        }
+        self.complexity_indicators = COMPLEXITY_INDICATORS
     
     def parse_intelligent(self, text: str) -> IntelligentUserStory:
         """Análisis inteligente completo del texto"""
@@ -375,35 +369,12 @@ class IntelligentStoryParser:
     
     def _detect_domain(self, text: str) -> str:
         """Detecta el dominio principal del texto"""
-        text_lower = text.lower()
-        domain_scores = {}
-        
-        for domain, keywords in self.domain_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if score > 0:
-                domain_scores[domain] = score
-        
-        if domain_scores:
-            return max(domain_scores, key=domain_scores.get)
-        return "General"
+        return get_batch_analyzer().classify_one(text, 'intelligent')
     
     def _calculate_complexity(self, text: str) -> float:
         """Calcula un score de complejidad"""
-        text_lower = text.lower()
-        complexity_score = 0.0
-        
-        # Contar indicadores de complejidad
-        for level, indicators in self.complexity_indicators.items():
-            count = sum(1 for indicator in indicators if indicator in text_lower)
-            if level == 'high':
-                complexity_score += count * 3
-            elif level == 'medium':
-                complexity_score += count * 2
-            else:
-                complexity_score += count * 1
-        
-        # Normalizar entre 0 y 10
-        return min(complexity_score / 2, 10.0)
+        # Indicadores ponderados (alta x3, media x2, baja x1) normalizados entre 0 y 10
+        return get_batch_analyzer().complexity_one(text)
     
     def get_analysis_summary(self, story: IntelligentUserStory) -> Dict[str, Any]:
         """Genera un resumen del análisis"""
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exportación e Importación JSON Lines
+Un caso de prueba por línea, con los metadatos de su proyecto, para mover corpus grandes
+entre instancias o alimentar análisis sin cargar todo en memoria. La exportación sale del
+almacén en bloques y la importación entra línea a línea con escrituras por lotes.
+"""
+
+import os
+import json
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from .test_case_model import compact_from_dicts
+except ImportError:
+    from test_case_model import compact_from_dicts
+
+JSONL_FORMAT_VERSION = 1
+JSONL_MIMETYPE = 'application/x-ndjson'
+
+# Metadatos del proyecto que viajan en cada línea
+PROJECT_FIELDS = ('id', 'name', 'description', 'user_story', 'qa_comments', 'linear_hu_id')
+
+# Campos obligatorios de un caso importado
+REQUIRED_CASE_FIELDS = ('id', 'title', 'description', 'preconditions', 'steps', 'expected_result',
+                        'test_type', 'priority')
+
+# Casos acumulados por proyecto antes de escribir en el almacén
+JSONL_IMPORT_BATCH_SIZE = int(os.environ.get('QA_JSONL_IMPORT_BATCH_SIZE', '1000'))
+
+# Lotes escritos entre dos guardados del JSON de proyectos (close() siempre guarda)
+JSONL_IMPORT_SAVE_EVERY = int(os.environ.get('QA_JSONL_IMPORT_SAVE_EVERY', '10'))
+
+# Errores por línea que se devuelven en el informe (el resto solo se cuenta)
+MAX_REPORTED_ERRORS = 100
+
+JSONL_CHUNK_BYTES = 64 * 1024
+
+
+# ==================== EXPORTACIÓN ====================
+
+def iter_project_records(project: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Un registro por caso de prueba del proyecto"""
+    meta = {name: project.get(name, '') for name in PROJECT_FIELDS}
+    for test_case in project.get('test_cases') or []:
+        yield {'v': JSONL_FORMAT_VERSION, 'project': meta, 'test_case': test_case}
+
+
+def iter_jsonl_bytes(projects: Iterable[Dict[str, Any]], chunk_bytes: int = JSONL_CHUNK_BYTES) -> Iterator[bytes]:
+    """Codifica los proyectos como JSON Lines en bloques de ~chunk_bytes"""
+    parts: List[str] = []
+    size = 0
+    for project in projects:
+        for record in iter_project_records(project):
+            line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+            parts.append(line)
+            size += len(line)
+            if size >= chunk_bytes:
+                yield ''.join(parts).encode('utf-8')
+                parts, size = [], 0
+    if parts:
+        yield ''.join(parts).encode('utf-8')
+
+
+# ==================== IMPORTACIÓN ====================
+
+def parse_record(line: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Valida una línea y devuelve (metadatos del proyecto, caso); ValueError si no es válida"""
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON inválido: {e.msg}")
+    if not isinstance(record, dict):
+        raise ValueError("La línea debe ser un objeto JSON")
+    version = record.get('v', JSONL_FORMAT_VERSION)
+    if version != JSONL_FORMAT_VERSION:
+        raise ValueError(f"Versión de formato no soportada: {version}")
+
+    project = record.get('project')
+    test_case = record.get('test_case')
+    if not isinstance(project, dict) or not (project.get('id') or project.get('name')):
+        raise ValueError("Falta 'project' con 'id' o 'name'")
+    if not isinstance(test_case, dict):
+        raise ValueError("Falta 'test_case'")
+    missing = [name for name in REQUIRED_CASE_FIELDS if name not in test_case]
+    if missing:
+        raise ValueError(f"Faltan campos del caso: {', '.join(missing)}")
+    for name in ('preconditions', 'steps'):
+        if not isinstance(test_case[name], list):
+            raise ValueError(f"'{name}' debe ser una lista")
+    return project, test_case
+
+
+@dataclass
+class ImportReport:
+    """Resultado de una importación"""
+    lines: int = 0
+    imported: int = 0
+    created_cases: int = 0
+    updated_cases: int = 0
+    failed: int = 0
+    batches: int = 0
+    projects_created: Dict[str, str] = field(default_factory=dict)  # id de origen -> id nuevo
+    projects_updated: List[str] = field(default_factory=list)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add_error(self, line_number: int, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'error': message})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class JsonlImporter:
+    """
+    Importa líneas JSONL en el almacén de proyectos (QAProject)
+
+    Los casos se agrupan por proyecto y se escriben cada `batch_size` casos con una sola
+    llamada a update_project. Un caso con el mismo id que uno existente lo reemplaza.
+    Los proyectos de origen que no existen se crean con sus metadatos; con
+    target_project_id todas las líneas van a ese proyecto.
+
+    La lista de casos y el índice id -> posición de cada proyecto se construyen una vez y
+    se reutilizan entre lotes, así cada lote cuesta lo que sus casos y no lo que el
+    proyecto. El JSON de proyectos se guarda cada `save_every` lotes y al cerrar.
+    """
+
+    def __init__(self, manager, batch_size: int = JSONL_IMPORT_BATCH_SIZE, target_project_id: Optional[str] = None,
+                 save_every: int = JSONL_IMPORT_SAVE_EVERY):
+        self.manager = manager
+        self.batch_size = max(1, batch_size)
+        self.target_project_id = target_project_id
+        self.save_every = max(1, save_every)
+        self.report = ImportReport()
+        self._project_map: Dict[str, str] = {}  # clave de origen -> id local
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending_count = 0
+        # id local -> (lista de casos del proyecto, id de caso -> posición en la lista)
+        self._cases: Dict[str, Tuple[List[Dict[str, Any]], Dict[Any, int]]] = {}
+        self._unsaved = False
+
+    def _resolve_project(self, meta: Dict[str, Any]) -> str:
+        if self.target_project_id:
+            return self.target_project_id
+        key = str(meta.get('id') or meta.get('name'))
+        project_id = self._project_map.get(key)
+        if project_id is None:
+            if meta.get('id') and self.manager.get_project(meta['id']):
+                project_id = meta['id']
+                self.report.projects_updated.append(project_id)
+            else:
+                project_id = self.manager.create_project(
+                    meta.get('name') or key, meta.get('description', ''), meta.get('user_story', ''),
+                    meta.get('qa_comments', ''), meta.get('linear_hu_id', ''))
+                self.report.projects_created[key] = project_id
+            self._project_map[key] = project_id
+        return project_id
+
+    def feed(self, lines: Iterable[Any]) -> ImportReport:
+        """Procesa líneas (str o bytes); las vacías se ignoran"""
+        for line_number, raw in enumerate(lines, self.report.lines + 1):
+            self.report.lines = line_number
+            line = raw.decode('utf-8', errors='replace') if isinstance(raw, bytes) else raw
+            line = line.strip().lstrip('\ufeff')
+            if not line:
+                continue
+            try:
+                meta, test_case = parse_record(line)
+                # Normaliza tipo y prioridad igual que el resto de la aplicación
+                normalized = compact_from_dicts([test_case])[0].to_dict()
+            except (ValueError, KeyError, TypeError) as e:
+                self.report.add_error(line_number, str(e))
+                continue
+            try:
+                project_id = self._resolve_project(meta)
+            except Exception as e:
+                self.report.add_error(line_number, f"No se pudo crear el proyecto: {e}")
+                continue
+            self._pending.setdefault(project_id, []).append(normalized)
+            self._pending_count += 1
+            if self._pending_count >= self.batch_size:
+                self.flush()
+        return self.report
+
+    def flush(self):
+        """Escribe los casos acumulados (una actualización por proyecto)"""
+        for project_id, cases in self._pending.items():
+            project = self.manager.get_project(project_id)
+            if project is None:
+                for _ in cases:
+                    self.report.add_error(self.report.lines, f"Proyecto no encontrado: {project_id}")
+                continue
+            existing, positions = self._project_cases(project_id, project)
+            for case in cases:
+                position = positions.get(case['id'])
+                if position is None:
+                    positions[case['id']] = len(existing)
+                    existing.append(case)
+                    self.report.created_cases += 1
+                else:
+                    existing[position] = case
+                    self.report.updated_cases += 1
+                self.report.imported += 1
+            self.manager.update_project(project_id, test_cases=existing, save=False)
+            self._unsaved = True
+        if self._pending:
+            self.report.batches += 1
+            if self.report.batches % self.save_every == 0:
+                self._save()
+        self._pending = {}
+        self._pending_count = 0
+
+    def _project_cases(self, project_id: str, project: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[Any, int]]:
+        """Lista de casos e índice de posiciones del proyecto, reutilizados entre lotes"""
+        cached = self._cases.get(project_id)
+        # Si otra petición reemplazó los casos entre lotes, el índice se reconstruye
+        if cached is not None and cached[0] is project.get('test_cases'):
+            return cached
+        existing = list(project.get('test_cases') or [])
+        positions = {case.get('id'): i for i, case in enumerate(existing) if isinstance(case, dict)}
+        self._cases[project_id] = (existing, positions)
+        return existing, positions
+
+    def _save(self):
+        if self._unsaved:
+            self.manager.save_projects()
+            self._unsaved = False
+
+    def close(self) -> ImportReport:
+        self.flush()
+        self._save()
+        print(f"[INFO] Importación JSONL: {self.report.imported} casos en {self.report.batches} lotes, "
+              f"{len(self.report.projects_created)} proyectos creados, {self.report.failed} líneas con error",
+              flush=True)
+        return self.report
@@ -3,9 +3,27 @@ Cliente API para Linear - Creación automática de sub-issues
 """
 import requests
 import json
-from typing import List, Dict, Optional
+import time
+import hashlib
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from dataclasses import dataclass
 
+try:
+    from .linear_transport import LinearTransport
+    from .linear_rate_limiter import get_scheduler, DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_RATE
+    from .linear_upload_jobs import (UploadJob, UploadedCase, content_hash, append_hash_marker,
+                                     extract_hash_marker, JOB_RUNNING, JOB_COMPLETED, JOB_FAILED,
+                                     SyncAction, SyncPlan, SYNC_CREATE, SYNC_UPDATE, SYNC_ARCHIVE, SYNC_UNCHANGED)
+except ImportError:
+    from linear_transport import LinearTransport
+    from linear_rate_limiter import get_scheduler, DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_RATE
+    from linear_upload_jobs import (UploadJob, UploadedCase, content_hash, append_hash_marker,
+                                    extract_hash_marker, JOB_RUNNING, JOB_COMPLETED, JOB_FAILED,
+                                    SyncAction, SyncPlan, SYNC_CREATE, SYNC_UPDATE, SYNC_ARCHIVE, SYNC_UNCHANGED)
+
 @dataclass
 class LinearIssue:
     """Representa un issue de Linear"""
@@ -16,16 +34,123 @@ class LinearIssue:
     priority: int
     labels: List[str]
 
+# Campos devueltos por cada issueCreate (individual o dentro de un lote)
+ISSUE_CREATE_FIELDS = """
+                success
+                issue {
+                    id
+                    identifier
+                    title
+                    team {
+                        id
+                        key
+                        name
+                    }
+                    state {
+                        id
+                        name
+                    }
+                }
+"""
+
+
+class LinearMetadataCache:
+    """
+    Caché de metadatos de Linear (equipos, labels y estados de workflow) con TTL
+    
+    Se comparte entre todas las instancias de LinearAPIClient del proceso. Las claves
+    usan un hash del API key (cada key ve sus propios equipos) y el id del equipo.
+    """
+    
+    DEFAULT_TTL = 300  # segundos
+    
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self._entries: Dict[Tuple, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _key(kind: str, api_key: str, team_id: Optional[str] = None) -> Tuple:
+        key_hash = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+        return (kind, key_hash, team_id)
+    
+    def get(self, kind: str, api_key: str, team_id: Optional[str] = None) -> Any:
+        """Valor en caché o None si no existe o expiró"""
+        key = self._key(kind, api_key, team_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def set(self, kind: str, api_key: str, value: Any, team_id: Optional[str] = None):
+        with self._lock:
+            self._entries[self._key(kind, api_key, team_id)] = (time.monotonic(), value)
+    
+    def invalidate(self, api_key: Optional[str] = None, team_id: Optional[str] = None):
+        """
+        Invalida entradas: todas, las de un API key, o las de un equipo de ese API key
+        """
+        with self._lock:
+            if api_key is None:
+                self._entries.clear()
+                return
+            key_hash = self._key('', api_key)[1]
+            for key in list(self._entries):
+                if key[1] == key_hash and (team_id is None or key[2] == team_id):
+                    del self._entries[key]
+
+
+# Caché compartida por todos los clientes del proceso
+metadata_cache = LinearMetadataCache()
+
+
+@dataclass
+class SubIssueResult:
+    """Resultado de crear un sub-issue dentro de un lote"""
+    index: int
+    issue_id: Optional[str] = None
+    identifier: Optional[str] = None
+    error: Optional[str] = None
+    skipped: bool = False  # Ya existía en Linear (no se volvió a crear)
+    elapsed_ms: float = 0.0  # Duración del lote en el que se creó
+
+    @property
+    def success(self) -> bool:
+        return self.issue_id is not None
+
+
 class LinearAPIClient:
     """Cliente para interactuar con la API de Linear"""
     
-    def __init__(self, api_key: str):
+    # Número de issueCreate con alias que se envían en un solo documento GraphQL
+    DEFAULT_BATCH_SIZE = 10
+    
+    # Reintentos de una petición rechazada con 429 (no se procesó, es seguro reintentar)
+    MAX_THROTTLE_RETRIES = 3
+    
+    # Reintentos de una petición idempotente tras un 5xx o un error de conexión
+    MAX_ERROR_RETRIES = 4
+    
+    def __init__(self, api_key: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, base_url: Optional[str] = None,
+                 max_rate: float = DEFAULT_MAX_RATE):
         self.api_key = api_key
-        self.base_url = "https://api.linear.app/graphql"
-        self.headers = {
-            "Authorization": api_key,  # Linear NO usa "Bearer", solo el API key directamente
-            "Content-Type": "application/json"
-        }
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        # Transporte compartido (pool de conexiones); las API keys personales van sin "Bearer"
+        self.transport = LinearTransport(api_key, base_url=base_url)
+        self.base_url = self.transport.base_url
+        # Token bucket + concurrencia adaptativa según los headers de rate limit de Linear,
+        # compartido por todos los clientes del proceso con el mismo API key
+        self.scheduler = get_scheduler(api_key, self.base_url, self.max_concurrency, max_rate)
+        self.headers = self.transport.headers
     
     def test_connection(self) -> bool:
         """Prueba la conexión con Linear"""
@@ -46,8 +171,13 @@ class LinearAPIClient:
             print(f"Error conectando con Linear: {e}")
             return False
     
-    def get_teams(self) -> List[Dict]:
-        """Obtiene los equipos disponibles"""
+    def get_teams(self, use_cache: bool = True) -> List[Dict]:
+        """Obtiene los equipos disponibles (desde la caché de metadatos si es posible)"""
+        if use_cache:
+            teams = metadata_cache.get('teams', self.api_key)
+            if teams is not None:
+                return teams
+        
         query = """
         query {
             teams {
@@ -61,7 +191,50 @@ class LinearAPIClient:
         """
         
         response = self._make_request(query)
-        return response.get('data', {}).get('teams', {}).get('nodes', [])
+        teams = response.get('data', {}).get('teams', {}).get('nodes', [])
+        metadata_cache.set('teams', self.api_key, teams)
+        return teams
+    
+    def prefetch_team_metadata(self, team_id: str):
+        """Descarga labels y estados del equipo en una sola consulta y los deja en caché"""
+        if (metadata_cache.get('labels', self.api_key, team_id) is not None
+                and metadata_cache.get('states', self.api_key, team_id) is not None):
+            return
+        
+        query = """
+        query($teamId: String!) {
+            team(id: $teamId) {
+                labels {
+                    nodes {
+                        id
+                        name
+                    }
+                }
+                states {
+                    nodes {
+                        id
+                        name
+                        type
+                    }
+                }
+            }
+        }
+        """
+        
+        try:
+            response = self._make_request(query, {"teamId": team_id})
+            team = response.get('data', {}).get('team') or {}
+            labels = team.get('labels', {}).get('nodes', [])
+            states = team.get('states', {}).get('nodes', [])
+            metadata_cache.set('labels', self.api_key, {label['name']: label['id'] for label in labels}, team_id)
+            metadata_cache.set('states', self.api_key, states, team_id)
+            print(f"[INFO] Metadatos del equipo en caché: {len(labels)} labels, {len(states)} estados")
+        except Exception as e:
+            print(f"[WARN] No se pudieron precargar metadatos del equipo: {e}")
+    
+    def invalidate_metadata(self, team_id: Optional[str] = None):
+        """Invalida los metadatos en caché de este API key (o solo de un equipo)"""
+        metadata_cache.invalidate(self.api_key, team_id)
     
     def get_issue_by_identifier(self, identifier: str) -> Optional[str]:
         """Obtiene el UUID interno de un issue por su identificador público (ej: FIN-1234)"""
@@ -172,25 +345,9 @@ class LinearAPIClient:
         
         mutation = """
         mutation($input: IssueCreateInput!) {
-            issueCreate(input: $input) {
-                success
-                issue {
-                    id
-                    identifier
-                    title
-                    team {
-                        id
-                        key
-                        name
-                    }
-                    state {
-                        id
-                        name
-                    }
-                }
-            }
+            issueCreate(input: $input) {%s}
         }
-        """
+        """ % ISSUE_CREATE_FIELDS
         
         input_data = {
             "title": title,
@@ -236,6 +393,111 @@ class LinearAPIClient:
         
         return None
     
+    def create_sub_issues_batch(self, inputs: List[Dict]) -> List[SubIssueResult]:
+        """
+        Crea varios sub-issues con un único documento GraphQL (un issueCreate con alias por caso)
+        
+        Si el lote falla por validación (el documento completo o algún alias), se divide en
+        mitades y se reintenta hasta aislar los casos inválidos. Los errores de red o del
+        servidor NO se reintentan: el lote pudo haberse creado y reintentar duplicaría issues.
+        
+        Args:
+            inputs: IssueCreateInput de cada sub-issue (en orden)
+            
+        Returns:
+            Un SubIssueResult por input, en el mismo orden
+        """
+        results = [SubIssueResult(index=i) for i in range(len(inputs))]
+        started = time.perf_counter()
+        self._create_batch_into(list(range(len(inputs))), inputs, results)
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        for result in results:
+            result.elapsed_ms = elapsed_ms
+        return results
+    
+    def _create_batch_into(self, indices: List[int], inputs: List[Dict], results: List[SubIssueResult]):
+        """Envía un lote (por índices) y completa results; divide y reintenta si hay errores de validación"""
+        if not indices:
+            return
+        
+        aliases = [f"c{n}" for n in range(len(indices))]
+        variable_defs = ", ".join(f"$i{n}: IssueCreateInput!" for n in range(len(indices)))
+        fields = "\n".join(
+            f"            {alias}: issueCreate(input: $i{n}) {{{ISSUE_CREATE_FIELDS}}}"
+            for n, alias in enumerate(aliases)
+        )
+        mutation = f"mutation BatchCreateSubIssues({variable_defs}) {{\n{fields}\n        }}"
+        variables = {f"i{n}": inputs[index] for n, index in enumerate(indices)}
+        
+        try:
+            response = self._make_request(mutation, variables)
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status == 400:
+                response = self._error_body(e.response)
+                if response.get('data') is None:
+                    # Documento rechazado por validación: ningún alias se ejecutó
+                    messages = [error.get('message') for error in response.get('errors') or [] if error.get('message')]
+                    response = {'errors': [{'message': f"HTTP 400: {'; '.join(messages) or e}"}]}
+                # Con 'data', Linear informó un fallo parcial: los alias que devolvieron
+                # el issue ya están creados y solo se reintentan los demás
+            else:
+                for index in indices:
+                    results[index].error = f"Error en API: {e}"
+                print(f"[ERROR] Lote de {len(indices)} sub-issues falló sin reintento: {e}")
+                return
+        except Exception as e:
+            for index in indices:
+                results[index].error = f"Error en API: {e}"
+            print(f"[ERROR] Lote de {len(indices)} sub-issues falló sin reintento: {e}")
+            return
+        
+        data = (response or {}).get('data') or {}
+        errors = (response or {}).get('errors') or []
+        
+        # Errores asociados a cada alias (path = ["c3", ...])
+        alias_errors: Dict[str, str] = {}
+        for error in errors:
+            path = error.get('path') or []
+            if path:
+                alias_errors.setdefault(str(path[0]), error.get('message', 'Sin mensaje'))
+        general_error = next((e.get('message', 'Sin mensaje') for e in errors if not e.get('path')), None)
+        
+        failed = []
+        for alias, index in zip(aliases, indices):
+            result = data.get(alias) or {}
+            issue = result.get('issue') or {}
+            if result.get('success') and issue.get('id'):
+                results[index].issue_id = issue['id']
+                results[index].identifier = issue.get('identifier')
+                results[index].error = None
+                print(f"[OK] Sub-issue creado: {issue.get('identifier')} - {issue.get('title')}")
+            else:
+                results[index].error = alias_errors.get(alias) or general_error or 'issueCreate sin éxito'
+                failed.append(index)
+        
+        if not failed:
+            return
+        
+        if len(indices) == 1:
+            print(f"[ERROR] Error creando sub-issue: {results[indices[0]].error}")
+            return
+        
+        # Dividir los casos fallidos y reintentar cada mitad por separado
+        print(f"[WARN] {len(failed)}/{len(indices)} sub-issues del lote fallaron, dividiendo y reintentando...")
+        middle = (len(failed) + 1) // 2
+        self._create_batch_into(failed[:middle], inputs, results)
+        self._create_batch_into(failed[middle:], inputs, results)
+    
+    @staticmethod
+    def _error_body(response) -> Dict:
+        """Cuerpo JSON de una respuesta de error ({} si no es JSON)"""
+        try:
+            body = response.json() if response is not None else {}
+        except ValueError:
+            return {}
+        return body if isinstance(body, dict) else {}
+    
     def get_team_by_prefix(self, issue_identifier: str) -> Optional[str]:
         """Detecta automáticamente el equipo según el prefijo del issue (FIN-1264 → Finanzas)"""
         try:
@@ -263,10 +525,59 @@ class LinearAPIClient:
             print(f"[ERROR] Error detectando equipo: {e}")
             return None
     
+    def get_child_issues(self, parent_id: str) -> List[Dict]:
+        """Obtiene todos los sub-issues de un issue (paginado)"""
+        query = """
+        query($issueId: String!, $after: String) {
+            issue(id: $issueId) {
+                children(first: 100, after: $after) {
+                    nodes {
+                        id
+                        identifier
+                        title
+                        description
+                        priority
+                    }
+                    pageInfo {
+                        hasNextPage
+                        endCursor
+                    }
+                }
+            }
+        }
+        """
+        
+        children = []
+        cursor = None
+        while True:
+            response = self._make_request(query, {"issueId": parent_id, "after": cursor})
+            connection = ((response.get('data') or {}).get('issue') or {}).get('children') or {}
+            children.extend(connection.get('nodes', []))
+            page_info = connection.get('pageInfo') or {}
+            if not page_info.get('hasNextPage'):
+                return children
+            cursor = page_info.get('endCursor')
+    
     def upload_test_cases_as_subissues(self, parent_issue_identifier: str, test_cases: List[Dict], 
-                                     team_id: Optional[str] = None) -> List[str]:
-        """Sube múltiples casos de prueba como sub-issues"""
+                                     team_id: Optional[str] = None, batch_size: Optional[int] = None,
+                                     job: Optional[UploadJob] = None,
+                                     on_progress: Optional[Callable[[UploadJob], None]] = None,
+                                     on_case_result: Optional[Callable[[SubIssueResult, UploadedCase], None]] = None) -> List[str]:
+        """
+        Sube múltiples casos de prueba como sub-issues
+        
+        Los casos se envían en lotes de batch_size issueCreate por petición
+        (por defecto self.batch_size; 1 = una petición por caso).
+        El detalle por caso queda en self.last_upload_results.
+        
+        Es idempotente: no se crean los casos ya confirmados en `job` ni los que ya
+        existen como hijos de la HU con el mismo título y hash de contenido.
+        on_progress(job) se llama tras cada lote confirmado para persistir el avance y
+        on_case_result(result, case) por cada caso, en orden (para mostrar progreso en vivo).
+        """
         created_issues = []
+        self.last_upload_results: List[SubIssueResult] = []
+        batch_size = max(1, batch_size or self.batch_size)
         
         print(f"[INFO] Subiendo {len(test_cases)} casos de prueba como sub-issues de {parent_issue_identifier}")
         print(f"[INFO] Team ID recibido: {team_id}")
@@ -292,59 +603,418 @@ class LinearAPIClient:
         else:
             print(f"[OK] UUID obtenido: {parent_uuid}")
         
-        print(f"[INFO] Procesando {len(test_cases)} casos de prueba...")
+        # Labels y estado son los mismos para todos los casos: se resuelven una sola vez
+        # (una consulta para ambos, luego se sirven desde la caché de metadatos)
+        self.prefetch_team_metadata(team_id)
+        # Solo usar etiqueta Test_Case (la prioridad va en el campo priority)
+        label_ids = self._get_label_ids(team_id, ["Test_Case"])
+        state_id = self._get_todo_state_id(team_id)
         
+        if job is None:
+            job = UploadJob(project_id="", parent_issue_identifier=parent_issue_identifier)
+        job.status = JOB_RUNNING
+        confirmed = job.confirmed_hashes()
+        
+        # Sub-issues que ya cuelgan de la HU (por título + hash de contenido)
+        try:
+            existing_children = {}
+            for child in self.get_child_issues(parent_uuid):
+                child_hash = extract_hash_marker(child.get('description')) or content_hash(
+                    child.get('title', ''), child.get('description') or '')
+                existing_children[(child.get('title', ''), child_hash)] = child
+        except Exception as e:
+            print(f"[WARN] No se pudieron leer los sub-issues existentes: {e}")
+            existing_children = {}
+        
+        print(f"[INFO] Procesando {len(test_cases)} casos de prueba en lotes de {batch_size}...")
+        
+        inputs = []
+        pending_cases: List[UploadedCase] = []
+        skipped_results: List[SubIssueResult] = []
         for i, test_case in enumerate(test_cases, 1):
-            # Usar solo el título sin duplicar el ID
-            # Linear ya agrega su propio identificador (ej: FIN-1234)
-            title = test_case.get('title', 'Sin titulo')
+            test_case_id, title, description, case_hash = self._describe_case(test_case, i)
+            case = UploadedCase(index=i - 1, test_case_id=test_case_id, title=title, content_hash=case_hash)
             
-            print(f"[INFO] Caso {i}/{len(test_cases)}: {test_case.get('test_case_id', f'TC-{i:03d}')} - {title[:50]}...")
+            # Ya confirmado en un intento anterior o ya existente en Linear: no crear de nuevo
+            previous = confirmed.get(case_hash)
+            child = existing_children.get((title, case_hash))
+            if previous or child:
+                case.issue_id = previous.issue_id if previous else child['id']
+                case.identifier = previous.identifier if previous else child.get('identifier')
+                case.status = 'existing'
+                job.record(case)
+                skipped_results.append(SubIssueResult(index=case.index, issue_id=case.issue_id,
+                                                      identifier=case.identifier, skipped=True))
+                if on_case_result:
+                    on_case_result(skipped_results[-1], case)
+                print(f"[INFO] Caso {i}/{len(test_cases)}: {test_case_id} ya existe en Linear ({case.identifier}), se omite")
+                continue
             
-            # Construir descripción formateada
-            description = self._format_test_case_description(test_case)
+            print(f"[INFO] Caso {i}/{len(test_cases)}: {test_case_id} - {title[:50]}...")
             
-            # Solo usar etiqueta Test_Case (la prioridad va en el campo priority)
-            labels = ["Test_Case"]
+            input_data = {
+                "title": title,
+                "description": append_hash_marker(description, case_hash),
+                "teamId": team_id,
+                "parentId": parent_uuid,  # UUID interno, no el identificador público
+                "priority": self._get_linear_priority(test_case.get('priority', 'Media')),
+                "labelIds": label_ids
+            }
+            if state_id:
+                input_data["stateId"] = state_id
+            inputs.append(input_data)
+            pending_cases.append(case)
+        
+        if on_progress:
+            on_progress(job)
+        
+        # Los lotes se envían en paralelo; el planificador limita cuántos van a la vez
+        batch_results: List[SubIssueResult] = []
+        starts = list(range(0, len(inputs), batch_size))
+        workers = min(len(starts), self.max_concurrency) or 1
+        print(f"[INFO] Enviando {len(starts)} lotes (hasta {workers} en paralelo)...")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self.create_sub_issues_batch, inputs[start:start + batch_size])
+                for start in starts
+            ]
+            # Recoger en orden de envío: el avance se confirma en el orden de los casos
+            for start, future in zip(starts, futures):
+                for result in future.result():
+                    case = pending_cases[start + result.index]
+                    result.index = case.index
+                    batch_results.append(result)
+                    case.issue_id = result.issue_id
+                    case.identifier = result.identifier
+                    case.error = result.error
+                    case.status = 'created' if result.success else 'failed'
+                    job.record(case)
+                    if result.success:
+                        created_issues.append(result.issue_id)
+                    else:
+                        print(f"       [ERROR] Error creando sub-issue {result.index + 1}: {result.error}")
+                    if on_case_result:
+                        on_case_result(result, case)
+                if on_progress:
+                    on_progress(job)
+        
+        self.last_upload_results = sorted(skipped_results + batch_results, key=lambda r: r.index)
+        job.status = JOB_FAILED if any(not r.success for r in batch_results) else JOB_COMPLETED
+        if on_progress:
+            on_progress(job)
+        
+        print(f"[INFO] RESULTADO FINAL: {len(created_issues)} creados, {len(skipped_results)} ya existían, "
+              f"{len(test_cases)} casos en total")
+        return created_issues
+    
+    # ==================== SINCRONIZACIÓN INCREMENTAL ====================
+    
+    def _describe_case(self, test_case: Dict, position: int) -> Tuple[str, str, str, str]:
+        """(test_case_id, título, descripción, hash de contenido) de un caso local"""
+        # Usar solo el título sin duplicar el ID
+        # Linear ya agrega su propio identificador (ej: FIN-1234)
+        title = test_case.get('title', 'Sin titulo')
+        test_case_id = test_case.get('test_case_id') or test_case.get('id') or f'TC-{position:03d}'
+        description = self._format_test_case_description(test_case)
+        return test_case_id, title, description, content_hash(title, description)
+    
+    def plan_sync(self, parent_issue_identifier: str, test_cases: List[Dict],
+                  job: Optional[UploadJob] = None, archive_orphans: bool = True) -> Optional[SyncPlan]:
+        """
+        Calcula la diferencia entre los casos locales y los sub-issues de la HU (sin modificar nada)
+        
+        Cada caso local se empareja con un sub-issue existente:
+          1. por hash de contenido (sin cambios → no se toca)
+          2. por el mapeo test_case_id → issue guardado en `job` (editado → issueUpdate)
+          3. por título, entre los sub-issues creados por esta herramienta (editado → issueUpdate)
+        Los que no se emparejan se crean. Los sub-issues con marca de hash que ya no tienen
+        caso local se archivan (si archive_orphans); los creados a mano nunca se tocan.
+        
+        Returns:
+            SyncPlan con dry_run=True, o None si no se encontró la HU
+        """
+        parent_uuid = self.get_issue_by_identifier(parent_issue_identifier)
+        if not parent_uuid:
+            print(f"[ERROR] No se pudo encontrar la HU {parent_issue_identifier}")
+            return None
+        
+        # Una sola consulta paginada con todos los hijos de la HU
+        children = self.get_child_issues(parent_uuid)
+        children_by_id = {child['id']: child for child in children}
+        by_hash: Dict[str, Dict] = {}
+        by_title: Dict[str, Dict] = {}
+        for child in children:
+            child_hash = extract_hash_marker(child.get('description'))
+            if child_hash:
+                child['_hash'] = child_hash
+                by_hash.setdefault(child_hash, child)
+                by_title.setdefault(child.get('title', ''), child)
+        
+        mapping = {}
+        if job is not None:
+            mapping = {case.test_case_id: case.issue_id for case in job.cases
+                       if case.confirmed and case.issue_id in children_by_id}
+        
+        plan = SyncPlan(parent_issue_identifier=parent_issue_identifier, parent_id=parent_uuid)
+        matched = set()
+        
+        for i, test_case in enumerate(test_cases, 1):
+            test_case_id, title, description, case_hash = self._describe_case(test_case, i)
+            priority = self._get_linear_priority(test_case.get('priority', 'Media'))
+            item = SyncAction(action=SYNC_CREATE, title=title, index=i - 1,
+                              test_case_id=test_case_id, content_hash=case_hash)
             
-            # Crear sub-issue usando el UUID interno
-            print(f"       Creando sub-issue con team_id: {team_id}")
-            issue_id = self.create_sub_issue(
-                parent_id=parent_uuid,  # UUID interno, no el identificador público
-                title=title,
-                description=description,
-                team_id=team_id,
-                priority=self._get_linear_priority(test_case.get('priority', 'Media')),
-                labels=labels
-            )
+            child = by_hash.get(case_hash)
+            if child is None or child['id'] in matched:
+                child = children_by_id.get(mapping.get(test_case_id))
+                if child is None or child['id'] in matched:
+                    child = by_title.get(title)
+            if child is not None and child['id'] in matched:
+                child = None
             
-            if issue_id:
-                print(f"       [OK] Sub-issue creado exitosamente")
-                created_issues.append(issue_id)
+            if child is None:
+                item.input = {
+                    "title": title,
+                    "description": append_hash_marker(description, case_hash),
+                    "priority": priority
+                }
             else:
-                print(f"       [ERROR] Error creando sub-issue")
+                matched.add(child['id'])
+                item.issue_id = child['id']
+                item.identifier = child.get('identifier')
+                if child.get('_hash') != case_hash:
+                    # El hash cubre título + descripción: si el título no cambió, cambió la descripción
+                    item.changes.append('title' if child.get('title') != title else 'description')
+                if child.get('priority') is not None and child.get('priority') != priority:
+                    item.changes.append('priority')
+                
+                if item.changes:
+                    # Solo contenido: estado, labels y responsable del sub-issue se respetan
+                    item.action = SYNC_UPDATE
+                    item.input = {"priority": priority}
+                    if child.get('_hash') != case_hash:
+                        item.input.update({
+                            "title": title,
+                            "description": append_hash_marker(description, case_hash)
+                        })
+                else:
+                    item.action = SYNC_UNCHANGED
+            plan.actions.append(item)
         
-        print(f"[INFO] RESULTADO FINAL: {len(created_issues)}/{len(test_cases)} casos subidos")
-        return created_issues
+        if archive_orphans:
+            for child in children:
+                if child.get('_hash') and child['id'] not in matched:
+                    plan.actions.append(SyncAction(
+                        action=SYNC_ARCHIVE, title=child.get('title', ''), issue_id=child['id'],
+                        identifier=child.get('identifier'), content_hash=child['_hash']
+                    ))
+        
+        summary = plan.summary()
+        print(f"[INFO] Plan de sincronizacion para {parent_issue_identifier}: "
+              f"{summary[SYNC_CREATE]} crear, {summary[SYNC_UPDATE]} actualizar, "
+              f"{summary[SYNC_ARCHIVE]} archivar, {summary[SYNC_UNCHANGED]} sin cambios")
+        return plan
     
-    def _make_request(self, query: str, variables: Optional[Dict] = None) -> Dict:
-        """Hace una petición a la API de Linear"""
-        payload: Dict = {"query": query}
-        if variables:
-            payload["variables"] = variables
-        
-        response = requests.post(
-            self.base_url,
-            headers=self.headers,
-            json=payload,
-            timeout=30
-        )
+    def sync_test_cases(self, parent_issue_identifier: str, test_cases: List[Dict],
+                        job: Optional[UploadJob] = None, dry_run: bool = True,
+                        archive_orphans: bool = True, team_id: Optional[str] = None,
+                        batch_size: Optional[int] = None) -> Optional[SyncPlan]:
+        """
+        Sincroniza los casos locales con los sub-issues de la HU
+        
+        Con dry_run=True (por defecto) solo devuelve el plan. Si no, envía únicamente los
+        issueCreate / issueUpdate / issueArchive necesarios (en lotes con alias, como la subida)
+        y deja `job` reflejando el estado final de cada caso.
+        """
+        plan = self.plan_sync(parent_issue_identifier, test_cases, job=job, archive_orphans=archive_orphans)
+        if plan is None or dry_run:
+            return plan
+        plan.dry_run = False
+        batch_size = max(1, batch_size or self.batch_size)
+        
+        creates = plan.by_action(SYNC_CREATE)
+        if creates:
+            # Equipo, labels y estado solo hacen falta si hay algo que crear
+            team_id = team_id or self.get_team_by_prefix(parent_issue_identifier)
+            if not team_id:
+                for item in creates:
+                    item.error = "No se pudo detectar el equipo"
+            else:
+                self.prefetch_team_metadata(team_id)
+                label_ids = self._get_label_ids(team_id, ["Test_Case"])
+                state_id = self._get_todo_state_id(team_id)
+                for item in creates:
+                    item.input.update({"teamId": team_id, "parentId": plan.parent_id, "labelIds": label_ids})
+                    if state_id:
+                        item.input["stateId"] = state_id
+                
+                results = self._run_in_batches(
+                    [item.input for item in creates], batch_size, self.create_sub_issues_batch)
+                for item, result in zip(creates, results):
+                    item.issue_id = result.issue_id
+                    item.identifier = result.identifier
+                    item.error = result.error
+        
+        updates = plan.by_action(SYNC_UPDATE)
+        errors = self._run_in_batches(
+            [{"id": item.issue_id, "input": item.input} for item in updates], batch_size,
+            lambda chunk: self._mutate_aliased(
+                "BatchUpdateSubIssues", "issueUpdate(id: $id{n}, input: $input{n})",
+                {"id": "String!", "input": "IssueUpdateInput!"}, chunk))
+        for item, error in zip(updates, errors):
+            item.error = error
+        
+        archives = plan.by_action(SYNC_ARCHIVE)
+        errors = self._run_in_batches(
+            [{"id": item.issue_id} for item in archives], batch_size,
+            lambda chunk: self._mutate_aliased(
+                "BatchArchiveSubIssues", "issueArchive(id: $id{n})", {"id": "String!"}, chunk))
+        for item, error in zip(archives, errors):
+            item.error = error
+        
+        if job is not None:
+            status_by_action = {SYNC_CREATE: 'created', SYNC_UPDATE: 'updated', SYNC_UNCHANGED: 'existing'}
+            job.cases = [
+                UploadedCase(index=item.index, test_case_id=item.test_case_id, title=item.title,
+                             content_hash=item.content_hash, issue_id=item.issue_id,
+                             identifier=item.identifier, error=item.error,
+                             status=status_by_action[item.action] if item.success else 'failed')
+                for item in plan.actions if item.action != SYNC_ARCHIVE
+            ]
+            job.status = JOB_COMPLETED if all(item.success for item in plan.actions) else JOB_FAILED
+            job.updated_at = datetime.now().isoformat()
+        
+        summary = plan.summary()
+        print(f"[INFO] Sincronizacion aplicada: {summary[SYNC_CREATE]} creados, {summary[SYNC_UPDATE]} actualizados, "
+              f"{summary[SYNC_ARCHIVE]} archivados, {summary['failed']} con error")
+        return plan
+    
+    def _run_in_batches(self, items: List[Any], batch_size: int, send: Callable[[List[Any]], List[Any]]) -> List[Any]:
+        """Envía items en lotes de batch_size en paralelo (limitado por el planificador) y une los resultados en orden"""
+        starts = list(range(0, len(items), batch_size))
+        if not starts:
+            return []
+        workers = min(len(starts), self.max_concurrency)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(send, items[start:start + batch_size]) for start in starts]
+            return [result for future in futures for result in future.result()]
+    
+    def _mutate_aliased(self, operation: str, call: str, variable_types: Dict[str, str],
+                        items: List[Dict]) -> List[Optional[str]]:
+        """
+        Ejecuta una mutación por item en un solo documento con alias (m0, m1, ...)
+        
+        `call` usa {n} para el sufijo de las variables, p. ej. "issueArchive(id: $id{n})".
+        Devuelve un error (o None si tuvo éxito) por item; los fallidos se reintentan
+        dividiendo el lote, como en create_sub_issues_batch.
+        """
+        errors: List[Optional[str]] = ["Sin respuesta"] * len(items)
+        self._mutate_aliased_into(operation, call, variable_types, items, list(range(len(items))), errors)
+        return errors
+    
+    def _mutate_aliased_into(self, operation: str, call: str, variable_types: Dict[str, str],
+                             items: List[Dict], indices: List[int], errors: List[Optional[str]]):
+        if not indices:
+            return
+        
+        variable_defs = ", ".join(
+            f"${name}{n}: {type_name}" for n in range(len(indices)) for name, type_name in variable_types.items())
+        fields = "\n".join(f"            m{n}: {call.format(n=n)} {{ success }}" for n in range(len(indices)))
+        mutation = f"mutation {operation}({variable_defs}) {{\n{fields}\n        }}"
+        variables = {f"{name}{n}": items[index][name]
+                     for n, index in enumerate(indices) for name in variable_types}
+        
+        try:
+            # issueUpdate / issueArchive: repetirlas deja el mismo estado, se pueden reintentar
+            response = self._make_request(mutation, variables, idempotent=True)
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status != 400:
+                for index in indices:
+                    errors[index] = f"Error en API: {e}"
+                return
+            response = {'errors': [{'message': f'HTTP 400: {e}'}]}
+        except Exception as e:
+            for index in indices:
+                errors[index] = f"Error en API: {e}"
+            return
+        
+        data = (response or {}).get('data') or {}
+        alias_errors: Dict[str, str] = {}
+        general_error = None
+        for error in (response or {}).get('errors') or []:
+            path = error.get('path') or []
+            if path:
+                alias_errors.setdefault(str(path[0]), error.get('message', 'Sin mensaje'))
+            elif general_error is None:
+                general_error = error.get('message', 'Sin mensaje')
+        
+        failed = []
+        for n, index in enumerate(indices):
+            if (data.get(f"m{n}") or {}).get('success'):
+                errors[index] = None
+            else:
+                errors[index] = alias_errors.get(f"m{n}") or general_error or f"{operation} sin éxito"
+                failed.append(index)
+        
+        if failed and len(indices) > 1:
+            middle = (len(failed) + 1) // 2
+            self._mutate_aliased_into(operation, call, variable_types, items, failed[:middle], errors)
+            self._mutate_aliased_into(operation, call, variable_types, items, failed[middle:], errors)
+    
+    def _make_request(self, query: str, variables: Optional[Dict] = None, idempotent: Optional[bool] = None) -> Dict:
+        """
+        Hace una petición a la API de Linear (por el transporte compartido y el planificador)
+        
+        Un 429 se reintenta siempre: Linear no procesó la petición. Un 5xx o un error de
+        conexión solo se reintenta si la operación es idempotente (por defecto las consultas;
+        una mutación pudo ejecutarse antes del fallo y crear el issue dos veces).
+        """
+        if idempotent is None:
+            idempotent = not query.lstrip().startswith('mutation')
+        throttled = failures = 0
+        while True:
+            try:
+                with self.scheduler.slot():
+                    response = self.transport.post(query, variables)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not idempotent or failures >= self.MAX_ERROR_RETRIES:
+                    raise
+                failures += 1
+                delay = self.scheduler.record_failure(failures)
+                print(f"[WARN] Error de conexión con Linear ({e}), reintento {failures} en {delay:.1f}s", flush=True)
+                time.sleep(delay)
+                continue
+            
+            self.scheduler.update_from_headers(response.headers, response.status_code)
+            if response.status_code == 429 and throttled < self.MAX_THROTTLE_RETRIES:
+                throttled += 1
+                continue
+            if response.status_code >= 500 and idempotent and failures < self.MAX_ERROR_RETRIES:
+                failures += 1
+                delay = self.scheduler.record_failure(failures)
+                print(f"[WARN] Linear devolvió {response.status_code}, reintento {failures} en {delay:.1f}s", flush=True)
+                time.sleep(delay)
+                continue
+            break
         
         response.raise_for_status()
         return response.json()
     
     def _get_label_ids(self, team_id: str, label_names: List[str]) -> List[str]:
         """Obtiene los IDs de las labels por nombre"""
+        label_map = metadata_cache.get('labels', self.api_key, team_id)
+        
+        # Si falta alguna label puede haberse creado después de llenar la caché: refrescar
+        if label_map is None or any(name not in label_map for name in label_names):
+            label_map = self._fetch_team_labels(team_id)
+            if label_map is None:
+                return []
+        
+        return [label_map[name] for name in label_names if name in label_map]
+    
+    def _fetch_team_labels(self, team_id: str) -> Optional[Dict[str, str]]:
+        """Descarga las labels del equipo y actualiza la caché"""
         query = """
         query($teamId: String!) {
             team(id: $teamId) {
@@ -363,13 +1033,18 @@ class LinearAPIClient:
             labels = response.get('data', {}).get('team', {}).get('labels', {}).get('nodes', [])
             
             label_map = {label['name']: label['id'] for label in labels}
-            return [label_map[name] for name in label_names if name in label_map]
+            metadata_cache.set('labels', self.api_key, label_map, team_id)
+            return label_map
         except Exception as e:
             print(f"Error obteniendo labels: {e}")
-            return []
+            return None
     
-    def _get_todo_state_id(self, team_id: str) -> Optional[str]:
-        """Obtiene el ID del estado 'Todo' o 'To Do' del equipo"""
+    def _get_team_states(self, team_id: str) -> Optional[List[Dict]]:
+        """Estados de workflow del equipo (desde la caché si es posible)"""
+        states = metadata_cache.get('states', self.api_key, team_id)
+        if states is not None:
+            return states
+        
         query = """
         query($teamId: String!) {
             team(id: $teamId) {
@@ -387,25 +1062,33 @@ class LinearAPIClient:
         try:
             response = self._make_request(query, {"teamId": team_id})
             states = response.get('data', {}).get('team', {}).get('states', {}).get('nodes', [])
-            
-            # Buscar estado "Todo" o "To Do" (tipo unstarted)
-            for state in states:
-                if state.get('name', '').lower() in ['todo', 'to do'] and state.get('type') == 'unstarted':
-                    print(f"[INFO] Estado 'Todo' encontrado para el equipo: {state.get('id')}")
-                    return state.get('id')
-            
-            # Si no se encuentra "Todo", buscar el primer estado "unstarted"
-            for state in states:
-                if state.get('type') == 'unstarted':
-                    print(f"[INFO] Usando estado 'unstarted': {state.get('name')} ({state.get('id')})")
-                    return state.get('id')
-            
-            print("[WARN] No se encontro estado 'Todo' o 'unstarted', se usara el estado por defecto (Triage)")
-            return None
+            metadata_cache.set('states', self.api_key, states, team_id)
+            return states
         except Exception as e:
             print(f"[ERROR] Error obteniendo estados: {e}")
             return None
     
+    def _get_todo_state_id(self, team_id: str) -> Optional[str]:
+        """Obtiene el ID del estado 'Todo' o 'To Do' del equipo"""
+        states = self._get_team_states(team_id)
+        if states is None:
+            return None
+        
+        # Buscar estado "Todo" o "To Do" (tipo unstarted)
+        for state in states:
+            if state.get('name', '').lower() in ['todo', 'to do'] and state.get('type') == 'unstarted':
+                print(f"[INFO] Estado 'Todo' encontrado para el equipo: {state.get('id')}")
+                return state.get('id')
+        
+        # Si no se encuentra "Todo", buscar el primer estado "unstarted"
+        for state in states:
+            if state.get('type') == 'unstarted':
+                print(f"[INFO] Usando estado 'unstarted': {state.get('name')} ({state.get('id')})")
+                return state.get('id')
+        
+        print("[WARN] No se encontro estado 'Todo' o 'unstarted', se usara el estado por defecto (Triage)")
+        return None
+    
     def _format_test_case_description(self, test_case: Dict) -> str:
         """Formatea la descripción del caso de prueba para Linear"""
         description_parts = []
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Planificador de Peticiones a Linear con Control de Rate Limit
+Token bucket + concurrencia adaptativa guiados por los headers X-RateLimit-* de Linear
+"""
+
+import os
+import time
+import random
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Dict, Mapping, Optional, Tuple
+
+# Techo de peticiones simultáneas a Linear
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get('LINEAR_MAX_CONCURRENCY', '4'))
+
+# Techo del token bucket (peticiones por segundo): el ritmo nunca lo supera
+DEFAULT_MAX_RATE = float(os.environ.get('LINEAR_MAX_REQUESTS_PER_SECOND', '20'))
+
+# Ritmo inicial (sube hacia el techo con cada respuesta sana) y ráfaga máxima
+DEFAULT_RATE = float(os.environ.get('LINEAR_REQUESTS_PER_SECOND', '5'))
+DEFAULT_BURST = 8
+
+# Factor con el que crece el ritmo tras una respuesta sana
+RATE_INCREASE_FACTOR = 1.25
+
+# Por debajo de esta fracción del presupuesto restante se reduce la concurrencia
+LOW_BUDGET_RATIO = 0.10
+
+# Espera antes de reintentar tras un 5xx o un error de conexión (exponencial con jitter)
+RETRY_BACKOFF_BASE = float(os.environ.get('LINEAR_RETRY_BACKOFF_SECONDS', '0.5'))
+RETRY_BACKOFF_MAX = 30.0
+
+# Headers de rate limit que devuelve Linear
+REQUESTS_LIMIT = 'X-RateLimit-Requests-Limit'
+REQUESTS_REMAINING = 'X-RateLimit-Requests-Remaining'
+REQUESTS_RESET = 'X-RateLimit-Requests-Reset'
+COMPLEXITY_LIMIT = 'X-RateLimit-Complexity-Limit'
+COMPLEXITY_REMAINING = 'X-RateLimit-Complexity-Remaining'
+COMPLEXITY_RESET = 'X-RateLimit-Complexity-Reset'
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _reset_in_seconds(reset_value: Optional[float]) -> Optional[float]:
+    """Los resets de Linear son timestamps UNIX en milisegundos"""
+    if reset_value is None:
+        return None
+    reset_at = reset_value / 1000 if reset_value > 1e11 else reset_value
+    return max(0.0, reset_at - time.time())
+
+
+class RateLimitScheduler:
+    """
+    Token bucket con concurrencia adaptativa (AIMD)
+
+    - Cada petición consume un token; los tokens se reponen a `rate` por segundo.
+    - Con presupuesto bajo (requests o complejidad) la concurrencia se reduce a la mitad
+      y el ritmo se ajusta para repartir lo que queda hasta el reset.
+    - Cada respuesta sana (presupuesto holgado o sin headers de rate limit) sube la
+      concurrencia de a uno hasta max_concurrency y el ritmo hasta max_rate.
+    - Un 429 reduce ritmo y concurrencia a la mitad y pausa todas las peticiones hasta
+      el reset indicado por Linear.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, rate: float = DEFAULT_RATE,
+                 burst: int = DEFAULT_BURST, max_rate: float = DEFAULT_MAX_RATE):
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = self.max_concurrency
+        self.max_rate = max(0.1, max_rate)
+        self.rate = min(max(0.1, rate), self.max_rate)
+        self.burst = max(1, burst)
+
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._active = 0
+        self._condition = threading.Condition()
+
+        self.throttled = 0
+        self.failures = 0
+        self.last_budget = {}
+
+    # ==================== ADQUISICIÓN ====================
+
+    @contextmanager
+    def slot(self):
+        """Reserva un hueco de concurrencia y un token durante una petición"""
+        self._acquire()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+    def _acquire(self):
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = 0.0
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._active >= self.concurrency:
+                    wait = None  # Esperar a que termine otra petición
+                elif self._tokens < 1:
+                    wait = (1 - self._tokens) / self.rate if self.rate > 0 else 1.0
+                else:
+                    self._tokens -= 1
+                    self._active += 1
+                    return
+                self._condition.wait(timeout=wait)
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+
+    # ==================== AJUSTE POR HEADERS ====================
+
+    def update_from_headers(self, headers: Mapping[str, str], status_code: int = 200):
+        """Ajusta ritmo y concurrencia con los headers de la última respuesta"""
+        budgets = []
+        for limit_name, remaining_name, reset_name in (
+                (REQUESTS_LIMIT, REQUESTS_REMAINING, REQUESTS_RESET),
+                (COMPLEXITY_LIMIT, COMPLEXITY_REMAINING, COMPLEXITY_RESET)):
+            limit = _header_number(headers, limit_name)
+            remaining = _header_number(headers, remaining_name)
+            reset_in = _reset_in_seconds(_header_number(headers, reset_name))
+            if limit and remaining is not None:
+                budgets.append((remaining / limit, remaining, reset_in))
+
+        with self._condition:
+            if status_code == 429:
+                self.throttled += 1
+                self.concurrency = max(1, self.concurrency // 2)
+                self.rate = max(0.1, self.rate / 2)
+                resets = [reset_in for _, _, reset_in in budgets if reset_in is not None]
+                pause = min(max(resets), 60.0) if resets else 2.0 ** min(self.throttled, 5)
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+                print(f"[WARN] Linear devolvió 429: pausa de {pause:.1f}s, concurrencia {self.concurrency}", flush=True)
+            elif budgets:
+                ratio, remaining, reset_in = min(budgets, key=lambda budget: budget[0])
+                self.last_budget = {'ratio': round(ratio, 4), 'remaining': remaining, 'reset_in': reset_in}
+                if ratio < LOW_BUDGET_RATIO:
+                    self.concurrency = max(1, self.concurrency // 2)
+                    # Repartir el presupuesto restante hasta el reset
+                    if reset_in:
+                        self.rate = max(0.1, min(self.max_rate, remaining / reset_in))
+                else:
+                    self._grow()
+            elif status_code < 400:
+                # Sin headers de rate limit: una respuesta sana también permite acelerar
+                self._grow()
+            self._condition.notify_all()
+
+    def _grow(self):
+        """Sube concurrencia y ritmo hacia sus techos (con el lock tomado)"""
+        self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+        self.rate = min(self.max_rate, self.rate * RATE_INCREASE_FACTOR)
+
+    def record_failure(self, attempt: int) -> float:
+        """
+        Registra un 5xx o un error de conexión y devuelve cuánto esperar antes del reintento
+
+        La concurrencia se reduce a la mitad (se recupera con las respuestas sanas) para
+        no insistir con todas las peticiones a la vez contra un servidor con problemas.
+        """
+        with self._condition:
+            self.failures += 1
+            self.concurrency = max(1, self.concurrency // 2)
+            self._condition.notify_all()
+        delay = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** max(0, attempt - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def wait_time(self) -> float:
+        """Segundos que faltan para que termine una pausa por 429"""
+        with self._condition:
+            return max(0.0, self._paused_until - time.monotonic())
+
+
+# Un planificador por API key (y endpoint) para todo el proceso: los clientes que se crean
+# en cada petición comparten el presupuesto de Linear y las pausas por 429
+_schedulers: Dict[Tuple[str, str], RateLimitScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(api_key: str, base_url: str = '', max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                  max_rate: float = DEFAULT_MAX_RATE) -> RateLimitScheduler:
+    """Planificador compartido del API key; max_concurrency y max_rate solo se usan al crearlo"""
+    key = (hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16], base_url)
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = _schedulers[key] = RateLimitScheduler(max_concurrency=max_concurrency, max_rate=max_rate)
+        return scheduler
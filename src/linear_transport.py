@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Transporte HTTP compartido para la API GraphQL de Linear
+Un pool de conexiones (keep-alive) por proceso, timeouts configurables, compresión gzip
+y una única regla de autenticación para todos los clientes de Linear
+"""
+
+import os
+import gzip
+import json
+import threading
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+LINEAR_GRAPHQL_URL = "https://api.linear.app/graphql"
+
+# Endpoint alternativo (p. ej. el servidor simulado de scripts/mock_linear_server.py)
+LINEAR_API_URL_ENV = 'LINEAR_API_URL'
+
+# Timeouts (segundos): conexión y lectura
+DEFAULT_CONNECT_TIMEOUT = float(os.environ.get('LINEAR_CONNECT_TIMEOUT', '5'))
+DEFAULT_READ_TIMEOUT = float(os.environ.get('LINEAR_READ_TIMEOUT', '30'))
+
+# Tamaño del pool de conexiones por host
+DEFAULT_POOL_SIZE = int(os.environ.get('LINEAR_POOL_SIZE', '10'))
+
+# Comprimir con gzip los cuerpos de petición a partir de este tamaño (0 = desactivado)
+GZIP_MIN_BYTES = int(os.environ.get('LINEAR_GZIP_MIN_BYTES', '0'))
+
+
+def linear_auth_header(api_key: str) -> str:
+    """
+    Valor del header Authorization para Linear
+
+    Las API keys personales (lin_api_...) van sin prefijo; los tokens OAuth van con "Bearer".
+    Si el valor ya trae el prefijo se respeta tal cual.
+    """
+    api_key = (api_key or "").strip()
+    if api_key.lower().startswith('bearer ') or api_key.startswith('lin_api_'):
+        return api_key
+    return f"Bearer {api_key}"
+
+
+class LinearTransport:
+    """
+    Transporte HTTP para la API de Linear
+
+    Todas las instancias que apuntan al mismo endpoint comparten una requests.Session,
+    así el handshake TCP/TLS se paga una vez por conexión del pool y no en cada llamada.
+    """
+
+    _sessions: Dict[str, requests.Session] = {}
+    _sessions_lock = threading.Lock()
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None,
+                 timeout: Optional[Tuple[float, float]] = None, gzip_min_bytes: int = GZIP_MIN_BYTES):
+        self.api_key = api_key
+        # Prioridad: argumento explícito, variable LINEAR_API_URL, API real de Linear
+        self.base_url = base_url or os.environ.get(LINEAR_API_URL_ENV) or LINEAR_GRAPHQL_URL
+        self.timeout = timeout or (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+        self.gzip_min_bytes = gzip_min_bytes
+        self.headers = {
+            "Authorization": linear_auth_header(api_key),
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate"
+        }
+        self.session = self._get_session(self.base_url)
+
+    @classmethod
+    def _get_session(cls, base_url: str) -> requests.Session:
+        """Sesión compartida por endpoint (se crea una sola vez por proceso)"""
+        with cls._sessions_lock:
+            session = cls._sessions.get(base_url)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=DEFAULT_POOL_SIZE, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                cls._sessions[base_url] = session
+            return session
+
+    @classmethod
+    def close_all(cls):
+        """Cierra todas las sesiones del pool (por ejemplo al apagar la aplicación)"""
+        with cls._sessions_lock:
+            for session in cls._sessions.values():
+                session.close()
+            cls._sessions.clear()
+
+    def post(self, query: str, variables: Optional[Dict] = None) -> requests.Response:
+        """Envía un documento GraphQL y devuelve la respuesta HTTP sin procesar"""
+        payload: Dict = {"query": query}
+        if variables:
+            payload["variables"] = variables
+
+        body = json.dumps(payload).encode('utf-8')
+        headers = self.headers
+        if self.gzip_min_bytes and len(body) >= self.gzip_min_bytes:
+            body = gzip.compress(body)
+            headers = dict(headers, **{"Content-Encoding": "gzip"})
+
+        return self.session.post(self.base_url, data=body, headers=headers, timeout=self.timeout)
+
+    def graphql(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        """Envía un documento GraphQL, valida el status HTTP y devuelve el JSON"""
+        response = self.post(query, variables)
+        response.raise_for_status()
+        return response.json()
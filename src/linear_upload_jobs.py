@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Trabajos de Subida a Linear Reanudables
+Registra por proyecto qué casos de prueba ya tienen sub-issue en Linear (con un hash
+de contenido) para que un reintento no duplique issues y solo suba lo pendiente
+"""
+
+import re
+import hashlib
+from datetime import datetime
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+# Marca que se agrega al final de la descripción del sub-issue
+CONTENT_HASH_MARKER = "qa-hash"
+_MARKER_PATTERN = re.compile(r'_?' + CONTENT_HASH_MARKER + r':\s*([0-9a-f]{16})_?')
+
+# Estados de un trabajo
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+def content_hash(title: str, description: str) -> str:
+    """Hash del contenido que se envía a Linear (título + descripción)"""
+    digest = hashlib.sha256(f"{title.strip()}\n{description.strip()}".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def append_hash_marker(description: str, hash_value: str) -> str:
+    """Agrega la marca de hash al final de la descripción"""
+    return f"{description}\n\n_{CONTENT_HASH_MARKER}: {hash_value}_"
+
+
+def extract_hash_marker(description: Optional[str]) -> Optional[str]:
+    """Hash marcado en la descripción de un sub-issue existente (o None)"""
+    if not description:
+        return None
+    matches = _MARKER_PATTERN.findall(description)
+    return matches[-1] if matches else None
+
+
+@dataclass
+class UploadedCase:
+    """Estado de un caso de prueba dentro del trabajo"""
+    index: int
+    test_case_id: str
+    title: str
+    content_hash: str
+    issue_id: Optional[str] = None
+    identifier: Optional[str] = None
+    status: str = JOB_PENDING  # pending | created | existing | failed
+    error: Optional[str] = None
+
+    @property
+    def confirmed(self) -> bool:
+        return self.issue_id is not None
+
+
+@dataclass
+class UploadJob:
+    """Trabajo de subida de los casos de un proyecto como sub-issues de una HU"""
+    project_id: str
+    parent_issue_identifier: str
+    status: str = JOB_PENDING
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    updated_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    cases: List[UploadedCase] = field(default_factory=list)
+
+    # ==================== SERIALIZACIÓN ====================
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "UploadJob":
+        cases = [UploadedCase(**case) for case in data.get('cases', [])]
+        return cls(
+            project_id=data['project_id'],
+            parent_issue_identifier=data['parent_issue_identifier'],
+            status=data.get('status', JOB_PENDING),
+            created_at=data.get('created_at', datetime.now().isoformat()),
+            updated_at=data.get('updated_at', datetime.now().isoformat()),
+            cases=cases
+        )
+
+    @classmethod
+    def resume_or_create(cls, stored: Optional[Dict[str, Any]], project_id: str,
+                         parent_issue_identifier: str) -> "UploadJob":
+        """Reanuda el trabajo guardado si es de la misma HU; si no, crea uno nuevo"""
+        if stored and stored.get('parent_issue_identifier') == parent_issue_identifier:
+            job = cls.from_dict(stored)
+            print(f"[INFO] Reanudando subida: {len(job.confirmed_hashes())} casos ya confirmados", flush=True)
+            return job
+        return cls(project_id=project_id, parent_issue_identifier=parent_issue_identifier)
+
+    # ==================== ESTADO ====================
+
+    def confirmed_hashes(self) -> Dict[str, UploadedCase]:
+        """Casos ya confirmados en Linear, por hash de contenido"""
+        return {case.content_hash: case for case in self.cases if case.confirmed}
+
+    def record(self, case: UploadedCase):
+        """Registra (o reemplaza) el estado de un caso"""
+        for i, existing in enumerate(self.cases):
+            if existing.content_hash == case.content_hash:
+                self.cases[i] = case
+                break
+        else:
+            self.cases.append(case)
+        self.updated_at = datetime.now().isoformat()
+
+    def summary(self) -> Dict[str, int]:
+        counts = {'created': 0, 'existing': 0, 'failed': 0, 'pending': 0}
+        for case in self.cases:
+            counts[case.status] = counts.get(case.status, 0) + 1
+        return counts
+
+
+# ==================== SINCRONIZACIÓN INCREMENTAL ====================
+
+# Acciones de una sincronización
+SYNC_CREATE = "create"
+SYNC_UPDATE = "update"
+SYNC_ARCHIVE = "archive"
+SYNC_UNCHANGED = "unchanged"
+
+
+@dataclass
+class SyncAction:
+    """Acción sobre un sub-issue: crear, actualizar, archivar o dejar igual"""
+    action: str
+    title: str
+    index: Optional[int] = None  # Posición del caso local (None en archivados)
+    test_case_id: Optional[str] = None
+    issue_id: Optional[str] = None
+    identifier: Optional[str] = None
+    content_hash: Optional[str] = None
+    changes: List[str] = field(default_factory=list)  # Campos que cambian en un update
+    error: Optional[str] = None
+    input: Dict[str, Any] = field(default_factory=dict, repr=False)  # Input de la mutación
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop('input')
+        return data
+
+
+@dataclass
+class SyncPlan:
+    """Diferencia entre los casos locales y los sub-issues de la HU (y su resultado si se aplicó)"""
+    parent_issue_identifier: str
+    parent_id: Optional[str] = None  # UUID interno de la HU
+    actions: List[SyncAction] = field(default_factory=list)
+    dry_run: bool = True
+
+    def by_action(self, action: str) -> List[SyncAction]:
+        return [item for item in self.actions if item.action == action]
+
+    @property
+    def mutation_count(self) -> int:
+        """Mutaciones necesarias: solo lo que cambió, no el tamaño del proyecto"""
+        return sum(1 for item in self.actions if item.action != SYNC_UNCHANGED)
+
+    def summary(self) -> Dict[str, int]:
+        counts = {SYNC_CREATE: 0, SYNC_UPDATE: 0, SYNC_ARCHIVE: 0, SYNC_UNCHANGED: 0, 'failed': 0}
+        for item in self.actions:
+            counts[item.action] += 1
+            if not item.success:
+                counts['failed'] += 1
+        return counts
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'parent_issue_identifier': self.parent_issue_identifier,
+            'dry_run': self.dry_run,
+            'summary': self.summary(),
+            'actions': [item.to_dict() for item in self.actions if item.action != SYNC_UNCHANGED]
+        }
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché de Parseo de Historias de Usuario
+Guarda por proceso el ParsedStory y los criterios extraídos de cada HU (clave: hash del texto)
+para que la vista previa y la generación no vuelvan a parsear el mismo texto
+"""
+
+import sys
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Límites por defecto de la caché
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024  # 32 MB
+
+
+def text_key(text: str) -> str:
+    """Clave de caché: SHA-256 del texto de la HU"""
+    return hashlib.sha256(text.encode('utf-8', errors='replace')).hexdigest()
+
+
+def estimate_size(obj: Any) -> int:
+    """Estimación aproximada (en bytes) de la memoria ocupada por un resultado de parseo"""
+    if obj is None:
+        return 0
+    if isinstance(obj, (str, bytes, int, float, bool)):
+        return sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(estimate_size(item) for item in obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    if is_dataclass(obj):
+        return sys.getsizeof(obj) + sum(estimate_size(getattr(obj, f.name)) for f in fields(obj))
+    return sys.getsizeof(obj)
+
+
+@dataclass
+class ParseCacheEntry:
+    """Resultado de parseo de una HU"""
+    parsed_story: Any = None
+    criteria: Optional[Tuple[str, ...]] = None
+    size_bytes: int = 0
+
+    def recompute_size(self):
+        self.size_bytes = estimate_size(self.parsed_story) + estimate_size(self.criteria)
+
+
+class ParseCache:
+    """
+    Caché LRU de resultados de parseo, acotada por número de entradas y por memoria
+
+    Es segura entre hilos (Flask atiende peticiones en paralelo). El ParsedStory
+    devuelto se comparte entre peticiones y debe tratarse como de solo lectura;
+    los criterios se devuelven siempre como una lista nueva.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, ParseCacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._stats = {
+            'story_hits': 0,
+            'story_misses': 0,
+            'criteria_hits': 0,
+            'criteria_misses': 0,
+            'evictions': 0,
+        }
+
+    # ==================== API PRINCIPAL ====================
+
+    def get_or_parse(self, text: str, parse_fn: Callable[[str], Any]) -> Any:
+        """Devuelve el ParsedStory de la HU, parseando solo si no está en caché"""
+        key = text_key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.parsed_story is not None:
+                self._entries.move_to_end(key)
+                self._stats['story_hits'] += 1
+                return entry.parsed_story
+            self._stats['story_misses'] += 1
+
+        # El parseo se hace fuera del lock para no bloquear otras peticiones
+        parsed_story = parse_fn(text)
+        if parsed_story is not None:
+            self._store(key, parsed_story=parsed_story)
+        return parsed_story
+
+    def get_or_extract(self, text: str, extract_fn: Callable[[str], List[str]]) -> List[str]:
+        """Devuelve los criterios extraídos de la HU, extrayendo solo si no están en caché"""
+        key = text_key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.criteria is not None:
+                self._entries.move_to_end(key)
+                self._stats['criteria_hits'] += 1
+                return list(entry.criteria)
+            self._stats['criteria_misses'] += 1
+
+        criteria = extract_fn(text)
+        self._store(key, criteria=tuple(criteria))
+        return list(criteria)
+
+    def clear(self):
+        """Vacía la caché (las métricas se conservan)"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas de uso: aciertos, fallos, tasa de acierto, expulsiones y memoria"""
+        with self._lock:
+            stats = dict(self._stats)
+            entries = len(self._entries)
+            total_bytes = self._total_bytes
+
+        hits = stats['story_hits'] + stats['criteria_hits']
+        lookups = hits + stats['story_misses'] + stats['criteria_misses']
+        stats.update({
+            'hits': hits,
+            'misses': lookups - hits,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'entries': entries,
+            'bytes': total_bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+        })
+        return stats
+
+    # ==================== INTERNOS ====================
+
+    def _store(self, key: str, parsed_story: Any = None, criteria: Optional[Tuple[str, ...]] = None):
+        """Inserta o completa una entrada y aplica la política de expulsión LRU"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = ParseCacheEntry()
+                self._entries[key] = entry
+            else:
+                self._total_bytes -= entry.size_bytes
+                self._entries.move_to_end(key)
+
+            if parsed_story is not None:
+                entry.parsed_story = parsed_story
+            if criteria is not None:
+                entry.criteria = criteria
+            entry.recompute_size()
+            self._total_bytes += entry.size_bytes
+
+            # Una HU más grande que toda la caché no se guarda
+            if entry.size_bytes > self.max_bytes:
+                del self._entries[key]
+                self._total_bytes -= entry.size_bytes
+                self._stats['evictions'] += 1
+                return
+
+            while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.size_bytes
+                self._stats['evictions'] += 1
+
+
+_shared_cache: Optional[ParseCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> ParseCache:
+    """Caché de parseo compartida por todo el proceso"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = ParseCache()
+    return _shared_cache
@@ -7,8 +7,11 @@ Inspirado en las mejores prácticas de QA profesional
 
 import sys
 import io
+import os
 import re
-from typing import List, Dict, Tuple
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional, Sequence
 from dataclasses import dataclass
 from enum import Enum
 
@@ -42,6 +45,19 @@ except ImportError:
         parse_user_story_adaptive = None
         StoryStructureType = None
 
+# Importar caché de parseo compartida por el proceso
+try:
+    from .parse_cache import get_parse_cache
+except ImportError:
+    try:
+        from src.parse_cache import get_parse_cache
+    except ImportError:
+        try:
+            from parse_cache import get_parse_cache
+        except ImportError:
+            # Sin caché cada llamada vuelve a parsear el texto
+            get_parse_cache = None
+
 
 class TestPriority(Enum):
     """Prioridad de los casos de prueba"""
@@ -109,6 +125,58 @@ class TestCase:
 {self.expected_result}"""
 
 
+# Descomposición paralela de criterios: por debajo del umbral el coste de enviar los
+# criterios a otros procesos supera lo que se ahorra (cada criterio tarda < 1 ms)
+PARALLEL_CRITERIA_THRESHOLD = int(os.environ.get('QA_PARALLEL_CRITERIA_THRESHOLD', '400'))
+PARALLEL_MAX_WORKERS = int(os.environ.get('QA_PARALLEL_MAX_WORKERS', '0')) or min(4, os.cpu_count() or 1)
+
+_decompose_pool: Optional[ProcessPoolExecutor] = None
+_decompose_pool_lock = threading.Lock()
+
+
+def _get_decompose_pool() -> ProcessPoolExecutor:
+    """Pool de procesos compartido (se crea una sola vez y se reutiliza entre peticiones)"""
+    global _decompose_pool
+    if _decompose_pool is None:
+        with _decompose_pool_lock:
+            if _decompose_pool is None:
+                _decompose_pool = ProcessPoolExecutor(max_workers=PARALLEL_MAX_WORKERS)
+    return _decompose_pool
+
+
+def _reset_decompose_pool(pending: Sequence[Future] = ()):
+    """
+    Descarta el pool (por ejemplo si un proceso hijo murió)
+    Los futures pendientes se cancelan a mano: shutdown(cancel_futures=True) requiere Python 3.9.
+    """
+    global _decompose_pool
+    with _decompose_pool_lock:
+        for future in pending:
+            future.cancel()
+        if _decompose_pool is not None:
+            _decompose_pool.shutdown(wait=False)
+            _decompose_pool = None
+
+
+def _decompose_criteria_chunk(criteria: List[str], project_name: str, user_story_text: str,
+                              parsed_story=None) -> List[List["TestCase"]]:
+    """
+    Descompone un bloque de criterios en un proceso del pool
+    Los IDs se asignan después en el proceso principal, por eso todos empiezan en 1.
+    """
+    generator = ProfessionalQAGenerator()
+    return [
+        generator._decompose_criterion_into_test_cases(
+            criterion=criterion,
+            start_number=1,
+            project_name=project_name,
+            user_story_text=user_story_text,
+            parsed_story=parsed_story
+        )
+        for criterion in criteria
+    ]
+
+
 class ProfessionalQAGenerator:
     """
     Generador profesional de casos de prueba
@@ -162,7 +230,26 @@ class ProfessionalQAGenerator:
         print(f"[INFO] Texto limpiado: {len(text)} -> {len(cleaned)} caracteres", flush=True)
         return cleaned
     
+    def _parse_story(self, text: str):
+        """
+        Parsea la HU con el parser adaptativo pasando por la caché de parseo
+        El ParsedStory devuelto puede estar compartido: no debe modificarse.
+        """
+        if get_parse_cache is None:
+            return parse_user_story_adaptive(text)
+        return get_parse_cache().get_or_parse(text, parse_user_story_adaptive)
+    
     def extract_criteria_from_text(self, text: str) -> List[str]:
+        """
+        Extrae criterios de aceptación del texto (con caché por hash del texto)
+        Una HU ya procesada en la vista previa no se vuelve a parsear al generar.
+        """
+        if get_parse_cache is None:
+            return self._extract_criteria_uncached(text)
+        
+        return get_parse_cache().get_or_extract(text, self._extract_criteria_uncached)
+    
+    def _extract_criteria_uncached(self, text: str) -> List[str]:
         """
         Extrae criterios de aceptación del texto de forma ULTRA ROBUSTA
         Funciona con CUALQUIER formato: FIN, EMS, OPS, AIA, etc.
@@ -179,13 +266,14 @@ class ProfessionalQAGenerator:
         if parse_user_story_adaptive is not None:
             try:
                 print("[INFO] Usando parser adaptativo para detectar estructura...", flush=True)
-                parsed_story = parse_user_story_adaptive(text)
+                parsed_story = self._parse_story(text)
                 
                 print(f"[INFO] Estructura detectada: {parsed_story.structure_type.value}", flush=True)
                 
                 # Si es estructura narrativa o mixta, usar los criterios del parser adaptativo
                 if parsed_story.structure_type in [StoryStructureType.NARRATIVE, StoryStructureType.MIXED]:
-                    criteria = parsed_story.acceptance_criteria
+                    # Copia: el ParsedStory puede estar compartido por la caché
+                    criteria = list(parsed_story.acceptance_criteria)
                     if criteria:
                         print(f"[OK] {len(criteria)} criterios extraídos con parser adaptativo (narrativo/mixto)", flush=True)
                         # Complementar con análisis técnico si hay pocos criterios
@@ -680,7 +768,7 @@ class ProfessionalQAGenerator:
         
         return any(text_lower.startswith(start) for start in valid_starts)
     
-    def generate_test_cases(self, user_story_text: str, project_name: str = "") -> List[TestCase]:
+    def generate_test_cases(self, user_story_text: str, project_name: str = "", parallel: Optional[bool] = None) -> List[TestCase]:
         """
         Genera casos de prueba profesionales a partir de una historia de usuario
         DESCOMPONE cada criterio en múltiples casos específicos (felices, errores, usabilidad, etc.)
@@ -689,6 +777,8 @@ class ProfessionalQAGenerator:
         Args:
             user_story_text: Texto completo de la HU
             project_name: Nombre del proyecto (opcional)
+            parallel: Forzar (True) o desactivar (False) la descomposición en paralelo;
+                      por defecto se activa con PARALLEL_CRITERIA_THRESHOLD criterios o más
             
         Returns:
             Lista de casos de prueba generados
@@ -701,7 +791,7 @@ class ProfessionalQAGenerator:
         parsed_story = None
         if parse_user_story_adaptive is not None:
             try:
-                parsed_story = parse_user_story_adaptive(user_story_text)
+                parsed_story = self._parse_story(user_story_text)
                 print(f"[INFO] Contexto extraído - Tipo: {parsed_story.structure_type.value}")
                 print(f"[INFO] - Título: {parsed_story.title[:50]}...")
                 print(f"[INFO] - Contexto: {parsed_story.context[:50] if parsed_story.context else 'N/A'}...")
@@ -725,20 +815,32 @@ class ProfessionalQAGenerator:
             return []
         
         # Generar casos de prueba DESCOMPONIENDO cada criterio
+        if parallel is None:
+            parallel = len(criteria) >= PARALLEL_CRITERIA_THRESHOLD and PARALLEL_MAX_WORKERS > 1
+        
+        decomposed = None
+        if parallel:
+            decomposed = self._decompose_criteria_parallel(criteria, project_name, user_story_text, parsed_story)
+        if decomposed is None:
+            decomposed = [
+                self._decompose_criterion_into_test_cases(
+                    criterion=criterion,
+                    start_number=1,
+                    project_name=project_name,
+                    user_story_text=user_story_text,
+                    parsed_story=parsed_story  # Pasar contexto completo
+                )
+                for criterion in criteria
+            ]
+        
+        # Asignar IDs en orden de criterio (mismo resultado en modo secuencial y paralelo)
         test_cases = []
         test_counter = 1
-        
-        for criterion in criteria:
-            # DESCOMPONER cada criterio en múltiples casos específicos
-            decomposed_cases = self._decompose_criterion_into_test_cases(
-                criterion=criterion,
-                start_number=test_counter,
-                project_name=project_name,
-                user_story_text=user_story_text,
-                parsed_story=parsed_story  # Pasar contexto completo
-            )
-            test_cases.extend(decomposed_cases)
-            test_counter += len(decomposed_cases)
+        for decomposed_cases in decomposed:
+            for test_case in decomposed_cases:
+                test_case.id = f"TC-{test_counter:03d}"
+                test_cases.append(test_case)
+                test_counter += 1
         
         # Agregar casos adicionales globales (estados vacíos, errores generales, etc.)
         global_cases = self._generate_global_test_cases(
@@ -754,6 +856,36 @@ class ProfessionalQAGenerator:
         
         return test_cases
     
+    def _decompose_criteria_parallel(self, criteria: List[str], project_name: str, user_story_text: str,
+                                     parsed_story=None) -> Optional[List[List[TestCase]]]:
+        """
+        Reparte los criterios en bloques contiguos entre los procesos del pool
+        
+        Returns:
+            Casos por criterio en el orden original, o None si el pool falla
+            (en ese caso se descompone de forma secuencial)
+        """
+        workers = PARALLEL_MAX_WORKERS
+        # Varios bloques por proceso para equilibrar criterios de distinta longitud
+        chunk_size = max(1, -(-len(criteria) // (workers * 4)))
+        chunks = [criteria[i:i + chunk_size] for i in range(0, len(criteria), chunk_size)]
+        print(f"[INFO] Descomponiendo {len(criteria)} criterios en paralelo "
+              f"({workers} procesos, {len(chunks)} bloques)", flush=True)
+        
+        futures = []
+        try:
+            pool = _get_decompose_pool()
+            for chunk in chunks:
+                futures.append(pool.submit(_decompose_criteria_chunk, chunk, project_name, user_story_text, parsed_story))
+            decomposed = []
+            for future in futures:
+                decomposed.extend(future.result())
+            return decomposed
+        except Exception as e:
+            print(f"[WARN] Error en descomposición paralela, usando modo secuencial: {e}", flush=True)
+            _reset_decompose_pool(futures)
+            return None
+    
     def _decompose_criterion_into_test_cases(self, criterion: str, start_number: int, project_name: str, user_story_text: str, parsed_story=None) -> List[TestCase]:
         """
         Genera casos de prueba ÚNICOS y NO redundantes a partir de un criterio de aceptación.
@@ -9,6 +9,11 @@ import re
 from typing import List, Dict, Any
 from dataclasses import dataclass
 
+try:
+    from .batch_story_analyzer import get_batch_analyzer
+except ImportError:
+    from batch_story_analyzer import get_batch_analyzer
+
 @dataclass
 class QuickTestCase:
     """Caso de prueba con estructura mejorada"""
@@ -51,25 +56,14 @@ class QuickTestGenerator:
         """Analiza la historia de usuario para extraer información clave"""
         full_text = f"{user_story.title} {user_story.description}".lower()
         
+        analyzer = get_batch_analyzer()
+        matrix = analyzer.term_matrix([full_text])
+        
         # Detectar dominio
-        domain = 'general'
-        if any(word in full_text for word in ['login', 'sesión', 'autenticación', 'credenciales']):
-            domain = 'autenticacion'
-        elif any(word in full_text for word in ['factura', 'pago', 'cliente', 'producto']):
-            domain = 'facturacion'
-        elif any(word in full_text for word in ['inventario', 'stock', 'almacén', 'producto']):
-            domain = 'inventario'
+        domain = analyzer.classify([full_text], 'quick', matrix)[0]
         
         # Extraer acción principal
-        main_action = 'validar'
-        if 'crear' in full_text or 'generar' in full_text:
-            main_action = 'crear'
-        elif 'editar' in full_text or 'modificar' in full_text:
-            main_action = 'editar'
-        elif 'eliminar' in full_text or 'borrar' in full_text:
-            main_action = 'eliminar'
-        elif 'buscar' in full_text or 'consultar' in full_text:
-            main_action = 'consultar'
+        main_action = analyzer.classify([full_text], 'quick_action', matrix)[0]
         
         return {
             'domain': domain,
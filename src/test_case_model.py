@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modelo Compacto de Casos de Prueba
+Representación única de un caso de prueba (con __slots__) que se serializa directamente
+al almacén de proyectos, a la respuesta JSON y a los exportadores
+"""
+
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    from test_case_automation import TestType, Priority
+except ImportError:
+    # Sin el modelo legado los tipos y prioridades se guardan como texto
+    TestType = None
+    Priority = None
+
+
+# Tags por defecto de los casos generados automáticamente
+DEFAULT_TAGS = ("@qa", "@automated")
+
+# Valores del generador profesional -> miembros del enum legado
+PROFESSIONAL_TYPE_MAP = {
+    "Funcional": "FUNCTIONAL",
+    "Negativo": "NEGATIVE",
+    "Integración": "INTEGRATION",
+    "Regresión": "FUNCTIONAL",  # Mapear regresión a funcional
+    "UI": "FUNCTIONAL"  # Mapear UI a funcional
+}
+PROFESSIONAL_PRIORITY_MAP = {
+    "Alta": "HIGH",
+    "Media": "MEDIUM",
+    "Baja": "LOW"
+}
+
+# Valores en texto de los miembros legados (si test_case_automation no está disponible)
+LEGACY_VALUES = {
+    "FUNCTIONAL": "Funcional",
+    "NEGATIVE": "Negativo",
+    "INTEGRATION": "Integración",
+    "HIGH": "Alta",
+    "MEDIUM": "Media",
+    "LOW": "Baja"
+}
+
+
+def _legacy_member(enum_cls, name: str):
+    """Miembro del enum legado por nombre (FUNCTIONAL, HIGH, ...) o su texto si no existe"""
+    if enum_cls is None:
+        return sys.intern(LEGACY_VALUES[name])
+    return getattr(enum_cls, name)
+
+
+def _coerce_enum(enum_cls, value):
+    """Convierte un valor guardado (texto o enum) al miembro del enum legado"""
+    if enum_cls is None:
+        return sys.intern(getattr(value, 'value', value))
+    if isinstance(value, enum_cls):
+        return value
+    return enum_cls(getattr(value, 'value', value))
+
+
+def _enum_value(value) -> str:
+    """Valor serializable de un enum (o el propio texto)"""
+    return getattr(value, 'value', value)
+
+
+def build_structured_description(criterion: str, preconditions: Iterable[str], steps: Iterable[str],
+                                 expected_result: str) -> str:
+    """Descripción estructurada del caso (cada sección separada por doble salto de línea)"""
+    preconditions_text = '\n'.join([f"- {p}" for p in preconditions])
+    steps_text = '\n'.join(steps)
+
+    return f"""**Objetivo:** Verificar funcionalidad del sistema
+
+**Criterio:** {criterion}
+
+**Preconditions:**
+{preconditions_text}
+
+**Pasos:**
+{steps_text}
+
+**Resultado Esperado:**
+{expected_result}"""
+
+
+class CompactTestCase:
+    """
+    Caso de prueba compacto
+
+    Usa __slots__ (sin __dict__ por instancia), guarda tipo y prioridad como miembros
+    del enum (únicos en el proceso) y comparte las tuplas de precondiciones, pasos y
+    tags idénticas dentro de un mismo lote. Tiene los mismos atributos que el
+    TestCase legado, así que QAValidator y TestCaseExporter lo aceptan tal cual.
+    """
+
+    __slots__ = ('id', 'title', 'description', 'preconditions', 'steps', 'expected_result',
+                 'test_type', 'priority', 'user_story', 'tags')
+
+    def __init__(self, id: str, title: str, description: str, preconditions, steps,
+                 expected_result: str, test_type, priority, user_story: str = "", tags=DEFAULT_TAGS):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.preconditions = preconditions
+        self.steps = steps
+        self.expected_result = expected_result
+        self.test_type = test_type
+        self.priority = priority
+        self.user_story = user_story
+        self.tags = tags
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Formato serializable usado por el almacén, la API y los exportadores"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'preconditions': list(self.preconditions),
+            'steps': list(self.steps),
+            'expected_result': self.expected_result,
+            'test_type': _enum_value(self.test_type),
+            'priority': _enum_value(self.priority),
+            'user_story': self.user_story,
+            'tags': list(self.tags)
+        }
+
+    def __repr__(self) -> str:
+        return f"CompactTestCase(id={self.id!r}, title={self.title!r})"
+
+
+class _SequencePool:
+    """Comparte una única tupla por cada secuencia de textos repetida dentro de un lote"""
+
+    def __init__(self):
+        self._pool: Dict[tuple, tuple] = {DEFAULT_TAGS: DEFAULT_TAGS}
+
+    def share(self, items: Optional[Iterable[str]]) -> tuple:
+        key = tuple(items or ())
+        return self._pool.setdefault(key, key)
+
+
+def compact_from_professional(professional_cases: Iterable[Any], user_story: str) -> List[CompactTestCase]:
+    """
+    Convierte los casos del generador profesional al modelo compacto
+
+    Args:
+        professional_cases: Casos de ProfessionalQAGenerator.generate_test_cases
+        user_story: Nombre del proyecto / HU al que pertenecen
+
+    Returns:
+        Lista de CompactTestCase
+    """
+    pool = _SequencePool()
+    user_story = sys.intern(user_story or "")
+    default_type = _legacy_member(TestType, 'FUNCTIONAL')
+    default_priority = _legacy_member(Priority, 'HIGH')
+
+    compact_cases = []
+    for prof_case in professional_cases:
+        type_name = PROFESSIONAL_TYPE_MAP.get(_enum_value(prof_case.test_type))
+        priority_name = PROFESSIONAL_PRIORITY_MAP.get(_enum_value(prof_case.priority))
+        preconditions = pool.share(prof_case.preconditions)
+        steps = pool.share(prof_case.steps)
+
+        compact_cases.append(CompactTestCase(
+            id=prof_case.id,
+            title=prof_case.title,
+            description=build_structured_description(prof_case.criterion, preconditions, steps,
+                                                     prof_case.expected_result),
+            preconditions=preconditions,
+            steps=steps,
+            expected_result=prof_case.expected_result,
+            test_type=_legacy_member(TestType, type_name) if type_name else default_type,
+            priority=_legacy_member(Priority, priority_name) if priority_name else default_priority,
+            user_story=user_story,
+            tags=DEFAULT_TAGS
+        ))
+    return compact_cases
+
+
+def iter_compact_from_dicts(test_case_dicts: Iterable[Dict[str, Any]]) -> Iterator[CompactTestCase]:
+    """
+    Reconstruye casos compactos desde el almacén de proyectos (tipo y prioridad
+    pueden venir como texto o como enum), uno a uno
+
+    Todo el recorrido comparte un mismo pool de secuencias, así que se puede usar en
+    streaming sin perder las tuplas compartidas ni construir la lista completa.
+    """
+    pool = _SequencePool()
+    for tc_data in test_case_dicts:
+        yield CompactTestCase(
+            id=tc_data['id'],
+            title=tc_data['title'],
+            description=tc_data['description'],
+            preconditions=pool.share(tc_data['preconditions']),
+            steps=pool.share(tc_data['steps']),
+            expected_result=tc_data['expected_result'],
+            test_type=_coerce_enum(TestType, tc_data['test_type']),
+            priority=_coerce_enum(Priority, tc_data['priority']),
+            user_story=sys.intern(tc_data.get('user_story') or ""),
+            tags=pool.share(tc_data.get('tags'))
+        )
+
+
+def compact_from_dicts(test_case_dicts: Iterable[Dict[str, Any]]) -> List[CompactTestCase]:
+    """Como iter_compact_from_dicts, pero devuelve la lista completa"""
+    return list(iter_compact_from_dicts(test_case_dicts))
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tareas en Segundo Plano con Canal de Progreso
+Ejecuta subidas largas fuera del worker web y publica eventos que se consumen por SSE
+"""
+
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Estados de una tarea
+TASK_RUNNING = "running"
+TASK_DONE = "done"
+TASK_ERROR = "error"
+
+# Tiempo que se conservan las tareas terminadas (para reconexiones del navegador)
+FINISHED_TASK_TTL = 15 * 60
+
+# Intervalo de heartbeat SSE (evita que proxies corten la conexión)
+HEARTBEAT_SECONDS = 15
+
+
+@dataclass
+class TaskEvent:
+    """Evento publicado por una tarea"""
+    id: int
+    event: str
+    data: Dict[str, Any]
+
+    def to_sse(self) -> str:
+        """Formato text/event-stream"""
+        payload = json.dumps(self.data, ensure_ascii=False, default=str)
+        return f"id: {self.id}\nevent: {self.event}\ndata: {payload}\n\n"
+
+
+@dataclass
+class BackgroundTask:
+    """Tarea en segundo plano con su historial de eventos"""
+    id: str
+    kind: str
+    owner_id: str
+    group: str = ""  # Tareas del mismo grupo y dueño no corren a la vez (por defecto, el tipo)
+    status: str = TASK_RUNNING
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    events: List[TaskEvent] = field(default_factory=list)
+    condition: threading.Condition = field(default_factory=threading.Condition, repr=False)
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        """Agrega un evento y despierta a los clientes SSE"""
+        with self.condition:
+            self.events.append(TaskEvent(id=len(self.events) + 1, event=event, data=data))
+            self.condition.notify_all()
+
+    def finish(self, status: str, event: str, data: Dict[str, Any]):
+        with self.condition:
+            self.status = status
+            self.finished_at = time.time()
+            self.events.append(TaskEvent(id=len(self.events) + 1, event=event, data=data))
+            self.condition.notify_all()
+
+    def stream(self, last_event_id: int = 0) -> Iterator[str]:
+        """
+        Generador SSE: reenvía los eventos posteriores a last_event_id y espera los nuevos
+        hasta que la tarea termina
+        """
+        position = max(0, last_event_id)
+        # Reconexión del navegador: pedir reintento en 2 s
+        yield "retry: 2000\n\n"
+        with self.condition:
+            # Reconexión después del final: se reenvía el último evento para que el
+            # cliente cierre la conexión en lugar de reconectar indefinidamente
+            if self.status != TASK_RUNNING and self.events and position >= len(self.events):
+                position = len(self.events) - 1
+        while True:
+            with self.condition:
+                if position >= len(self.events) and self.status == TASK_RUNNING:
+                    self.condition.wait(timeout=HEARTBEAT_SECONDS)
+                pending = self.events[position:]
+                finished = self.status != TASK_RUNNING
+            if pending:
+                for event in pending:
+                    yield event.to_sse()
+                position += len(pending)
+            elif finished:
+                return
+            else:
+                yield ": heartbeat\n\n"
+
+
+class TaskRegistry:
+    """Registro de tareas del proceso"""
+
+    def __init__(self):
+        self._tasks: Dict[str, BackgroundTask] = {}
+        self._lock = threading.Lock()
+
+    def start_unique(self, kind: str, owner_id: str, target: Callable[[BackgroundTask], Dict[str, Any]],
+                     group: Optional[str] = None) -> Tuple[BackgroundTask, bool]:
+        """
+        Lanza target(task) en un hilo si no hay otra tarea del mismo grupo en curso para el dueño
+
+        Lo que devuelve target se publica como evento 'done'; una excepción, como evento
+        'error'. La comprobación y el registro se hacen bajo el mismo lock, así dos peticiones
+        simultáneas no pueden lanzar las dos. Devuelve (tarea, True) si se lanzó o
+        (tarea en curso, False) si ya había una.
+        """
+        self._prune()
+        task, created = self._register_unique(kind, owner_id, group or kind)
+        if created:
+            self._launch(task, target)
+        return task, created
+
+    @contextmanager
+    def hold(self, kind: str, owner_id: str, group: Optional[str] = None) -> Iterator[Tuple[BackgroundTask, bool]]:
+        """
+        Registra una operación síncrona como tarea en curso mientras dura el bloque
+
+        Produce (tarea, True) si se obtuvo el turno o (tarea en curso, False) si otra tarea
+        del grupo ya corre para el dueño; en ese caso no se registra nada.
+        """
+        self._prune()
+        task, created = self._register_unique(kind, owner_id, group or kind)
+        if not created:
+            yield task, False
+            return
+        try:
+            yield task, True
+        except BaseException as e:
+            task.finish(TASK_ERROR, 'error', {'error': str(e)})
+            raise
+        else:
+            task.finish(TASK_DONE, 'done', {})
+
+    def _register_unique(self, kind: str, owner_id: str, group: str) -> Tuple[BackgroundTask, bool]:
+        with self._lock:
+            for task in self._tasks.values():
+                if task.group == group and task.owner_id == owner_id and task.status == TASK_RUNNING:
+                    return task, False
+            task = BackgroundTask(id=uuid.uuid4().hex, kind=kind, owner_id=owner_id, group=group)
+            self._tasks[task.id] = task
+            return task, True
+
+    def _launch(self, task: BackgroundTask, target: Callable[[BackgroundTask], Dict[str, Any]]):
+        kind = task.kind
+
+        def run():
+            try:
+                result = target(task)
+                task.finish(TASK_DONE, 'done', result or {})
+            except Exception as e:
+                print(f"[ERROR] Tarea {kind} {task.id} falló: {e}", flush=True)
+                task.finish(TASK_ERROR, 'error', {'error': str(e)})
+
+        threading.Thread(target=run, name=f"{kind}-{task.id[:8]}", daemon=True).start()
+
+    def get(self, task_id: str) -> Optional[BackgroundTask]:
+        with self._lock:
+            return self._tasks.get(task_id)
+
+    def _prune(self):
+        now = time.time()
+        with self._lock:
+            for task_id in [task_id for task_id, task in self._tasks.items()
+                            if task.finished_at and now - task.finished_at > FINISHED_TASK_TTL]:
+                del self._tasks[task_id]
+
+
+# Registro compartido por la aplicación
+task_registry = TaskRegistry()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generador de Corpus de Historias de Usuario
+Produce HUs sintéticas en formato tradicional, narrativo (EMS/Figma), mixto y Gherkin
+para medir el rendimiento y la concordancia de los parsers
+"""
+
+import os
+import random
+from typing import List, Optional
+from dataclasses import dataclass
+
+# Directorio con las HUs de ejemplo del repositorio
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+# Formatos de HU soportados por el generador
+FORMATS = ['traditional', 'narrative', 'mixed', 'gherkin']
+
+# Tamaños por defecto del corpus (en bytes): 1 KB, 10 KB, 100 KB y 1 MB
+DEFAULT_SIZES = [1024, 10 * 1024, 100 * 1024, 1024 * 1024]
+
+
+@dataclass
+class CorpusEntry:
+    """Una HU del corpus con su formato y tamaño objetivo"""
+    name: str
+    format: str
+    text: str
+    target_size: int = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.text.encode('utf-8'))
+
+
+# Vocabulario usado para construir frases realistas
+_ENTITIES = [
+    'la frontera', 'el contrato', 'la factura', 'el cliente', 'la sede', 'la métrica',
+    'el municipio', 'la planilla', 'el reporte', 'el usuario', 'la tarifa', 'el consumo'
+]
+_ACTIONS = [
+    'guarda', 'valida', 'toma', 'permite', 'muestra', 'calcula', 'sincroniza', 'envía'
+]
+_OBJECTS = [
+    'el NT padre desde contract relationships', 'el valor de la tarifa vigente',
+    'el listado de métricas seleccionadas', 'el estado de la sincronización con Odoo',
+    'el mensaje de error enviado por back', 'el resumen de la configuración',
+    'los datos del periodo seleccionado', 'la información de la sede en contract rates'
+]
+_CONDITIONS = [
+    'Cuando la frontera es embebida', 'Para fronteras no embebidas', 'Si el usuario no tiene data subida',
+    'Cuando back responde con FAIL', 'Si el periodo seleccionado es OTRO', 'Cuando el contrato está vigente'
+]
+_UI = ['botón', 'modal', 'campo', 'tabla', 'pop-up', 'calendario', 'loader']
+_LABELS = ['Empezar', 'Crear Planilla', 'Agregar Métrica', 'Descargar Planilla', 'Guardar cambios']
+
+
+def _criterion(rng: random.Random) -> str:
+    """Construye un criterio de aceptación en prosa"""
+    return (f"{rng.choice(_CONDITIONS)}, {rng.choice(_ENTITIES)} "
+            f"{rng.choice(_ACTIONS)} {rng.choice(_OBJECTS)}.")
+
+
+def _narrative_sentence(rng: random.Random, index: int) -> str:
+    """Construye una frase narrativa estilo EMS/Figma"""
+    ui = rng.choice(_UI)
+    label = rng.choice(_LABELS)
+    templates = [
+        f'Al darle "{label}", se debe mostrar el {ui} con {rng.choice(_OBJECTS)}.',
+        f'Si el usuario selecciona "{label}", el sistema debe abrir el {ui} correspondiente.',
+        f'({chr(ord("a") + index % 26)}) El {ui} debe permitir editar {rng.choice(_OBJECTS)}.',
+        f'Pantalla: configuración de {rng.choice(_ENTITIES)} con el {ui} habilitado.',
+        f'https://www.figma.com/design/3OBU940TcOpSqiv34PFZBp/Playground?node-id={4600 + index}-{45000 + index}',
+    ]
+    return rng.choice(templates)
+
+
+def _fill(header: str, body_factory, target_size: int) -> str:
+    """Agrega bloques de contenido hasta alcanzar el tamaño objetivo"""
+    parts = [header]
+    size = len(header.encode('utf-8'))
+    index = 0
+    while size < target_size:
+        block = body_factory(index)
+        parts.append(block)
+        size += len(block.encode('utf-8')) + 1
+        index += 1
+    return '\n'.join(parts)
+
+
+def generate_traditional_hu(target_size: int, seed: int = 0) -> str:
+    """HU con secciones Contexto / Descripción / Criterios de aceptación y bullets ✅"""
+    rng = random.Random(seed)
+    header = (
+        "BACK I Ajustar el insumo del campo de NT en CR cuando una frontera es embebida\n\n"
+        "Contexto\n"
+        "Cuando una frontera llega con tipología embebida, hoy el sistema guarda en contract rates "
+        "el NT del hijo y luego lo reemplaza por el del padre.\n\n"
+        "Descripción\n"
+        "Como sistema facturación, quiero que se guarde el NT padre en contract relationships, "
+        "para asegurar consistencia.\n\n"
+        "Criterios de aceptación"
+    )
+    return _fill(header, lambda i: f"✅ {_criterion(rng)}", target_size)
+
+
+def generate_narrative_hu(target_size: int, seed: int = 0) -> str:
+    """HU narrativa estilo EMS con flujos, estados, referencias Figma y condiciones (a), (b)"""
+    rng = random.Random(seed)
+    header = (
+        'Dentro de "Análisis", debemos de crear una nueva sección que se llame "Intensidad energética".\n\n'
+        'Si no tengo data subida, paso por el "onboarding":\n'
+        'https://www.figma.com/design/3OBU940TcOpSqiv34PFZBp/Playground?node-id=4622-45095\n'
+    )
+    return _fill(header, lambda i: _narrative_sentence(rng, i), target_size)
+
+
+def generate_mixed_hu(target_size: int, seed: int = 0) -> str:
+    """HU que combina secciones tradicionales con narrativa de UI"""
+    rng = random.Random(seed)
+    header = (
+        "FRONT I Configuración de métricas por sede\n\n"
+        "Contexto\n"
+        "El usuario configura las métricas de su negocio desde la pantalla de Análisis.\n\n"
+        "Descripción\n"
+        "Como usuario, quiero seleccionar sedes y métricas, para generar la planilla de carga.\n\n"
+        "Criterios de aceptación"
+    )
+
+    def block(i: int) -> str:
+        if i % 2:
+            return _narrative_sentence(rng, i)
+        return f"- {_criterion(rng)}"
+
+    return _fill(header, block, target_size)
+
+
+def generate_gherkin_hu(target_size: int, seed: int = 0) -> str:
+    """HU técnica con criterios Given/When/Then"""
+    rng = random.Random(seed)
+    header = (
+        "TEC I Variables dinámicas del certificado\n\n"
+        "Descripción\n"
+        "Como backend de Odoo, quiero enviar las variables dinámicas en JSON.\n\n"
+        "Criterios de aceptación"
+    )
+
+    def block(i: int) -> str:
+        return (f"Given {rng.choice(_ENTITIES)} existe en el sistema "
+                f"When {rng.choice(_CONDITIONS).lower()} "
+                f"Then el backend {rng.choice(_ACTIONS)} {rng.choice(_OBJECTS)}.")
+
+    return _fill(header, block, target_size)
+
+
+_GENERATORS = {
+    'traditional': generate_traditional_hu,
+    'narrative': generate_narrative_hu,
+    'mixed': generate_mixed_hu,
+    'gherkin': generate_gherkin_hu,
+}
+
+
+def load_data_samples() -> List[CorpusEntry]:
+    """Carga las HUs de ejemplo que viven en data/"""
+    entries = []
+    data_dir = os.path.abspath(DATA_DIR)
+    if not os.path.isdir(data_dir):
+        return entries
+
+    for filename in sorted(os.listdir(data_dir)):
+        if not filename.endswith('.txt') or filename == 'requirements.txt':
+            continue
+        with open(os.path.join(data_dir, filename), 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        entries.append(CorpusEntry(
+            name=f"data/{filename}",
+            format='sample',
+            text=text,
+            target_size=len(text.encode('utf-8'))
+        ))
+    return entries
+
+
+def build_corpus(sizes: Optional[List[int]] = None, formats: Optional[List[str]] = None,
+                 include_samples: bool = True, seed: int = 42) -> List[CorpusEntry]:
+    """
+    Construye el corpus completo del benchmark
+
+    Args:
+        sizes: Tamaños objetivo en bytes (por defecto 1 KB a 1 MB)
+        formats: Formatos a generar (por defecto todos)
+        include_samples: Si se incluyen las HUs de data/
+        seed: Semilla para que el corpus sea reproducible entre commits
+
+    Returns:
+        Lista de CorpusEntry
+    """
+    sizes = sizes or DEFAULT_SIZES
+    formats = formats or FORMATS
+
+    corpus = load_data_samples() if include_samples else []
+    for fmt in formats:
+        generator = _GENERATORS[fmt]
+        for size in sizes:
+            corpus.append(CorpusEntry(
+                name=f"{fmt}_{size // 1024}kb",
+                format=fmt,
+                text=generator(size, seed=seed + size),
+                target_size=size
+            ))
+    return corpus
+
+
+if __name__ == "__main__":
+    for entry in build_corpus():
+        print(f"{entry.name:<28} {entry.format:<12} {entry.size_bytes / 1024:>9.1f} KB")
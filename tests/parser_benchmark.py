@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de Parsers de Historias de Usuario
+Mide throughput, latencia p50/p99 y memoria pico de cada parser sobre el corpus
+sintético y reporta qué tanto concuerdan sus criterios extraídos.
+
+Uso:
+    python tests/parser_benchmark.py                       # corpus completo (1 KB - 1 MB)
+    python tests/parser_benchmark.py --max-size 102400     # hasta 100 KB
+    python tests/parser_benchmark.py --compare anterior.json
+"""
+
+import os
+import sys
+import io
+import re
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from itertools import combinations
+from typing import List, Dict, Callable, Optional
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from hu_corpus import build_corpus, CorpusEntry, DEFAULT_SIZES, FORMATS
+from simple_criteria_parser import SimpleCriteriaParser
+from robust_parser import RobustParser
+from adaptive_parser import AdaptiveParser
+from intelligent_story_parser import IntelligentStoryParser
+# get_parse_cache del propio generador: es la instancia de caché que él usa
+from professional_qa_generator import ProfessionalQAGenerator, get_parse_cache
+
+# Umbral (relativo) a partir del cual una diferencia contra el reporte base es regresión
+REGRESSION_THRESHOLD = 0.10
+
+
+def _build_parsers() -> Dict[str, Callable[[str], List[str]]]:
+    """Adaptadores que devuelven solo la lista de criterios de cada parser"""
+    simple = SimpleCriteriaParser()
+    robust = RobustParser()
+    adaptive = AdaptiveParser()
+    intelligent = IntelligentStoryParser()
+    professional = ProfessionalQAGenerator()
+
+    return {
+        'SimpleCriteriaParser': lambda text: simple.parse(text).acceptance_criteria,
+        'RobustParser': lambda text: robust.parse(text).acceptance_criteria,
+        'AdaptiveParser': lambda text: adaptive.parse(text).acceptance_criteria,
+        'IntelligentStoryParser': lambda text: intelligent.parse_intelligent(text).acceptance_criteria,
+        'ProfessionalQAGenerator': lambda text: _extract_without_cache(professional, text),
+    }
+
+
+def _extract_without_cache(professional: ProfessionalQAGenerator, text: str) -> List[str]:
+    """
+    Extracción de criterios sin la caché de parseo del proceso
+
+    Con la caché, a partir de la segunda repetición solo se mediría un acierto; se vacía
+    en cada llamada para que latencia, throughput y memoria sigan siendo los del parseo.
+    """
+    if get_parse_cache is not None:
+        get_parse_cache().clear()
+    return professional._extract_criteria_uncached(text)
+
+
+def _normalize(criterion: str) -> str:
+    """Normaliza un criterio para poder compararlo entre parsers"""
+    text = criterion.lower()
+    text = re.sub(r'[✅✓☑•\-\*]', ' ', text)
+    text = ' '.join(text.split())
+    return text.strip(' .,;:')
+
+
+def _jaccard(a: List[str], b: List[str]) -> float:
+    """Índice de Jaccard entre dos listas de criterios normalizados"""
+    set_a = {_normalize(c) for c in a if c}
+    set_b = {_normalize(c) for c in b if c}
+    if not set_a and not set_b:
+        return 1.0
+    return len(set_a & set_b) / len(set_a | set_b)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Percentil por interpolación lineal (sin depender de numpy)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def _git_commit() -> str:
+    """Commit actual para poder comparar reportes entre commits"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+def _run_quiet(func: Callable[[str], List[str]], text: str) -> List[str]:
+    """Ejecuta el parser descartando sus logs de consola"""
+    with redirect_stdout(io.StringIO()):
+        return list(func(text) or [])
+
+
+def benchmark_entry(func: Callable[[str], List[str]], entry: CorpusEntry, repeat: int) -> Dict:
+    """Mide un parser sobre una HU del corpus"""
+    latencies = []
+    criteria: List[str] = []
+    error = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            criteria = _run_quiet(func, entry.text)
+        except Exception as e:
+            error = str(e)
+            break
+        latencies.append(time.perf_counter() - start)
+
+    # Memoria pico en una corrida separada (tracemalloc distorsiona los tiempos)
+    peak_bytes = 0
+    if error is None:
+        tracemalloc.start()
+        try:
+            _run_quiet(func, entry.text)
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        except Exception as e:
+            error = str(e)
+        finally:
+            tracemalloc.stop()
+
+    size_kb = entry.size_bytes / 1024
+    p50 = _percentile(latencies, 50)
+    return {
+        'size_bytes': entry.size_bytes,
+        'latencies_ms': [round(l * 1000, 3) for l in latencies],
+        'p50_ms': round(p50 * 1000, 3),
+        'p99_ms': round(_percentile(latencies, 99) * 1000, 3),
+        'throughput_kb_s': round(size_kb / p50, 2) if p50 > 0 else 0.0,
+        'peak_memory_kb': round(peak_bytes / 1024, 1),
+        'criteria_count': len(criteria),
+        'criteria': criteria,
+        'error': error,
+    }
+
+
+def _summarize(per_entry: Dict[str, Dict]) -> Dict:
+    """Agrega las métricas de un parser sobre todo el corpus"""
+    ok = [r for r in per_entry.values() if not r['error']]
+    all_latencies = [l for r in ok for l in r['latencies_ms']]
+    total_kb = sum(r['size_bytes'] for r in ok) / 1024
+    total_s = sum(r['p50_ms'] for r in ok) / 1000
+    return {
+        'entries': len(per_entry),
+        'errors': len(per_entry) - len(ok),
+        'throughput_kb_s': round(total_kb / total_s, 2) if total_s > 0 else 0.0,
+        'p50_ms': round(_percentile(all_latencies, 50), 3),
+        'p99_ms': round(_percentile(all_latencies, 99), 3),
+        'peak_memory_kb': max((r['peak_memory_kb'] for r in ok), default=0.0),
+        'total_criteria': sum(r['criteria_count'] for r in ok),
+    }
+
+
+def _agreement(results: Dict[str, Dict[str, Dict]], corpus: List[CorpusEntry]) -> Dict:
+    """Concordancia (Jaccard) por pares de parsers, por HU y promedio por formato"""
+    pairs = {}
+    for a, b in combinations(results.keys(), 2):
+        per_entry = {}
+        for entry in corpus:
+            ra, rb = results[a][entry.name], results[b][entry.name]
+            if ra['error'] or rb['error']:
+                continue
+            per_entry[entry.name] = round(_jaccard(ra['criteria'], rb['criteria']), 4)
+
+        by_format: Dict[str, List[float]] = {}
+        for entry in corpus:
+            if entry.name in per_entry:
+                by_format.setdefault(entry.format, []).append(per_entry[entry.name])
+
+        pairs[f"{a}|{b}"] = {
+            'mean': round(statistics.mean(per_entry.values()), 4) if per_entry else 0.0,
+            'by_format': {fmt: round(statistics.mean(v), 4) for fmt, v in by_format.items()},
+            'per_entry': per_entry,
+        }
+    return pairs
+
+
+def run_benchmark(corpus: List[CorpusEntry], repeat: int = 5,
+                  parsers: Optional[List[str]] = None) -> Dict:
+    """
+    Ejecuta el benchmark completo
+
+    Args:
+        corpus: HUs a procesar
+        repeat: Repeticiones por HU para calcular p50/p99
+        parsers: Subconjunto de parsers a medir (por defecto todos)
+
+    Returns:
+        Reporte serializable a JSON
+    """
+    available = _build_parsers()
+    selected = {name: func for name, func in available.items() if not parsers or name in parsers}
+
+    results: Dict[str, Dict[str, Dict]] = {}
+    for name, func in selected.items():
+        results[name] = {}
+        for entry in corpus:
+            print(f"[INFO] {name:<24} {entry.name:<28} ({entry.size_bytes / 1024:.1f} KB)", flush=True)
+            results[name][entry.name] = benchmark_entry(func, entry, repeat)
+
+    return {
+        'meta': {
+            'generated_at': datetime.now().isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'corpus': [
+            {'name': e.name, 'format': e.format, 'size_bytes': e.size_bytes} for e in corpus
+        ],
+        'summary': {name: _summarize(per_entry) for name, per_entry in results.items()},
+        'results': results,
+        'agreement': _agreement(results, corpus),
+    }
+
+
+def compare_reports(baseline: Dict, current: Dict, threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """Compara dos reportes y devuelve las regresiones detectadas"""
+    regressions = []
+    base_corpus = {e['name'] for e in baseline.get('corpus', [])}
+    if base_corpus != {e['name'] for e in current['corpus']}:
+        print("[WARN] El corpus del reporte base es distinto; la comparación puede no ser válida")
+
+    for name, summary in current['summary'].items():
+        base = baseline.get('summary', {}).get(name)
+        if not base:
+            continue
+        if base['throughput_kb_s'] and summary['throughput_kb_s'] < base['throughput_kb_s'] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {base['throughput_kb_s']} -> {summary['throughput_kb_s']} KB/s"
+            )
+        if base['p99_ms'] and summary['p99_ms'] > base['p99_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p99 {base['p99_ms']} -> {summary['p99_ms']} ms")
+        if base['peak_memory_kb'] and summary['peak_memory_kb'] > base['peak_memory_kb'] * (1 + threshold):
+            regressions.append(
+                f"{name}: memoria pico {base['peak_memory_kb']} -> {summary['peak_memory_kb']} KB"
+            )
+
+    for pair, data in current['agreement'].items():
+        base = baseline.get('agreement', {}).get(pair)
+        if base and data['mean'] < base['mean'] - threshold:
+            regressions.append(f"{pair}: concordancia {base['mean']} -> {data['mean']}")
+    return regressions
+
+
+def print_summary(report: Dict):
+    """Imprime un resumen legible del reporte"""
+    print("=" * 96)
+    print(f"{'Parser':<26}{'KB/s':>12}{'p50 ms':>12}{'p99 ms':>12}{'Mem KB':>12}{'Criterios':>11}{'Errores':>9}")
+    print("-" * 96)
+    for name, s in report['summary'].items():
+        print(f"{name:<26}{s['throughput_kb_s']:>12.1f}{s['p50_ms']:>12.2f}{s['p99_ms']:>12.2f}"
+              f"{s['peak_memory_kb']:>12.1f}{s['total_criteria']:>11}{s['errors']:>9}")
+    print("=" * 96)
+    print("Concordancia de criterios (Jaccard promedio):")
+    for pair, data in report['agreement'].items():
+        print(f"  {pair:<52} {data['mean']:.3f}")
+
+
+def main():
+    """Función principal"""
+    arg_parser = argparse.ArgumentParser(description="Benchmark de parsers de HU")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Repeticiones por HU")
+    arg_parser.add_argument('--max-size', type=int, default=max(DEFAULT_SIZES),
+                            help="Tamaño máximo (bytes) de las HUs sintéticas")
+    arg_parser.add_argument('--formats', nargs='*', default=FORMATS, choices=FORMATS)
+    arg_parser.add_argument('--parsers', nargs='*', default=None, help="Parsers a medir")
+    arg_parser.add_argument('--no-samples', action='store_true', help="Excluir las HUs de data/")
+    arg_parser.add_argument('--output', default=None, help="Ruta del reporte JSON")
+    arg_parser.add_argument('--compare', default=None, help="Reporte JSON base para detectar regresiones")
+    args = arg_parser.parse_args()
+
+    sizes = [s for s in DEFAULT_SIZES if s <= args.max_size]
+    corpus = build_corpus(sizes=sizes, formats=args.formats, include_samples=not args.no_samples)
+
+    report = run_benchmark(corpus, repeat=args.repeat, parsers=args.parsers)
+    print_summary(report)
+
+    output = args.output or os.path.join(
+        ROOT_DIR, 'outputs', 'benchmarks',
+        f"parser_benchmark_{report['meta']['commit']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"[OK] Reporte guardado en {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, report)
+        if regressions:
+            print(f"[WARN] {len(regressions)} regresiones contra {args.compare}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"[OK] Sin regresiones contra {args.compare}")
+
+
+if __name__ == "__main__":
+    main()